@@ -0,0 +1,100 @@
+"""
+Lectura de los ficheros de news_archive entrada a entrada.
+
+Un único patrón compilado reconoce los dos formatos del archivo en una sola
+pasada: '<p><a href="LINK">TITLE</a></p>' (días ordenados y traducciones) y
+'[TITLE](LINK)' (días sin ordenar y 00.md). Las entradas se devuelven de una
+en una como ArchiveEntry(title, link), sin cargar el fichero en una lista;
+los ficheros grandes (los 00.md mensuales) se recorren con mmap, así que la
+memoria no crece con el tamaño del mes.
+
+Cada fichero usa un solo formato: manda el de su primera entrada y las del
+otro formato se ignoran (igual que antes, cuando un fichero con entradas
+HTML solo devolvía esas).
+
+ParseCache guarda opcionalmente las entradas ya leídas de cada fichero y solo
+vuelve a leerlo si cambian su mtime o su tamaño.
+"""
+
+import mmap
+import os
+import re
+import threading
+from collections import namedtuple
+
+ArchiveEntry = namedtuple('ArchiveEntry', ['title', 'link'])
+
+# Grupos 1-2: formato HTML (link, título); grupos 3-4: markdown (título, link)
+ENTRY_PATTERN = re.compile(rb'<p><a href="(.*?)">(.*?)</a></p>|\[(.*?)\]\((.*?)\)')
+MMAP_MIN_SIZE = 256 * 1024      # Bytes: los ficheros menores se leen de una vez
+
+
+def iter_text_entries(content):
+    """ArchiveEntry de un contenido ya leído (str o bytes), en orden"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    html_format = None
+    for match in ENTRY_PATTERN.finditer(content):
+        is_html = match.group(1) is not None
+        if html_format is None:
+            html_format = is_html
+        elif is_html != html_format:
+            continue
+        if is_html:
+            link, title = match.group(1, 2)
+        else:
+            title, link = match.group(3, 4)
+        yield ArchiveEntry(title.decode('utf-8'), link.decode('utf-8'))
+
+
+def iter_entries(path, cache=None):
+    """
+    ArchiveEntry del fichero 'path', de una en una. Con 'cache' (ParseCache)
+    se usan las entradas guardadas si el fichero no ha cambiado.
+    """
+    if cache is not None:
+        return iter(cache.entries(path))
+    return _iter_file(path)
+
+
+def _iter_file(path):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < MMAP_MIN_SIZE:
+            yield from iter_text_entries(f.read())
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from iter_text_entries(data)
+
+
+def read_header(path):
+    """Primera línea del fichero (la cabecera '# ...'), sin el salto de línea"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.readline().rstrip('\n')
+
+
+class ParseCache:
+    """Entradas ya leídas por fichero; se invalidan cuando cambian su mtime o su tamaño"""
+
+    def __init__(self):
+        self._files = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def entries(self, path):
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._files.get(path)
+            if cached is not None and cached[0] == key:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+        entries = tuple(_iter_file(path))
+        with self._lock:
+            self._files[path] = (key, entries)
+        return entries
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
@@ -0,0 +1,199 @@
+"""
+Escritura atómica de los ficheros de news_archive.
+
+Cada fichero se escribe completo en un temporal del mismo directorio, se
+sincroniza a disco (fsync) y se renombra sobre el destino, así que un lector
+(o un fallo a mitad) nunca ve un fichero a medias. ArchiveWriter acumula los
+ficheros de una ejecución y los confirma juntos: primero escribe y sincroniza
+todos los temporales, después guarda un diario (JOURNAL_FILENAME, en el
+directorio común) con los renombrados pendientes y solo entonces renombra.
+Si el proceso muere entre dos renombrados, recover() (lo llaman NewsStore al
+abrirse y cada commit en su directorio) completa los que faltan, de modo
+que 00.md y DD.md nunca quedan de versiones distintas.
+
+Los ficheros conservan los permisos del que sustituyen (los nuevos, los de
+la umask), no los 0600 del temporal.
+"""
+
+import json
+import os
+import tempfile
+
+TMP_SUFFIX = ".tmp"
+JOURNAL_FILENAME = ".archive_writer.journal"
+
+# umask del proceso (solo se puede leer cambiándola): permisos de los ficheros nuevos
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+def _file_mode(filename):
+    """Permisos del fichero que se sustituye o, si no existe, los de uno nuevo"""
+    try:
+        return os.stat(filename).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def _write_temp(filename, content):
+    """Escribe content (str o bytes) en un temporal junto a filename, con fsync; devuelve su ruta"""
+    directory = os.path.dirname(filename) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(filename)}.",
+                                    suffix=TMP_SUFFIX)
+    try:
+        if hasattr(os, 'fchmod'):
+            os.fchmod(fd, _file_mode(filename))
+        if isinstance(content, bytes):
+            f = os.fdopen(fd, 'wb')
+        else:
+            f = os.fdopen(fd, 'w', encoding='utf-8', newline='')
+        with f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+
+def _fsync_dir(directory):
+    """Sincroniza la entrada del directorio tras un rename (no disponible en Windows)"""
+    try:
+        fd = os.open(directory or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _read_content(filename, binary=False):
+    try:
+        if binary:
+            with open(filename, 'rb') as f:
+                return f.read()
+        with open(filename, 'r', encoding='utf-8', newline='') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def journal_path(directory):
+    return os.path.join(directory or '.', JOURNAL_FILENAME)
+
+
+def recover(directory):
+    """
+    Completa los renombrados de un commit interrumpido cuyo diario está en
+    directory; devuelve los ficheros que se completaron
+    """
+    path = journal_path(directory)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            renames = json.load(f)
+    except FileNotFoundError:
+        return []
+    completed = []
+    for tmp_name, name in renames:
+        tmp_path, filename = os.path.join(directory, tmp_name), os.path.join(directory, name)
+        # Un temporal que ya no está se renombró antes del fallo
+        if os.path.exists(tmp_path):
+            os.replace(tmp_path, filename)
+            completed.append(filename)
+    for sub_directory in {os.path.dirname(os.path.join(directory, name)) for _, name in renames}:
+        _fsync_dir(sub_directory)
+    os.remove(path)
+    _fsync_dir(directory)
+    return completed
+
+
+def recover_all(root):
+    """recover() de todos los diarios que haya bajo root"""
+    completed = []
+    for directory, _, names in os.walk(root):
+        if JOURNAL_FILENAME in names:
+            completed += recover(directory)
+    return completed
+
+
+def _common_dir(filenames):
+    return os.path.commonpath([os.path.dirname(os.path.abspath(filename)) for filename in filenames])
+
+
+def atomic_write(filename, content):
+    """Sustituye filename por content de forma atómica (temporal + fsync + rename)"""
+    tmp_path = _write_temp(filename, content)
+    os.replace(tmp_path, filename)
+    _fsync_dir(os.path.dirname(filename))
+
+
+class ArchiveWriter:
+    """
+    Acumula los ficheros de una ejecución y los escribe una sola vez cada uno.
+
+    Usar como context manager: al salir sin excepción se llama a commit();
+    si hay una excepción no se toca ningún fichero. Los ficheros cuyo
+    contenido no cambia no se reescriben.
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self.written = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+    def stage(self, filename, content):
+        """Programa la escritura de filename (la última versión gana)"""
+        self.pending[filename] = content
+        return filename
+
+    def discard(self):
+        self.pending.clear()
+
+    def commit(self):
+        """Escribe todos los ficheros pendientes; devuelve los que cambiaron"""
+        if len(self.pending) > 1:
+            # Antes de comparar: un commit interrumpido en el mismo directorio se completa
+            recover(_common_dir(self.pending))
+        changed = {filename: content for filename, content in self.pending.items()
+                   if _read_content(filename, isinstance(content, bytes)) != content}
+        self.pending.clear()
+
+        # Fase 1: todos los temporales escritos y en disco
+        temps = []
+        try:
+            for filename, content in changed.items():
+                temps.append((_write_temp(filename, content), filename))
+        except BaseException:
+            for tmp_path, _ in temps:
+                os.unlink(tmp_path)
+            raise
+
+        # Fase 2: diario de los renombrados (solo con varios ficheros) y renombrar
+        if len(temps) > 1:
+            root = _common_dir(changed)
+            renames = [(os.path.relpath(tmp_path, root), os.path.relpath(filename, root))
+                       for tmp_path, filename in temps]
+            atomic_write(journal_path(root), json.dumps(renames, ensure_ascii=False))
+        for tmp_path, filename in temps:
+            os.replace(tmp_path, filename)
+        for directory in {os.path.dirname(filename) for filename in changed}:
+            _fsync_dir(directory)
+        if len(temps) > 1:
+            os.remove(journal_path(root))
+            _fsync_dir(root)
+
+        self.written += list(changed)
+        return list(changed)
@@ -0,0 +1,146 @@
+"""
+Relleno de un rango de fechas del archivo de IT之家.
+
+Descarga en paralelo las páginas de archivo de cada día (con un límite de
+ritmo global para todos los hilos) y las guarda en el almacén como lo haría
+script.py, un día tras otro en el hilo principal. Los días que ya tienen
+noticias se saltan. Cuando terminan todos los días de un mes, los DD.md de
+los días guardados y 00.md se escriben juntos con un ArchiveWriter (las
+noticias nuevas solo se añaden al final) y esos días se apuntan en un
+fichero de control para que una ejecución interrumpida continúe donde se
+quedó. Lo que una ejecución interrumpida guardó sin llegar a escribirlo lo
+descarta el almacén al abrirse, y esos días vuelven a quedar pendientes.
+
+Uso:
+    python src/backfill.py --from 2020-07-01 --to 2020-07-31 [--workers 8] [--rate 4] [--force]
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+from archive_writer import ArchiveWriter, atomic_write
+from http_pool import HostRateLimiter, make_session
+from ithome import ARCHIVE_URL, fetch_archive
+from news_store import ARCHIVE_DIR, NewsStore, switch_to_parent_if_src
+from script import month_dedup_index, store_day_news
+
+CHECKPOINT_FILENAME = f"{ARCHIVE_DIR}/backfill.json"
+WORKERS = 8
+RATE = 4.0          # Páginas por segundo entre todos los hilos
+RETRIES = 3
+
+
+def date_range(date_from, date_to):
+    """['YYYY-MM-DD', ...] de date_from a date_to, ambos incluidos"""
+    start = date.fromisoformat(date_from)
+    end = date.fromisoformat(date_to)
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+def load_checkpoint(path=CHECKPOINT_FILENAME):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return set(json.load(f).get('done', []))
+    except FileNotFoundError:
+        return set()
+
+
+def save_checkpoint(done, path=CHECKPOINT_FILENAME):
+    atomic_write(path, json.dumps({'done': sorted(done)}, indent=1))
+
+
+def write_month_views(store, year_month, days):
+    """DD.md de los días guardados y 00.md del mes, en un solo commit del ArchiveWriter"""
+    with ArchiveWriter() as writer:
+        for day in days:
+            store.write_day(day, writer)
+        store.write_month(year_month, writer)
+    store.commit()
+
+
+def backfill(date_from, date_to, workers=WORKERS, rate=RATE, force=False,
+             url_template=ARCHIVE_URL, checkpoint=CHECKPOINT_FILENAME):
+    """Rellena los días del rango; devuelve (guardados, saltados, fallidos)"""
+    days = date_range(date_from, date_to)
+    done = load_checkpoint(checkpoint)
+    saved, failed = [], []
+
+    with NewsStore() as store:
+        pending = [day for day in days
+                   if force or (day not in done and not store.day_news(day))]
+        skipped = len(days) - len(pending)
+        print(f"Relleno {date_from} → {date_to}: {len(pending)} días pendientes, {skipped} ya completos")
+
+        session = make_session(pool_size=workers)
+        limiter = HostRateLimiter(rate)
+        dedup_indexes = {}
+        # Días por descargar de cada mes: al llegar a cero se escriben las
+        # vistas de los días guardados en esta ejecución y se apuntan como hechos
+        remaining = {}
+        for day in pending:
+            remaining[day[:7]] = remaining.get(day[:7], 0) + 1
+        month_saved = {}
+
+        def finish(day):
+            year_month = day[:7]
+            remaining[year_month] -= 1
+            if not remaining[year_month] and month_saved.get(year_month):
+                write_month_views(store, year_month, sorted(month_saved[year_month]))
+                done.update(month_saved[year_month])
+                save_checkpoint(done, checkpoint)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(fetch_archive, day, session, url_template=url_template,
+                                       limiter=limiter, retries=RETRIES): day
+                       for day in pending}
+            # Las descargas van en paralelo; el almacén se escribe desde este hilo
+            for future in as_completed(futures):
+                day = futures[future]
+                try:
+                    news = future.result()
+                except Exception as e:
+                    print(f"{day}: error al descargar ({e}), se reintentará en la próxima ejecución")
+                    failed.append(day)
+                    finish(day)
+                    continue
+                if not news:
+                    print(f"{day}: página sin noticias, se reintentará en la próxima ejecución")
+                    failed.append(day)
+                    finish(day)
+                    continue
+
+                year_month = day[:7]
+                if year_month not in dedup_indexes:
+                    dedup_indexes[year_month] = month_dedup_index(store, year_month)
+                count = store_day_news(store, dedup_indexes[year_month], day, news)
+                month_saved.setdefault(year_month, []).append(day)
+                saved.append(day)
+                print(f"{day}: {count} noticias nuevas de {len(news)}")
+                finish(day)
+
+    return saved, skipped, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rellena un rango de fechas del archivo de IT之家")
+    parser.add_argument('--from', dest='date_from', required=True, help="primer día (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='date_to', required=True, help="último día (YYYY-MM-DD)")
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--rate', type=float, default=RATE, help="páginas por segundo en total")
+    parser.add_argument('--force', action='store_true', help="vuelve a descargar los días completos")
+    args = parser.parse_args()
+
+    switch_to_parent_if_src()
+    start = time.perf_counter()
+    saved, skipped, failed = backfill(args.date_from, args.date_to, args.workers, args.rate, args.force)
+    print(f"Relleno terminado en {time.perf_counter() - start:.2f} s: {len(saved)} días guardados, "
+          f"{skipped} saltados, {len(failed)} fallidos")
+    if failed:
+        print(f"Días fallidos: {', '.join(sorted(failed))}")
+
+
+if __name__ == '__main__':
+    main()
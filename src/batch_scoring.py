@@ -0,0 +1,183 @@
+"""
+Puntuación y ordenación por lotes con NumPy.
+
+Carga de una vez los votos (última lectura de cada noticia) y las horas de
+publicación de un rango de días en arrays y aplica las mismas reglas que
+scoring.calculate_score y scoring.adjust_value_based_on_time, vectorizadas.
+Con eso se obtienen los rankings por día, semana (ISO) o mes de cualquier
+rango, p. ej. todo news_archive tras cambiar la fórmula, sin recorrer las
+noticias una a una.
+
+Las noticias sin lecturas de votos puntúan 0 y, dentro de su periodo, se
+desempatan por el orden guardado (rank) y luego por el de inserción, como en
+NewsStore.iter_day_news. Las de -10 no entran en los rankings.
+
+Uso:
+    python src/batch_scoring.py --from 2025-10-01 --to 2025-10-31 [--period week] [--top 10]
+"""
+
+import argparse
+import re
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+from news_store import NewsStore, switch_to_parent_if_src
+from scoring import HIDDEN_SCORE, TIME_FORMAT
+
+PERIODS = ('day', 'week', 'month')
+EPOCH_WEEKDAY = 3   # 1970-01-01 fue jueves (lunes = 0)
+TIME_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}')
+
+
+class VoteArrays:
+    """Noticias de un rango de días en columnas (una posición por noticia)"""
+
+    def __init__(self, links, titles, days, published, valuable, unvaluable, rank):
+        self.links = links              # list[str]
+        self.titles = titles            # list[str]
+        self.days = days                # datetime64[D]
+        self.published = published      # datetime64[s], NaT si no se conoce
+        self.valuable = valuable        # int64
+        self.unvaluable = unvaluable    # int64
+        self.rank = rank                # float64, NaN si el día no estaba ordenado
+
+    def __len__(self):
+        return len(self.links)
+
+
+def load_votes(store, start_day, end_day):
+    """VoteArrays de las noticias con día entre start_day y end_day ('YYYY-MM-DD', incluidos)"""
+    for year_month in months_between(start_day, end_day):
+        store.ensure_month(year_month)
+    rows = store.conn.execute(
+        "SELECT news.link, news.title, news.day, news.published, news.rank, "
+        "latest.valuable, latest.unvaluable "
+        "FROM news LEFT JOIN (SELECT link, valuable, unvaluable, MAX(fetched_at) FROM votes GROUP BY link) "
+        "AS latest ON latest.link = news.link "
+        "WHERE news.day BETWEEN ? AND ? ORDER BY news.rowid", (start_day, end_day)).fetchall()
+    links, titles, days, published, rank, valuable, unvaluable = zip(*rows) if rows else ([],) * 7
+    return VoteArrays(
+        list(links),
+        list(titles),
+        np.array(days, dtype='datetime64[D]'),
+        parse_times(published),
+        np.array([value or 0 for value in valuable], dtype=np.int64),
+        np.array([value or 0 for value in unvaluable], dtype=np.int64),
+        np.array([np.nan if value is None else value for value in rank], dtype=np.float64),
+    )
+
+
+def parse_times(values):
+    """
+    Horas 'YYYY-MM-DD HH:MM:SS' a datetime64[s]. Las vacías o con otro
+    formato quedan como NaT: igual que en scoring, no se ajustan por antigüedad.
+    """
+    strings = [value if isinstance(value, str) and TIME_PATTERN.fullmatch(value) else 'NaT' for value in values]
+    try:
+        return np.array(strings, dtype='datetime64[s]')
+    except ValueError:
+        # Alguna fecha con el formato correcto pero imposible (mes 13...): una a una
+        return np.array([_parse_time(value) for value in strings], dtype='datetime64[s]')
+
+
+def _parse_time(value):
+    try:
+        return np.datetime64(datetime.strptime(value, TIME_FORMAT), 's')
+    except ValueError:
+        return np.datetime64('NaT')
+
+
+def months_between(start_day, end_day):
+    months = np.arange(np.datetime64(start_day[:7], 'M'), np.datetime64(end_day[:7], 'M') + 1)
+    return [str(month) for month in months]
+
+
+def calculate_scores(valuable, unvaluable):
+    """scoring.calculate_score sobre arrays"""
+    valuable = np.asarray(valuable, dtype=np.int64)
+    unvaluable = np.asarray(unvaluable, dtype=np.int64)
+    total = valuable + unvaluable
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = (valuable / total) * 10
+    return np.select(
+        [total == 0, valuable == 0, unvaluable == 0],
+        [0.0, float(HIDDEN_SCORE), 10.0 + valuable],
+        ratio)
+
+
+def adjust_scores(scores, published, now=None):
+    """scoring.adjust_value_based_on_time sobre arrays, respecto a 'now' (por defecto, ahora)"""
+    now = np.datetime64(now or datetime.now(), 'us')
+    elapsed = (now - published).astype('timedelta64[us]').astype(np.float64)
+    # NaT da NaN: todas las comparaciones son falsas y el valor no cambia
+    elapsed[np.isnat(published)] = np.nan
+    hour = 3600e6
+    factor = np.select([elapsed <= hour, elapsed <= 3 * hour, elapsed > 24 * hour], [1.5, 1.2, 0.8], 1.0)
+    return scores * factor
+
+
+def period_keys(days, period):
+    """Clave del periodo de cada día: el propio día, el lunes de su semana o el mes (datetime64)"""
+    if period == 'day':
+        return days
+    if period == 'week':
+        weekday = (days.astype(np.int64) + EPOCH_WEEKDAY) % 7
+        return days - weekday.astype('timedelta64[D]')
+    if period == 'month':
+        return days.astype('datetime64[M]')
+    raise ValueError(f"Periodo desconocido: {period} (día, semana o mes: {', '.join(PERIODS)})")
+
+
+def period_label(key, period):
+    """'2025-10-26', '2025-W43' o '2025-10'"""
+    if period == 'week':
+        year, week, _ = date.fromisoformat(str(key)).isocalendar()
+        return f"{year}-W{week:02d}"
+    return str(key)
+
+
+def rank_periods(arrays, period='day', now=None, scores=None):
+    """
+    {periodo: índices de las noticias ordenados por puntuación ajustada}.
+    'scores' permite ordenar con otra puntuación base (p. ej. una fórmula nueva).
+    """
+    if scores is None:
+        scores = calculate_scores(arrays.valuable, arrays.unvaluable)
+    adjusted = adjust_scores(scores, arrays.published, now)
+    keys = period_keys(arrays.days, period)
+    visible = np.flatnonzero(scores > HIDDEN_SCORE)
+    rank = np.where(np.isnan(arrays.rank), np.inf, arrays.rank)
+    # lexsort ordena por la última clave: periodo, puntuación (desc.), rank y posición
+    order = visible[np.lexsort((visible, rank[visible], -adjusted[visible], keys[visible]))]
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]) if len(order) else []
+    return {period_label(sorted_keys[start], period): group
+            for start, group in zip(starts, np.split(order, starts[1:]))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rankings por día, semana o mes con puntuación vectorizada")
+    parser.add_argument('--from', dest='start', required=True, help="primer día (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='end', required=True, help="último día (YYYY-MM-DD)")
+    parser.add_argument('--period', choices=PERIODS, default='day')
+    parser.add_argument('--top', type=int, default=5, help="noticias que se muestran por periodo")
+    args = parser.parse_args()
+
+    switch_to_parent_if_src()
+    start = time.perf_counter()
+    with NewsStore() as store:
+        arrays = load_votes(store, args.start, args.end)
+    loaded = time.perf_counter()
+    rankings = rank_periods(arrays, args.period)
+    ranked = time.perf_counter()
+    for label, indices in rankings.items():
+        print(f"{label} ({len(indices)} noticias)")
+        for position, index in enumerate(indices[:args.top], 1):
+            print(f"  {position}. {arrays.titles[index]} — {arrays.links[index]}")
+    print(f"{len(arrays)} noticias: carga {loaded - start:.2f} s, ordenación {ranked - loaded:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
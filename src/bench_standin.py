@@ -0,0 +1,255 @@
+"""
+Sustitutos locales de ithome.com y del traductor para los benchmarks offline.
+
+- synthetic_month: un mes sintético con el tamaño de un mes real, hecho con
+  títulos reales de news_archive repartidos por días, con links propios
+  (http://www.ithome.com/0/NNN/NNN.htm) y horas de publicación.
+- StandInServer: servidor HTTP local que responde como www.ithome.com: las
+  páginas de archivo /list/YYYY-MM-DD.html del mes sintético y una página por
+  artículo con sus contadores de votos. Añade una latencia fija por petición
+  y hace fallar con un 500 el primer intento de una fracción de las rutas.
+  Los votos de un artículo pueden cambiar entre lecturas (add_votes).
+  Se usa como proxy HTTP (HTTP_PROXY), así que el código que se mide pide las
+  URL de ithome.com de siempre sin saber que el servidor es local.
+- FakeTranslator: traductor con la misma interfaz que GoogleTranslator
+  (translate / translate_batch), latencia por petición y errores inyectados.
+"""
+
+import glob
+import hashlib
+import html
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from requests import RequestException
+
+from archive_reader import iter_entries
+from news_store import markdown_entry
+
+ARTICLE_URL = "http://www.ithome.com/0/{major:03d}/{minor:03d}.htm"
+FIRST_ARTICLE_ID = 900000
+LATENCY = 0.02
+ERROR_RATE = 0.02
+
+
+def real_titles(archive_dir="news_archive"):
+    """Títulos de todos los DD.md del archivo real, sin repetir"""
+    titles = {}
+    for path in sorted(glob.glob(f"{archive_dir}/[0-9]*-[0-9]*/[0-3][0-9].md")):
+        if path.endswith('/00.md'):
+            continue
+        for title, _ in iter_entries(path):
+            titles.setdefault(title, None)
+    return list(titles)
+
+
+def synthetic_month(year_month, per_day, seed=1, archive_dir="news_archive"):
+    """
+    {día: [{'category', 'title', 'link', 'time'}]} para todos los días del
+    mes, de la más nueva a la más antigua como en la página de archivo.
+    """
+    rng = random.Random(seed)
+    first = datetime.strptime(f"{year_month}-01", "%Y-%m-%d")
+    days = [first + timedelta(days=i) for i in range(31) if (first + timedelta(days=i)).month == first.month]
+    pool = real_titles(archive_dir)
+    titles = rng.sample(pool, min(len(pool), per_day * len(days)))
+    month = {}
+    article_id = FIRST_ARTICLE_ID
+    for i, day in enumerate(days):
+        news = []
+        for title in titles[i * per_day:(i + 1) * per_day]:
+            article_id += 1
+            news.append({
+                'category': '[IT]',
+                'title': title,
+                'link': ARTICLE_URL.format(major=article_id // 1000, minor=article_id % 1000),
+                'time': day + timedelta(seconds=rng.randrange(86400)),
+            })
+        month[day.strftime('%Y-%m-%d')] = sorted(news, key=lambda item: item['time'], reverse=True)
+    return month
+
+
+def write_archive(month, days, archive_dir):
+    """Escribe DD.md y 00.md de los días indicados, como los dejaría script.py"""
+    by_month = {}
+    for day in days:
+        folder = f"{archive_dir}/{day[:7]}"
+        os.makedirs(folder, exist_ok=True)
+        lines = [markdown_entry(news['title'], news['link']) for news in month[day]]
+        with open(f"{folder}/{day[8:]}.md", 'w', encoding='utf-8') as f:
+            f.write(f"# 今日新闻 - {day}\n" + ''.join(lines))
+        by_month.setdefault(day[:7], []).extend(lines)
+    for year_month, lines in by_month.items():
+        with open(f"{archive_dir}/{year_month}/00.md", 'w', encoding='utf-8') as f:
+            f.write("# 本月新闻\n" + ''.join(lines))
+
+
+def stable_hash(text):
+    return int(hashlib.sha1(text.encode('utf-8')).hexdigest()[:8], 16)
+
+
+def article_votes(link):
+    """Votos (vale, no vale) deterministas de un artículo"""
+    value = stable_hash(link)
+    return value % 40, (value // 40) % 10
+
+
+def render_list_page(day, news_list):
+    items = ''.join(
+        f'<li><a class="c" href="/list/">{news["category"]}</a>'
+        f'<a class="t" href="{news["link"]}" target="_blank">{html.escape(news["title"])}</a>'
+        f'<i>{news["time"]:%Y-%m-%d %H:%M:%S}</i></li>\n'
+        for news in news_list)
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{day}</title></head>'
+            f'<body><ul class="datel">\n{items}</ul></body></html>')
+
+
+def render_article_page(news, extra_votes=(0, 0)):
+    valuable, unvaluable = (votes + extra for votes, extra in zip(article_votes(news['link']), extra_votes))
+    title = html.escape(news['title'])
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title></head>'
+            f'<body><h1>{title}</h1><time class="ago" datetime="{news["time"]:%Y-%m-%d %H:%M:%S}"></time>'
+            f'<div class="vote"><span id="news_value_up">{valuable}</span>'
+            f'<span id="news_value_down">{unvaluable}</span></div></body></html>')
+
+
+class StandInServer:
+    """
+    Servidor local con las páginas de un mes sintético. Usar como context
+    manager; proxy() redirige a él las peticiones http:// del proceso.
+    """
+
+    def __init__(self, month, latency=LATENCY, error_rate=ERROR_RATE):
+        self.month = month
+        self.latency = latency
+        self.error_rate = error_rate
+        self.articles = {urlsplit(news['link']).path: news for news_list in month.values() for news in news_list}
+        self.requests = 0
+        self.errors = 0
+        self.extra_votes = {}
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def address(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def should_fail(self, path):
+        """Falla el primer intento de una fracción fija (error_rate) de las rutas"""
+        with self._lock:
+            self.requests += 1
+            attempt = self._attempts[path] = self._attempts.get(path, 0) + 1
+            fail = attempt == 1 and stable_hash(path) % 10000 < self.error_rate * 10000
+            self.errors += fail
+        return fail
+
+    def add_votes(self, link, valuable, unvaluable):
+        """Suma votos a un artículo a partir de la próxima lectura"""
+        path = urlsplit(link).path
+        with self._lock:
+            extra_valuable, extra_unvaluable = self.extra_votes.get(path, (0, 0))
+            self.extra_votes[path] = (extra_valuable + valuable, extra_unvaluable + unvaluable)
+
+    def page(self, path):
+        if path.startswith('/list/') and path.endswith('.html'):
+            day = path[len('/list/'):-len('.html')]
+            if day in self.month:
+                return render_list_page(day, self.month[day])
+        elif path in self.articles:
+            return render_article_page(self.articles[path], self.extra_votes.get(path, (0, 0)))
+        return None
+
+    def _handler(self):
+        standin = self
+
+        class StandInHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                # Como proxy la ruta llega como URL completa
+                path = urlsplit(self.path).path
+                time.sleep(standin.latency)
+                if standin.should_fail(path):
+                    self.send_error(500)
+                    return
+                page = standin.page(path)
+                if page is None:
+                    self.send_error(404)
+                    return
+                body = page.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return StandInHandler
+
+    @contextmanager
+    def proxy(self):
+        """Durante el bloque, las peticiones http:// de requests pasan por este servidor"""
+        saved = {name: os.environ.get(name) for name in ('HTTP_PROXY', 'http_proxy', 'NO_PROXY', 'no_proxy')}
+        os.environ['HTTP_PROXY'] = os.environ['http_proxy'] = self.address
+        os.environ['NO_PROXY'] = os.environ['no_proxy'] = ''
+        try:
+            yield self
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+class FakeTranslator:
+    """
+    Traductor local con la interfaz de GoogleTranslator. 'Traduce' añadiendo
+    un prefijo a cada línea; cada petición tarda 'latency' segundos y una
+    fracción (error_rate) de los textos lanza un error de red la primera vez
+    que se piden. 'failed' se comparte entre los traductores de cada hilo.
+    """
+
+    def __init__(self, latency=LATENCY, error_rate=ERROR_RATE, prefix="[es] ", failed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.prefix = prefix
+        self.requests = 0
+        self._failed = failed if failed is not None else set()
+
+    def _request(self, text):
+        self.requests += 1
+        time.sleep(self.latency)
+        key = stable_hash(text)
+        if key % 10000 < self.error_rate * 10000 and key not in self._failed:
+            self._failed.add(key)
+            raise RequestException("error inyectado por FakeTranslator")
+
+    def translate(self, text):
+        self._request(text)
+        return '\n'.join(f"{self.prefix}{line}" for line in text.split('\n'))
+
+    def translate_batch(self, batch):
+        return [self.translate(text) for text in batch]
+
+
+def fake_translator_factory(latency=LATENCY, error_rate=ERROR_RATE):
+    """translator_factory para translate_texts: un FakeTranslator por hilo con errores compartidos"""
+    failed = set()
+    return lambda: FakeTranslator(latency, error_rate, failed=failed)
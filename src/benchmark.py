@@ -0,0 +1,1211 @@
+"""
+Benchmarks offline sobre los datos reales de news_archive.
+
+Uso:
+    python src/benchmark.py dedup --month 2025-10 [--verify]
+    python src/benchmark.py list [--fixture src/fixtures/ithome_list_2025-10-26.html]
+    python src/benchmark.py filter [--show 20]
+    python src/benchmark.py search [--year 2025]
+    python src/benchmark.py columnar
+    python src/benchmark.py sources
+    python src/benchmark.py backfill [--days 30] [--workers 8]
+    python src/benchmark.py incremental [--new 5]
+    python src/benchmark.py driverpool [--pages 200] [--size 3] [--max-pages 20]
+    python src/benchmark.py suite [--days 3] [--per-day 200] [--update-baseline]
+    python src/benchmark.py rescore [--per-day 300] [--changing 0.1]
+    python src/benchmark.py scoring [--sample-days 50]
+    python src/benchmark.py reader
+    python src/benchmark.py digest [--top-k 10]
+    python src/benchmark.py feeds [--feed-days 7]
+"""
+
+import argparse
+import configparser
+import contextlib
+import glob
+import hashlib
+import html
+import io
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+import numpy as np
+
+from archive_reader import ParseCache, iter_entries
+from backfill import CHECKPOINT_FILENAME, backfill
+from batch_scoring import PERIODS, adjust_scores, calculate_scores, load_votes, parse_times, rank_periods
+from bench_standin import (StandInServer, article_votes, fake_translator_factory, synthetic_month,
+                           write_archive)
+from dedup import DedupIndex, quiet_is_similar
+from digest import FAILED_SUFFIX, DigestHeaps, period_labels, update_digests
+from feeds import feed_handler, update_feeds
+from driver_pool import DriverPool
+from ithome import parse_archive_html
+from main import translate_day
+from metrics import METRICS, timer
+from news_filter import (AI_KEYWORDS, FILTER_KEYWORDS, filter_titles, find_keywords, load_filter_config,
+                         should_keep_news)
+from news_columnar import COLUMNAR_DIR, export_archive, scan
+from news_index import CJK, NewsIndex
+from news_sorter import rescore_days, sort_day
+from news_sources import ItHomeSource, fetch_sources, load_sources
+from news_store import NewsStore, switch_to_parent_if_src
+from scoring import HIDDEN_SCORE, adjust_value_based_on_time, calculate_score
+from script import fetch_all_news, month_dedup_index, save_news_to_markdown, store_day_news
+
+FIXTURES_DIR = "src/fixtures"
+
+
+def read_lines(filename):
+    with open(filename, 'r', encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def bench_dedup(args):
+    """
+    Reproduce un mes en orden: cada DD.md se deduplica contra lo ya guardado
+    del mes (como store_day_news) y el índice crece con lo que entra.
+    """
+    folder = f"news_archive/{args.month}"
+    day_files = sorted(glob.glob(f"{folder}/[0-3][0-9].md"))
+    day_files = [filename for filename in day_files if not filename.endswith('/00.md')]
+    queries = [f"{line}\n" for filename in day_files
+               for line in read_lines(filename) if line.startswith('- [')]
+
+    index = DedupIndex()
+    decisions = []
+    start = time.perf_counter()
+    for query in queries:
+        duplicate = index.is_duplicate(query)
+        if not duplicate:
+            index.add(query)
+        decisions.append(duplicate)
+    elapsed = time.perf_counter() - start
+    print(f"{len(day_files)} días, {len(queries)} entradas en {elapsed:.2f} s "
+          f"({index.comparisons} comparaciones, {index.comparisons / max(len(queries), 1):.1f} por consulta)")
+    print(f"Duplicados detectados: {sum(decisions)}/{len(queries)}, índice final: {len(index)} entradas")
+
+    if args.verify:
+        start = time.perf_counter()
+        kept = []
+        expected = []
+        for query in queries:
+            duplicate = any(quiet_is_similar(query, entry) for entry in kept)
+            if not duplicate:
+                kept.append(query)
+            expected.append(duplicate)
+        brute_time = time.perf_counter() - start
+        mismatches = sum(a != b for a, b in zip(decisions, expected))
+        print(f"Comparación todos-contra-todos: {brute_time:.2f} s, discrepancias: {mismatches}")
+        if mismatches:
+            raise SystemExit(1)
+
+
+def bench_list(args):
+    """Parseo offline de una página de archivo guardada"""
+    with open(args.fixture, 'r', encoding='utf-8') as f:
+        html = f.read()
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        news_data = parse_archive_html(html, base_url="https://www.ithome.com/list/")
+    elapsed = (time.perf_counter() - start) / args.repeat
+    print(f"{args.fixture}: {len(news_data)} artículos, {elapsed * 1000:.2f} ms por página")
+    expected_path = f"{os.path.splitext(args.fixture)[0]}.json"
+    if os.path.exists(expected_path):
+        with open(expected_path, 'r', encoding='utf-8') as f:
+            expected = json.load(f)
+        parsed = [dict(news, time=news['time'].strftime('%Y-%m-%d %H:%M:%S')) for news in news_data]
+        if parsed != expected:
+            raise SystemExit(f"El resultado no coincide con {expected_path}")
+    for news in news_data:
+        if set(news) != {'category', 'title', 'link', 'time'} or not news['link'].startswith('http'):
+            raise SystemExit(f"Artículo mal formado: {news}")
+
+
+def archive_titles():
+    """Todos los títulos (en chino) de news_archive/YYYY-MM/*.md"""
+    titles = []
+    for filename in sorted(glob.glob("news_archive/[0-9]*/*.md")):
+        titles += [title for title, link in iter_entries(filename)]
+    return titles
+
+
+def reference_should_keep_news(title):
+    """Implementación original (un 'in' por palabra clave), como referencia"""
+    if any(keyword in title for keyword in FILTER_KEYWORDS):
+        return False
+    title_lower = title.lower()
+    return any(keyword in title_lower for keyword in AI_KEYWORDS)
+
+
+def read_filter_cases(filename):
+    """Casos de regresión: [(keep, título)] de un TSV 'keep|drop<TAB>título'"""
+    cases = []
+    for line in read_lines(filename):
+        if line and not line.startswith('#'):
+            expected, title = line.split('\t', 1)
+            cases.append((expected == 'keep', title))
+    return cases
+
+
+def bench_filter(args):
+    """Filtro de IA sobre todo el corpus de news_archive y casos de regresión"""
+    matcher = load_filter_config()
+    titles = archive_titles()
+    print(f"Corpus: {len(titles)} títulos")
+    results = {}
+    for name, run in (('referencia', lambda: [reference_should_keep_news(t) for t in titles]),
+                      ('should_keep_news', lambda: [should_keep_news(t, matcher) for t in titles]),
+                      ('filter_titles', lambda: filter_titles(titles, matcher))):
+        start = time.perf_counter()
+        results[name] = run()
+        elapsed = time.perf_counter() - start
+        print(f"{name:>18}: {elapsed:.3f} s ({len(titles) / elapsed:,.0f} títulos/s), "
+              f"conservados {sum(results[name])}")
+    if results['should_keep_news'] != results['filter_titles']:
+        raise SystemExit("should_keep_news y filter_titles no coinciden")
+
+    reference, current = results['referencia'], results['should_keep_news']
+    dropped = [t for t, old, new in zip(titles, reference, current) if old and not new]
+    added = [t for t, old, new in zip(titles, reference, current) if new and not old]
+    print(f"Respecto a la referencia: {len(dropped)} títulos menos que traducir, {len(added)} nuevos")
+    for title in dropped[:args.show]:
+        print(f"  - {title}")
+    for title in added[:args.show]:
+        print(f"  + {title}")
+
+    failures = [(keep, title) for keep, title in read_filter_cases(args.cases)
+                if should_keep_news(title, matcher) != keep]
+    for keep, title in failures:
+        print(f"Caso fallido (esperado {'keep' if keep else 'drop'}): {title} {find_keywords(title, matcher)}")
+    if failures:
+        raise SystemExit(f"{len(failures)} casos de regresión fallidos en {args.cases}")
+
+
+SEARCH_TERMS = ['大模型', 'OpenAI', 'AI 手机', '"GPT-4o"', '英伟达 -芯片', 'Gemini OR Claude', '龙']
+
+
+def bench_search(args):
+    """Consultas típicas sobre el índice de búsqueda, comparadas con un recorrido de todos los títulos"""
+    with NewsIndex() as index:
+        start = time.perf_counter()
+        changed = index.update()
+        print(f"Actualización del índice: {changed} ficheros en {time.perf_counter() - start:.2f} s")
+        docs = index.conn.execute("SELECT date, title FROM docs WHERE date LIKE ?",
+                                  (f"{args.year}%",)).fetchall()
+        for term in SEARCH_TERMS:
+            start = time.perf_counter()
+            count = index.count(term, args.year, args.year)
+            elapsed = time.perf_counter() - start
+            print(f"{term:>16}: {count:>6} titulares de {args.year} en {elapsed * 1000:.1f} ms")
+        # Los términos simples deben coincidir con una búsqueda por subcadena
+        for term in ('大模型', '英伟达', '谷歌'):
+            expected = sum(term in title for date, title in docs)
+            if index.count(term, args.year, args.year) != expected:
+                raise SystemExit(f"'{term}': el índice no coincide con el recorrido ({expected})")
+        # Un solo carácter y una frase que cruza un tramo CJK y uno latino
+        phrase = re.compile(rf'苹果[\W_]*iphone(?![^\W_{CJK}])')
+        for term, expected in (('型', sum('型' in title for date, title in docs)),
+                               ('"苹果 iPhone"', sum(bool(phrase.search(title.lower())) for date, title in docs))):
+            if index.count(term, args.year, args.year) != expected:
+                raise SystemExit(f"'{term}': el índice no coincide con el recorrido ({expected})")
+        for term in ('-芯片 英伟达', '+++', 'AND', 'foo OR', '(('):
+            index.count(term, args.year, args.year)
+
+
+def directory_size(pattern):
+    return sum(os.path.getsize(path) for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+
+def bench_columnar(args):
+    """Recorrido completo del archivo: regex sobre los .md frente al formato columnar"""
+    start = time.perf_counter()
+    exported = export_archive()
+    print(f"Exportación: {len(exported)} meses en {time.perf_counter() - start:.2f} s")
+    md_size = directory_size("news_archive/[0-9]*/*.md")
+    columnar_size = directory_size(f"{COLUMNAR_DIR}/**/*.json.gz")
+    print(f"Disco: {md_size / 1e6:.1f} MB en .md, {columnar_size / 1e6:.1f} MB en columnar "
+          f"({md_size / columnar_size:.1f}x)")
+
+    start = time.perf_counter()
+    md_titles = archive_titles()
+    print(f"      .md: {len(md_titles)} títulos en {time.perf_counter() - start:.2f} s")
+    start = time.perf_counter()
+    titles = [row['title'] for row in scan(['title'])]
+    print(f" columnar: {len(titles)} títulos en {time.perf_counter() - start:.2f} s")
+    start = time.perf_counter()
+    month = sum(1 for _ in scan(['title', 'score'], args.month, args.month))
+    print(f" columnar: {month} noticias de {args.month} en {(time.perf_counter() - start) * 1000:.1f} ms")
+    # Cada link de los .md debe estar en el formato columnar (el almacén guarda un título por link)
+    md_links = set()
+    for filename in glob.glob("news_archive/[0-9]*/*.md"):
+        md_links.update(link for title, link in iter_entries(filename))
+    missing = md_links - {row['link'] for row in scan(['link'])}
+    if missing:
+        raise SystemExit(f"{len(missing)} links de los .md no están en el formato columnar")
+
+
+# Ruta del servidor local -> fichero de src/fixtures
+SOURCE_FIXTURES = {
+    '/list/2025-10-26.html': 'ithome_list_2025-10-26.html',
+    '/36kr': 'sources/36kr.html',
+    '/producthunt': 'sources/producthunt.html',
+    '/hackernews': 'sources/hackernews.html',
+}
+SLOW_SOURCE_DELAY = 5.0
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Sirve los fixtures; /slow tarda SLOW_SOURCE_DELAY s y /broken responde 500"""
+
+    def do_GET(self):
+        if self.path == '/slow':
+            time.sleep(SLOW_SOURCE_DELAY)
+        if self.path in SOURCE_FIXTURES:
+            with open(f"{FIXTURES_DIR}/{SOURCE_FIXTURES[self.path]}", 'rb') as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_error(500 if self.path == '/broken' else 404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def bench_sources(args):
+    """Motor de fuentes contra un servidor local: las de config.ini más una lenta y una rota"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # Mismas secciones que config.ini, apuntando al servidor local
+    config = configparser.ConfigParser()
+    config.read('config.ini', encoding='utf-8')
+    config['NewsSource_ITHome']['url'] = f"{base}/list/{{date_str}}.html"
+    for name, path in (('36Kr', '/36kr'), ('ProductHunt', '/producthunt'), ('HackerNews', '/hackernews')):
+        # Desactivadas en config.ini (sin fechas), pero el motor se prueba con ellas
+        config[f"NewsSource_{name}"]['url'] = f"{base}{path}"
+        config[f"NewsSource_{name}"]['enabled'] = 'true'
+    config['NewsSource_Slow'] = {'url': f"{base}/slow", 'selector': 'body', 'timeout': '0.5'}
+    config['NewsSource_Broken'] = {'url': f"{base}/broken", 'selector': 'body', 'timeout': '2'}
+
+    start = time.perf_counter()
+    results = fetch_sources(load_sources(config), '2025-10-26')
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    print(f"{sum(len(news or []) for news in results.values())} noticias de {len(results)} fuentes en {elapsed:.2f} s")
+
+    # Las fuentes descartadas dan None, para distinguirlas de "sin noticias nuevas"
+    expected = {'ITHome': 30, '36Kr': 3, 'ProductHunt': 3, 'HackerNews': 3, 'Slow': None, 'Broken': None}
+    counts = {name: None if news is None else len(news) for name, news in results.items()}
+    if counts != expected:
+        raise SystemExit(f"Noticias por fuente {counts}, se esperaba {expected}")
+    if elapsed >= SLOW_SOURCE_DELAY:
+        raise SystemExit("La fuente lenta retrasó a las demás")
+    for news in (news for source_news in results.values() if source_news for news in source_news):
+        if set(news) != {'category', 'title', 'link', 'time'} or not news['link'].startswith('http'):
+            raise SystemExit(f"Noticia mal formada: {news}")
+
+
+ARCHIVE_PAGE_LATENCY = 0.3
+BROKEN_DAY = '2025-10-13'
+
+
+def archive_page_handler(archive_dir):
+    """Handler que sirve /list/YYYY-MM-DD.html con las noticias reales de ese día"""
+    cache = ParseCache()
+
+    class ArchivePageHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(ARCHIVE_PAGE_LATENCY)
+            day = os.path.basename(self.path)[:-len('.html')]
+            filename = f"{archive_dir}/{day[:7]}/{day[8:]}.md"
+            if day == BROKEN_DAY or not os.path.exists(filename):
+                self.send_error(500 if day == BROKEN_DAY else 404)
+                return
+            # Los reintentos vuelven a pedir el mismo día: sus entradas salen de la caché
+            entries = iter_entries(filename, cache)
+            items = ''.join(f'<li><a class="c" href="/list/">[IT]</a><a class="t" href="{link}">{html.escape(title)}</a>'
+                            f'<i>{day} 12:00:00</i></li>\n' for title, link in entries)
+            body = f'<html><body><ul class="datel">\n{items}</ul></body></html>'.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ArchivePageHandler
+
+
+def bench_backfill(args):
+    """Relleno de un mes contra un servidor local con latencia, en un archivo vacío temporal"""
+    archive_dir = os.path.abspath("news_archive")
+    server = ThreadingHTTPServer(('127.0.0.1', 0), archive_page_handler(archive_dir))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url_template = f"http://127.0.0.1:{server.server_address[1]}/list/{{date_str}}.html"
+    days = [f"2025-10-{day:02d}" for day in range(1, args.days + 1)]
+    has_news = {}
+    for day in days:
+        has_news[day] = any(True for _ in iter_entries(f"{archive_dir}/{day[:7]}/{day[8:]}.md"))
+
+    workdir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        start = time.perf_counter()
+        saved, skipped, failed = backfill(days[0], days[-1], args.workers, rate=args.rate,
+                                          url_template=url_template)
+        elapsed = time.perf_counter() - start
+        print(f"Relleno: {len(saved)} días en {elapsed:.2f} s "
+              f"(en serie serían al menos {len(days) * ARCHIVE_PAGE_LATENCY:.1f} s)")
+        # Fallan el día roto y los días cuyo fichero real está vacío (página sin noticias)
+        expected_failed = sorted(day for day in days if day == BROKEN_DAY or not has_news[day])
+        if sorted(failed) != expected_failed or len(saved) != len(days) - len(expected_failed):
+            raise SystemExit(f"Se esperaba que fallasen {expected_failed}: fallidos {sorted(failed)}")
+
+        # Reanudación: solo quedan pendientes los días que fallaron
+        saved, skipped, failed = backfill(days[0], days[-1], args.workers, rate=args.rate,
+                                          url_template=url_template)
+        if saved or skipped != len(days) - len(expected_failed) or sorted(failed) != expected_failed:
+            raise SystemExit(f"La reanudación no saltó los días completos: {saved} {skipped} {failed}")
+        day_files = [f"news_archive/2025-10/{day[8:]}.md" for day in days if day not in expected_failed]
+        missing = [path for path in ["news_archive/2025-10/00.md"] + day_files if not os.path.exists(path)]
+        if missing:
+            raise SystemExit(f"No se escribieron {missing}")
+        # La reanudación no guardó ningún día: no reescribe ninguna vista
+        views = {path: os.stat(path).st_mtime_ns for path in glob.glob("news_archive/2025-10/*.md")}
+        backfill(days[0], days[-1], args.workers, rate=args.rate, url_template=url_template)
+        if views != {path: os.stat(path).st_mtime_ns for path in glob.glob("news_archive/2025-10/*.md")}:
+            raise SystemExit("La reanudación reescribió vistas de días que no descargó")
+
+        # Ejecución interrumpida: el almacén tiene un día que no llegó a los .md ni al fichero de control
+        shutil.rmtree("news_archive/2025-10")
+        os.remove(CHECKPOINT_FILENAME)
+        interrupted = [{'title': title, 'link': link}
+                       for title, link in iter_entries(f"{archive_dir}/2025-10/{days[0][8:]}.md")]
+        with NewsStore() as store:
+            store_day_news(store, month_dedup_index(store, "2025-10"), days[0], interrupted)
+        saved, skipped, failed = backfill(days[0], days[-1], args.workers, rate=args.rate,
+                                          url_template=url_template)
+        if len(saved) != len(days) - len(expected_failed):
+            raise SystemExit(f"Tras la interrupción se esperaban {len(days) - len(expected_failed)} días, "
+                             f"se guardaron {len(saved)}")
+        # El orden de llegada cambia qué título casi repetido se queda: se comprueba la coherencia
+        links = [link for title, link in iter_entries("news_archive/2025-10/00.md")]
+        day_links = {link for path in day_files if os.path.exists(path) for title, link in iter_entries(path)}
+        if len(links) != len(set(links)) or day_links != set(links) or not all(map(os.path.exists, day_files)):
+            raise SystemExit("Tras la interrupción 00.md y los DD.md no coinciden o tienen links repetidos")
+        print("  reanudación: días completos saltados sin reescribir vistas; "
+              "lo no escrito de una ejecución interrumpida se vuelve a descargar")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir)
+        server.shutdown()
+
+
+def conditional_page_handler(pages):
+    """
+    Handler que sirve pages['current'] con ETag y responde 304 si coincide
+    con If-None-Match; apunta en pages['requests'] lo que recibe.
+    """
+
+    class ConditionalPageHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = pages['current']
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            conditional = self.headers.get('If-None-Match')
+            pages['requests'].append(conditional)
+            if conditional == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ConditionalPageHandler
+
+
+def bench_incremental(args):
+    """Tres ejecuciones seguidas en modo incremental: inicial, sin cambios y con noticias nuevas"""
+    with open(f"{FIXTURES_DIR}/ithome_list_2025-10-26.html", 'r', encoding='utf-8') as f:
+        full_html = f.read()
+    # La misma página antes de que se publicasen las 'new' noticias más recientes
+    # '<li><a' y no '<li>': el comentario de cabecera del fixture también lo menciona
+    items_start = full_html.index('<li><a')
+    cut = items_start
+    for _ in range(args.new):
+        cut = full_html.index('<li><a', cut + 1)
+    older_html = full_html[:items_start] + full_html[cut:]
+    all_news = parse_archive_html(full_html)
+    new_links = {news['link'] for news in all_news} - {news['link'] for news in parse_archive_html(older_html)}
+
+    pages = {'current': older_html.encode('utf-8'), 'requests': []}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), conditional_page_handler(pages))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    source = ItHomeSource('ITHome', url=f"http://127.0.0.1:{server.server_address[1]}/list/{{date_str}}.html")
+    state = {}
+    try:
+        runs = []
+        for label, page in (('inicial', None), ('sin cambios', None), ('con novedades', full_html)):
+            if page:
+                pages['current'] = page.encode('utf-8')
+            start = time.perf_counter()
+            news = fetch_sources([source], '2025-10-26', state=state)['ITHome']
+            runs.append(news)
+            print(f"Ejecución {label}: {len(news)} noticias en {(time.perf_counter() - start) * 1000:.1f} ms")
+    finally:
+        server.shutdown()
+
+    initial, unchanged, updated = runs
+    if len(initial) != len(all_news) - len(new_links):
+        raise SystemExit(f"La primera ejecución debía traer {len(all_news) - len(new_links)} noticias")
+    if unchanged != [] or pages['requests'][1] is None:
+        raise SystemExit("Sin cambios se esperaba una petición condicional con respuesta 304")
+    if {news['link'] for news in updated} != new_links:
+        raise SystemExit(f"Se esperaban solo las {len(new_links)} noticias nuevas, llegaron {len(updated)}")
+    if state['ITHome']['last_link'] != max(all_news, key=lambda news: news['time'])['link']:
+        raise SystemExit("El estado no apunta a la noticia más reciente")
+
+
+class SimulatedDriver:
+    """Navegador simulado: cada get tarda lo indicado; solo para medir el pool sin Chrome"""
+
+    live = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, load_time, startup_time):
+        time.sleep(startup_time)
+        self.load_time = load_time
+        self.pages = 0
+        with SimulatedDriver.lock:
+            SimulatedDriver.live += 1
+            SimulatedDriver.peak = max(SimulatedDriver.peak, SimulatedDriver.live)
+
+    def get(self, url):
+        time.sleep(self.load_time)
+        self.pages += 1
+
+    def quit(self):
+        with SimulatedDriver.lock:
+            SimulatedDriver.live -= 1
+
+
+def bench_driverpool(args):
+    """Pool de navegadores con hilos concurrentes: límite de tamaño, reciclado y tiempos"""
+    startup_time, load_time = 0.2, 0.01
+    created = []
+
+    def factory():
+        driver = SimulatedDriver(load_time, startup_time)
+        created.append(driver)
+        return driver
+
+    def load(i):
+        with pool.driver() as driver:
+            driver.get(f"https://www.ithome.com/0/{i}.htm")
+
+    start = time.perf_counter()
+    with DriverPool(size=args.size, max_pages=args.max_pages, factory=factory) as pool:
+        with ThreadPoolExecutor(max_workers=args.size * 3) as executor:
+            list(executor.map(load, range(args.pages)))
+    elapsed = time.perf_counter() - start
+    print(pool.summary())
+    print(f"{args.pages} páginas en {elapsed:.2f} s con el pool; un navegador por página tardaría "
+          f"al menos {args.pages * (startup_time + load_time) / args.size:.2f} s")
+
+    if SimulatedDriver.peak > args.size:
+        raise SystemExit(f"Hubo {SimulatedDriver.peak} navegadores a la vez (máximo {args.size})")
+    if SimulatedDriver.live != 0:
+        raise SystemExit(f"Quedaron {SimulatedDriver.live} navegadores sin cerrar")
+    if any(driver.pages > args.max_pages for driver in created):
+        raise SystemExit("Un navegador superó max_pages sin reciclarse")
+    stats = pool.stats()
+    if stats['pages'] != args.pages or stats['drivers'] != len(created):
+        raise SystemExit(f"Estadísticas incoherentes: {stats}")
+
+
+SUITE_BASELINE = f"{FIXTURES_DIR}/bench_baseline.json"
+SUITE_STAGES = ('fetch_all_news', 'save_news_to_markdown', 'sort_day', 'should_keep_news',
+                'translate_day')
+SHOULD_KEEP_BATCH = 1000
+
+
+def suite_config(args, real_config_path):
+    """config.ini del directorio de trabajo: solo IT之家 (por el proxy local) y el filtro real"""
+    real = configparser.ConfigParser()
+    real.read(real_config_path, encoding='utf-8')
+    config = configparser.ConfigParser()
+    config['NewsSource_ITHome'] = {'type': 'ithome', 'url': "http://www.ithome.com/list/{date_str}.html",
+                                   'timeout': '10', 'retries': '3'}
+    config['NewsSorter'] = {'concurrency': str(args.concurrency), 'rate_per_host': str(args.rate)}
+    config['NewsFilter'] = dict(real['NewsFilter']) if real.has_section('NewsFilter') else {}
+    return config
+
+
+def run_suite(args, month, real_config_path):
+    """Ejecuta las etapas contra el sustituto local; devuelve {etapa: elementos procesados}"""
+    days = sorted(month)
+    scrape_days = days[-args.days:]
+    # El archivo empieza con el resto del mes: la deduplicación trabaja con un mes completo
+    write_archive(month, days[:-args.days], "news_archive")
+    config = suite_config(args, real_config_path)
+    with open('config.ini', 'w', encoding='utf-8') as f:
+        config.write(f)
+    items = dict.fromkeys(SUITE_STAGES, 0)
+
+    for day in scrape_days:
+        with timer('suite.fetch_all_news'):
+            news, _ = fetch_all_news(day, incremental=False)
+        items['fetch_all_news'] += len(news)
+        with timer('suite.save_news_to_markdown'):
+            save_news_to_markdown(datetime.strptime(day, '%Y-%m-%d'), news)
+        items['save_news_to_markdown'] += len(news)
+
+    for day in scrape_days:
+        # Lo mismo que la etapa 'sort' del proceso diario, sobre el almacén del directorio temporal
+        with NewsStore() as store:
+            records = store.day_news(day)
+            with timer('suite.sort_day'):
+                sort_day(store, day, records, config)
+        items['sort_day'] += len(records)
+
+    titles = [news['title'] for news_list in month.values() for news in news_list]
+    matcher = load_filter_config('config.ini')
+    for start in range(0, len(titles), SHOULD_KEEP_BATCH):
+        batch = titles[start:start + SHOULD_KEEP_BATCH]
+        with timer('suite.should_keep_news'):
+            for title in batch:
+                should_keep_news(title, matcher)
+        items['should_keep_news'] += len(batch)
+
+    for day in scrape_days:
+        with NewsStore() as store:
+            with timer('suite.translate_day'):
+                translate_day(store, day, store.iter_day_news(day), matcher,
+                              translator_factory=fake_translator_factory(args.latency, args.error_rate))
+            items['translate_day'] += sum(1 for row in store.day_news(day) if row['title_es'])
+    return items
+
+
+def suite_report(items, metrics):
+    """{etapa: {'calls', 'items', 'total', 'throughput', 'p50', 'p95'}} a partir de las métricas"""
+    report = {}
+    for stage in SUITE_STAGES:
+        summary = metrics['histograms'].get(f"suite.{stage}")
+        if not summary:
+            continue
+        report[stage] = {
+            'calls': summary['n'],
+            'items': items[stage],
+            'total': summary['total'],
+            'throughput': items[stage] / summary['total'] if summary['total'] else None,
+            'p50': summary['p50'],
+            'p95': summary['p95'],
+        }
+    return report
+
+
+def compare_with_baseline(report, baseline, tolerance):
+    """Imprime la tabla con la línea base; devuelve las etapas que empeoran más de 'tolerance'"""
+    regressions = []
+    print(f"{'etapa':<24}{'llamadas':>9}{'elem/s':>10}{'p50':>10}{'p95':>10}   base p95 / elem/s")
+    for stage, row in report.items():
+        base = baseline.get('stages', {}).get(stage)
+        line = (f"{stage:<24}{row['calls']:>9}{row['throughput'] or 0:>10.1f}"
+                f"{row['p50'] * 1000:>8.1f}ms{row['p95'] * 1000:>8.1f}ms")
+        if base:
+            slower = row['p95'] > base['p95'] * (1 + tolerance)
+            less = (row['throughput'] or 0) < (base['throughput'] or 0) / (1 + tolerance)
+            line += f"   {base['p95'] * 1000:.1f}ms / {base['throughput'] or 0:.1f}"
+            if slower or less:
+                line += "  ⚠ regresión"
+                regressions.append(stage)
+        print(line)
+    return regressions
+
+
+def bench_suite(args):
+    """
+    Recorrido completo sin red: scraping, guardado, ordenación por votos,
+    filtro y traducción contra el sustituto local de ithome.com y un traductor falso,
+    comparado con la línea base guardada en SUITE_BASELINE.
+    """
+    params = {'month': args.month, 'days': args.days, 'per_day': args.per_day, 'latency': args.latency,
+              'error_rate': args.error_rate, 'concurrency': args.concurrency, 'rate': args.rate}
+    month = synthetic_month(args.month, args.per_day, seed=args.seed)
+    baseline_path = os.path.abspath(args.baseline)
+    real_config_path = os.path.abspath('config.ini')
+    workdir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    METRICS.reset()
+    start = time.perf_counter()
+    try:
+        output = io.StringIO()
+        with StandInServer(month, args.latency, args.error_rate) as standin, standin.proxy():
+            # Los módulos medidos imprimen cada noticia: solo se muestra con --verbose
+            with contextlib.redirect_stdout(None if args.verbose else output):
+                items = run_suite(args, month, real_config_path)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir)
+    elapsed = time.perf_counter() - start
+    metrics = METRICS.snapshot()
+    report = suite_report(items, metrics)
+
+    counters = metrics['counters']
+    print(f"Mes sintético {args.month}: {sum(map(len, month.values()))} noticias, {args.days} días medidos, "
+          f"{elapsed:.2f} s en total")
+    print(f"Servidor local: {standin.requests} peticiones, {standin.errors} errores inyectados; "
+          f"reintentos HTTP {counters.get('http.retries', 0)}, de traducción {counters.get('translation.retries', 0)}")
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('params') != params:
+            print(f"La línea base se midió con otros parámetros ({baseline.get('params')}), no se compara")
+            baseline = {}
+    regressions = compare_with_baseline(report, baseline, args.tolerance)
+
+    if items['fetch_all_news'] != args.days * args.per_day:
+        raise SystemExit(f"Se esperaban {args.days * args.per_day} noticias descargadas, llegaron {items['fetch_all_news']}")
+    if args.update_baseline:
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump({'params': params, 'stages': report}, f, ensure_ascii=False, indent=1)
+            f.write('\n')
+        print(f"Línea base actualizada en {args.baseline}")
+    elif regressions and args.strict:
+        raise SystemExit(f"Regresiones frente a la línea base: {', '.join(regressions)}")
+
+
+def bench_rescore(args):
+    """
+    Re-puntuación selectiva de un día contra el sustituto local de ithome.com.
+    Tras ordenar el día se hacen varias pasadas, un día más tarde cada una;
+    antes de las dos primeras cambian los votos de una fracción de las
+    noticias. Cada pasada debe pedir solo los votos que aún cambian y dejar
+    las mismas puntuaciones que una descarga completa.
+    """
+    month = synthetic_month(args.month, args.per_day, seed=args.seed)
+    day = sorted(month)[args.day_index]
+    news_list = month[day]
+    rng = random.Random(args.seed)
+    changing = rng.sample(news_list, int(len(news_list) * args.changing))
+    config = configparser.ConfigParser()
+    config['NewsSorter'] = {'concurrency': '16', 'rate_per_host': '1000'}
+    # Ordenación habitual: a las 17:30 del día siguiente
+    sorted_at = datetime.strptime(day, '%Y-%m-%d') + timedelta(days=1, hours=17, minutes=30)
+
+    workdir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    rounds = []
+    try:
+        write_archive(month, [day], "news_archive")
+        with StandInServer(month, args.latency, 0) as standin, standin.proxy(), NewsStore() as store:
+            for round_number in range(5):
+                if 1 <= round_number <= 2:
+                    for news in changing:
+                        standin.add_votes(news['link'], 1 + round_number, round_number % 2)
+                now = sorted_at + timedelta(days=round_number)
+                requests_before = standin.requests
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    if round_number == 0:
+                        sort_day(store, day, store.day_news(day), config, now)
+                    else:
+                        rescore_days(store, [day], config, now)
+                rounds.append((now, standin.requests - requests_before, time.perf_counter() - start))
+            rows = store.day_news(day, hidden=True)
+            late_order = [row['score'] for row in store.day_news(day, now=sorted_at + timedelta(days=30))]
+            snapshots = store.conn.execute("SELECT COUNT(*) FROM votes").fetchone()[0]
+            extra_votes = dict(standin.extra_votes)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir)
+
+    print(f"{day}: {len(news_list)} noticias, {len(changing)} con votos que cambian; {snapshots} lecturas guardadas")
+    for round_number, (now, requests, elapsed) in enumerate(rounds):
+        label = "ordenación completa" if round_number == 0 else f"re-puntuación {round_number}"
+        print(f"  {label:<20} {now:%Y-%m-%d %H:%M}  {requests:>4} peticiones "
+              f"({requests / len(news_list):.0%} de una descarga completa)  {elapsed:.2f} s")
+
+    expected = {}
+    for news in news_list:
+        path = urlsplit(news['link']).path
+        votes = (votes + extra for votes, extra in zip(article_votes(news['link']), extra_votes.get(path, (0, 0))))
+        expected[news['link']] = calculate_score(*votes)
+    mismatches = [row['link'] for row in rows if row['score'] != expected[row['link']]]
+    if mismatches:
+        raise SystemExit(f"{len(mismatches)} puntuaciones distintas de una descarga completa, p. ej. {mismatches[0]}")
+    if any(later > earlier for earlier, later in zip(late_order, late_order[1:])):
+        raise SystemExit("Con todas las noticias antiguas el orden leído no sigue la puntuación base")
+    if rounds[4][1]:
+        raise SystemExit(f"Sin votos que cambien, la última pasada aún hizo {rounds[4][1]} peticiones")
+    print("Puntuaciones iguales a las de una descarga completa; orden ajustado al leer correcto")
+
+
+def check_batch_scoring(now):
+    """Compara calculate_scores / adjust_scores con las funciones escalares; devuelve los casos probados"""
+    votes = [(valuable, unvaluable) for valuable in range(60) for unvaluable in range(60)]
+    valuable, unvaluable = (np.array(column) for column in zip(*votes))
+    scalar = np.array([calculate_score(*pair) for pair in votes], dtype=np.float64)
+    vectorized = calculate_scores(valuable, unvaluable)
+    if not np.array_equal(scalar, vectorized):
+        bad = np.flatnonzero(scalar != vectorized)[0]
+        raise SystemExit(f"calculate_scores{votes[bad]}: {vectorized[bad]} != {scalar[bad]}")
+
+    # Justo en los límites de 1, 3 y 24 horas, a ambos lados, y horas que no se pueden leer
+    offsets = [0, 1, -5] + [limit + delta for limit in (3600, 3 * 3600, 24 * 3600) for delta in (-1, 0, 1)]
+    offsets += random.Random(0).sample(range(-3600, 40 * 86400), 500)
+    times = [(now.replace(microsecond=0) - timedelta(seconds=offset)).strftime('%Y-%m-%d %H:%M:%S')
+             for offset in offsets]
+    times += [None, '', '2025-10-26', '2025-13-01 00:00:00', '26/10/2025 12:00:00']
+    published = parse_times(times)
+    cases = 0
+    scores = np.unique(scalar)
+    # -10, 0 y una muestra del resto de puntuaciones posibles
+    for score in np.r_[scores[:2], random.Random(0).sample(list(scores[2:]), 40)]:
+        expected = np.array([adjust_value_based_on_time(float(score), value, now) for value in times])
+        adjusted = adjust_scores(np.full(len(times), score), published, now)
+        if not np.array_equal(expected, adjusted):
+            bad = np.flatnonzero(expected != adjusted)[0]
+            raise SystemExit(f"adjust_scores({score}, {times[bad]!r}): {adjusted[bad]} != {expected[bad]}")
+        cases += len(times)
+    return len(votes) + cases
+
+
+def bench_scoring(args):
+    """
+    Puntuación vectorizada (batch_scoring): igualdad exacta con las funciones
+    escalares, ranking de todo el archivo por día, semana y mes, y el mismo
+    orden que NewsStore.day_news en una muestra de días.
+    """
+    # Con microsegundos, para comprobar también ese redondeo
+    now = datetime.now().replace(microsecond=250000)
+    print(f"Igualdad con scoring.py: {check_batch_scoring(now)} casos idénticos")
+
+    workdir = tempfile.mkdtemp()
+    try:
+        shutil.copytree("news_archive", f"{workdir}/news_archive",
+                        ignore=shutil.ignore_patterns('search.db', 'columnar', 'metrics'))
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            with NewsStore() as store:
+                for path in sorted(glob.glob("news_archive/[0-9]*-[0-9]*")):
+                    store.ensure_month(os.path.basename(path))
+                days = [row[0] for row in store.conn.execute("SELECT day FROM days ORDER BY day")]
+                # El archivo aún no tiene lecturas de votos: los días de muestra se puntúan con votos al azar
+                rng = random.Random(args.seed)
+                sample = rng.sample(days, min(args.sample_days, len(days)))
+                for day in sample:
+                    links = [row['link'] for row in store.day_news(day, hidden=True)]
+                    votes = {link: (rng.randrange(30), rng.randrange(8), None) for link in links}
+                    store.add_votes(now - timedelta(hours=rng.randrange(1, 48)), votes)
+                    store.set_scores(day, links, {link: calculate_score(valuable, unvaluable)
+                                                  for link, (valuable, unvaluable, _) in votes.items()})
+                start = time.perf_counter()
+                arrays = load_votes(store, days[0], days[-1])
+                load_time = time.perf_counter() - start
+                rankings = {}
+                for period in PERIODS:
+                    start = time.perf_counter()
+                    rankings[period] = rank_periods(arrays, period, now)
+                    print(f"  ranking por {period:<6} {len(rankings[period]):>5} periodos  "
+                          f"{time.perf_counter() - start:.3f} s")
+
+                # Lo mismo una noticia a la vez con las funciones escalares
+                start = time.perf_counter()
+                by_day = {}
+                for index in range(len(arrays)):
+                    score = calculate_score(int(arrays.valuable[index]), int(arrays.unvaluable[index]))
+                    published = None if np.isnat(arrays.published[index]) else \
+                        str(arrays.published[index]).replace('T', ' ')
+                    by_day.setdefault(str(arrays.days[index]), []).append(
+                        (-adjust_value_based_on_time(score, published, now), index))
+                for entries in by_day.values():
+                    entries.sort()
+                scalar_time = time.perf_counter() - start
+
+                for day in sample:
+                    expected = [row['link'] for row in store.day_news(day, now=now)]
+                    ranked = [arrays.links[index] for index in rankings['day'].get(day, [])]
+                    if ranked != expected:
+                        raise SystemExit(f"{day}: el ranking vectorizado no coincide con NewsStore.day_news")
+        finally:
+            os.chdir(cwd)
+    finally:
+        shutil.rmtree(workdir)
+    print(f"{len(arrays)} noticias de {len(days)} días: carga {load_time:.2f} s; "
+          f"puntuación y orden escalares por día {scalar_time:.2f} s")
+    print(f"Orden por día igual al de NewsStore.day_news en {len(sample)} días de muestra")
+
+
+# Lectura anterior a archive_reader: fichero entero en memoria y un patrón por formato
+LEGACY_PATTERN_HTML = re.compile(r'<p><a href="(.*?)">(.*?)</a></p>')
+LEGACY_PATTERN_MD = re.compile(r'\[(.*?)\]\((.*?)\)')
+
+
+def legacy_parse_file(filename):
+    with open(filename, 'r', encoding='utf-8') as f:
+        text = f.read()
+    matches = LEGACY_PATTERN_HTML.findall(text)
+    if matches:
+        return [(title, link) for link, title in matches]
+    return LEGACY_PATTERN_MD.findall(text)
+
+
+def peak_memory(func):
+    """(resultado, segundos, pico de memoria en bytes) de func(); el tiempo se mide sin tracemalloc"""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        result = func()
+        return result, elapsed, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_reader(args):
+    """
+    archive_reader frente a la lectura anterior: mismas entradas en todos los
+    ficheros del archivo, tiempo y pico de memoria en el 00.md más grande,
+    caché por mtime e importación de un mes en un almacén vacío.
+    """
+    filenames = sorted(glob.glob("news_archive/[0-9]*-[0-9]*/*.md") + glob.glob("news_archive/es/*.md"))
+    start = time.perf_counter()
+    for filename in filenames:
+        if list(iter_entries(filename)) != legacy_parse_file(filename):
+            raise SystemExit(f"{filename}: archive_reader no devuelve las mismas entradas")
+    print(f"{len(filenames)} ficheros: mismas entradas que la lectura anterior "
+          f"({time.perf_counter() - start:.2f} s en comparar)")
+
+    largest = max(glob.glob("news_archive/[0-9]*-[0-9]*/00.md"), key=os.path.getsize)
+    size = os.path.getsize(largest)
+    legacy, legacy_time, legacy_peak = peak_memory(lambda: len(legacy_parse_file(largest)))
+    streamed, stream_time, stream_peak = peak_memory(lambda: sum(1 for _ in iter_entries(largest)))
+    print(f"{largest} ({size / 1024:.0f} KiB, {streamed} entradas):")
+    print(f"  lectura anterior  {legacy_time * 1000:7.1f} ms  pico {legacy_peak / 1024:8.0f} KiB")
+    print(f"  archive_reader    {stream_time * 1000:7.1f} ms  pico {stream_peak / 1024:8.0f} KiB")
+    if streamed != legacy:
+        raise SystemExit("Distinto número de entradas")
+
+    cache = ParseCache()
+    start = time.perf_counter()
+    for filename in filenames:
+        cache.entries(filename)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    for filename in filenames:
+        cache.entries(filename)
+    print(f"  ParseCache: {cold:.2f} s en frío, {time.perf_counter() - start:.3f} s con el archivo sin cambios "
+          f"({cache.hits} aciertos)")
+
+    year_month = os.path.basename(os.path.dirname(largest))
+    workdir = tempfile.mkdtemp()
+    try:
+        def import_month():
+            # Cada llamada importa en un almacén nuevo
+            path = tempfile.mktemp(suffix='.db', dir=workdir)
+            with NewsStore(path, archive_dir="news_archive") as store:
+                store.ensure_month(year_month)
+                return store.conn.execute("SELECT COUNT(*) FROM news WHERE month = ?", (year_month,)).fetchone()[0]
+        imported, import_time, import_peak = peak_memory(import_month)
+    finally:
+        shutil.rmtree(workdir)
+    print(f"  importación de {year_month} en un almacén vacío: {imported} noticias, {import_time:.2f} s, "
+          f"pico {import_peak / 1024:.0f} KiB")
+
+
+def check_digests(store, days, top_k):
+    """Compara cada resumen con el top_k de ordenar todas las noticias visibles de su periodo"""
+    heaps = DigestHeaps(top_k=top_k)
+    periods = {}
+    for row in store.conn.execute("SELECT day, link, title_es, score FROM news WHERE title_es IS NOT NULL"):
+        if row['day'] in days and not row['title_es'].endswith(FAILED_SUFFIX):
+            for label in period_labels(row['day']):
+                entries = periods.setdefault(label, [])
+                if (row['score'] or 0) > HIDDEN_SCORE:
+                    entries.append([row['score'] or 0, row['day'], row['link'], row['title_es']])
+    for label, entries in periods.items():
+        if sorted(entries, reverse=True)[:top_k] != heaps.top(label):
+            raise SystemExit(f"{label}: el resumen no coincide con el top-{top_k} del periodo")
+        with open(f"news_archive/es/digest/{label}.md", 'r', encoding='utf-8') as f:
+            if f.read() != heaps.render(label):
+                raise SystemExit(f"{label}: el fichero no coincide con el montículo")
+    return periods
+
+
+def bench_digest(args):
+    """
+    Resúmenes incrementales sobre una copia del archivo: se añaden los días
+    traducidos uno a uno y cada resumen debe coincidir con el top-K que sale
+    de ordenar todas las noticias de su periodo.
+    """
+    workdir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        shutil.copytree("news_archive", f"{workdir}/news_archive",
+                        ignore=shutil.ignore_patterns('search.db', 'columnar', 'metrics', 'digest*'))
+        os.chdir(workdir)
+        rng = random.Random(args.seed)
+        with NewsStore() as store:
+            days = sorted(os.path.basename(path)[:-3] for path in glob.glob("news_archive/es/*.md"))
+            for year_month in sorted({day[:7] for day in days}):
+                store.ensure_month(year_month)
+            # El archivo apenas tiene votos: puntuaciones al azar (con empates) para las traducidas
+            links = [row[0] for row in store.conn.execute("SELECT link FROM news WHERE title_es IS NOT NULL")]
+            store.conn.executemany("UPDATE news SET score = ? WHERE link = ?",
+                                   [(rng.choice([-10, 0, rng.randrange(40), rng.random() * 10]), link)
+                                    for link in links])
+            store.commit()
+
+            timings = []
+            for day in days:
+                start = time.perf_counter()
+                update_digests(store, [day], top_k=args.top_k)
+                timings.append(time.perf_counter() - start)
+
+            periods = check_digests(store, days, args.top_k)
+
+            # Re-puntuación a la baja: las mejores de algunos días pasan a -10 u 0 y
+            # las que se descartaron antes tienen que volver a entrar
+            lowered = rng.sample(days, min(args.lowered, len(days)))
+            start = time.perf_counter()
+            for day in lowered:
+                top = store.conn.execute("SELECT link FROM news WHERE day = ? AND title_es IS NOT NULL "
+                                         "ORDER BY score DESC LIMIT 3", (day,)).fetchall()
+                store.conn.executemany("UPDATE news SET score = ? WHERE link = ?",
+                                       [(rng.choice([HIDDEN_SCORE, 0]), row[0]) for row in top])
+                update_digests(store, [day], top_k=args.top_k)
+            lowered_time = time.perf_counter() - start
+            check_digests(store, days, args.top_k)
+
+            # Lo que costaría rehacer cada día los dos resúmenes leyendo sus periodos enteros
+            start = time.perf_counter()
+            for day in days:
+                date_obj = datetime.strptime(day, '%Y-%m-%d')
+                monday = date_obj - timedelta(days=date_obj.weekday())
+                for first, last in ((f"{monday:%Y-%m-%d}", f"{monday + timedelta(days=6):%Y-%m-%d}"),
+                                    (f"{day[:7]}-01", f"{day[:7]}-31")):
+                    rows = store.conn.execute(
+                        "SELECT score, day, link, title_es FROM news WHERE day BETWEEN ? AND ? "
+                        "AND title_es IS NOT NULL", (first, last)).fetchall()
+                    sorted(([row[0] or 0, *row[1:]] for row in rows), reverse=True)[:args.top_k]
+            rescan = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir)
+    weeks = sum(1 for label in periods if '-W' in label)
+    print(f"{len(days)} días traducidos, {weeks} semanas y {len(periods) - weeks} meses: "
+          f"resúmenes iguales al top-{args.top_k} de cada periodo")
+    print(f"  actualización por día: media {sum(timings) / len(timings) * 1000:.1f} ms, "
+          f"primeros 20 días {sum(timings[:20]) / 20 * 1000:.1f} ms, últimos 20 {sum(timings[-20:]) / 20 * 1000:.1f} ms")
+    print(f"  rehaciendo cada día los dos periodos desde el almacén: {rescan / len(days) * 1000:.1f} ms por día")
+    print(f"  {len(lowered)} días re-puntuados a la baja (se rehacen sus periodos): "
+          f"{lowered_time / max(len(lowered), 1) * 1000:.1f} ms por día, resúmenes iguales al top-{args.top_k}")
+
+
+def directory_files(directory):
+    """{ruta relativa: contenido} de todos los ficheros bajo directory"""
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                files[os.path.relpath(path, directory)] = f.read()
+    return files
+
+
+def bench_feeds(args):
+    """
+    Feeds e índice estático sobre una copia de news_archive/es: construcción
+    completa, actualizaciones incrementales (un día que cambia, un día nuevo
+    en un mes nuevo y una ejecución sin cambios) comparadas con una
+    reconstrucción desde cero, y peticiones condicionales al servidor local.
+    """
+    workdir = tempfile.mkdtemp()
+    try:
+        es_dir = f"{workdir}/es"
+        shutil.copytree("news_archive/es", es_dir, ignore=shutil.ignore_patterns('digest'))
+        feed_dir = f"{workdir}/feed"
+        days = sorted(os.path.basename(path)[:-3] for path in glob.glob(f"{es_dir}/*.md"))
+
+        start = time.perf_counter()
+        built = update_feeds(es_dir=es_dir, feed_dir=feed_dir, feed_days=args.feed_days, base_url='')
+        full_time = time.perf_counter() - start
+
+        # Cambia un día antiguo, aparece uno nuevo (mes nuevo) y una ejecución sin cambios
+        old_day = days[len(days) // 2]
+        with open(f"{es_dir}/{old_day}.md", 'a', encoding='utf-8') as f:
+            f.write('<p><a href="https://www.ithome.com/0/999/999.htm">Noticia añadida</a></p>\n')
+        new_day = (datetime.strptime(days[-1], '%Y-%m-%d') + timedelta(days=40)).strftime('%Y-%m-%d')
+        shutil.copyfile(f"{es_dir}/{days[-1]}.md", f"{es_dir}/{new_day}.md")
+        runs = []
+        for label, changed in ((f"día cambiado ({old_day})", [old_day]), (f"día nuevo ({new_day})", [new_day]),
+                               ("sin cambios", [new_day]), ("comprobando todo es/ sin cambios", None)):
+            start = time.perf_counter()
+            written = update_feeds(changed, es_dir=es_dir, feed_dir=feed_dir, feed_days=args.feed_days, base_url='')
+            runs.append((label, time.perf_counter() - start, written))
+
+        rebuilt_dir = f"{workdir}/rebuilt"
+        update_feeds(rebuild=True, es_dir=es_dir, feed_dir=rebuilt_dir, feed_days=args.feed_days, base_url='')
+        if directory_files(feed_dir) != directory_files(rebuilt_dir):
+            raise SystemExit("La actualización incremental no coincide con la reconstrucción desde cero")
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), feed_handler(feed_dir))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/rss.xml"
+            with urlopen(url) as response:
+                tag, size = response.headers['ETag'], len(response.read())
+            try:
+                urlopen(Request(url, headers={'If-None-Match': tag}))
+                raise SystemExit("La petición condicional no devolvió 304")
+            except HTTPError as error:
+                if error.code != 304:
+                    raise
+        finally:
+            server.shutdown()
+            server.server_close()
+    finally:
+        shutil.rmtree(workdir)
+
+    months = len({day[:7] for day in days})
+    print(f"{len(days)} días en {months} meses: construcción completa {full_time:.2f} s, {len(built)} ficheros")
+    for label, seconds, written in runs:
+        names = ', '.join(os.path.relpath(path, feed_dir) for path in written)
+        print(f"  {label}: {seconds * 1000:.0f} ms, {len(written)} ficheros ({names})")
+    print("  resultado igual a una reconstrucción desde cero")
+    print(f"  GET rss.xml: 200 con ETag {tag} ({size} bytes); con If-None-Match: 304")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks offline de ianews")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    dedup_parser = subparsers.add_parser('dedup', help="índice de duplicados reproduciendo un mes día a día")
+    dedup_parser.add_argument('--month', default='2025-10', help="mes a reproducir (YYYY-MM)")
+    dedup_parser.add_argument('--verify', action='store_true',
+                              help="compara con la búsqueda todos-contra-todos (lento)")
+    dedup_parser.set_defaults(func=bench_dedup)
+
+    list_parser = subparsers.add_parser('list', help="parseo de la página de archivo de IT之家")
+    list_parser.add_argument('--fixture', default=f"{FIXTURES_DIR}/ithome_list_2025-10-26.html")
+    list_parser.add_argument('--repeat', type=int, default=20)
+    list_parser.set_defaults(func=bench_list)
+
+    filter_parser = subparsers.add_parser('filter', help="filtro de IA sobre todo news_archive")
+    filter_parser.add_argument('--cases', default=f"{FIXTURES_DIR}/ai_filter_cases.tsv")
+    filter_parser.add_argument('--show', type=int, default=0, help="muestra N títulos que cambian")
+    filter_parser.set_defaults(func=bench_filter)
+
+    search_parser = subparsers.add_parser('search', help="consultas sobre el índice de búsqueda")
+    search_parser.add_argument('--year', default='2025')
+    search_parser.set_defaults(func=bench_search)
+
+    columnar_parser = subparsers.add_parser('columnar', help="formato columnar frente a los .md")
+    columnar_parser.add_argument('--month', default='2025-10')
+    columnar_parser.set_defaults(func=bench_columnar)
+
+    sources_parser = subparsers.add_parser('sources', help="motor de fuentes contra un servidor local")
+    sources_parser.set_defaults(func=bench_sources)
+
+    backfill_parser = subparsers.add_parser('backfill', help="relleno paralelo contra un servidor local")
+    backfill_parser.add_argument('--days', type=int, default=30)
+    backfill_parser.add_argument('--workers', type=int, default=8)
+    backfill_parser.add_argument('--rate', type=float, default=20.0)
+    backfill_parser.set_defaults(func=bench_backfill)
+
+    incremental_parser = subparsers.add_parser('incremental', help="descargas condicionales e incrementales")
+    incremental_parser.add_argument('--new', type=int, default=5, help="noticias publicadas entre ejecuciones")
+    incremental_parser.set_defaults(func=bench_incremental)
+
+    driverpool_parser = subparsers.add_parser('driverpool', help="pool de WebDriver con navegadores simulados")
+    driverpool_parser.add_argument('--pages', type=int, default=200)
+    driverpool_parser.add_argument('--size', type=int, default=3)
+    driverpool_parser.add_argument('--max-pages', type=int, default=20)
+    driverpool_parser.set_defaults(func=bench_driverpool)
+
+    suite_parser = subparsers.add_parser('suite', help="recorrido completo contra ithome y traductor locales")
+    suite_parser.add_argument('--month', default='2025-10', help="mes del archivo sintético")
+    suite_parser.add_argument('--days', type=int, default=3, help="días que se descargan y procesan")
+    suite_parser.add_argument('--per-day', type=int, default=200, help="noticias por día")
+    suite_parser.add_argument('--seed', type=int, default=1)
+    suite_parser.add_argument('--latency', type=float, default=0.02, help="segundos por petición")
+    suite_parser.add_argument('--error-rate', type=float, default=0.02, help="fracción de rutas que fallan una vez")
+    suite_parser.add_argument('--concurrency', type=int, default=8, help="hilos de descarga de votos")
+    suite_parser.add_argument('--rate', type=float, default=50.0, help="peticiones por segundo al host")
+    suite_parser.add_argument('--baseline', default=SUITE_BASELINE)
+    suite_parser.add_argument('--tolerance', type=float, default=0.5, help="empeoramiento admitido (0.5 = 50%%)")
+    suite_parser.add_argument('--update-baseline', action='store_true')
+    suite_parser.add_argument('--strict', action='store_true', help="falla si hay regresiones")
+    suite_parser.add_argument('--verbose', action='store_true', help="muestra la salida de los módulos medidos")
+    suite_parser.set_defaults(func=bench_suite)
+
+    rescore_parser = subparsers.add_parser('rescore', help="re-puntuación selectiva con historial de votos")
+    rescore_parser.add_argument('--month', default='2025-10', help="mes del archivo sintético")
+    rescore_parser.add_argument('--day-index', type=int, default=0, help="día del mes que se puntúa")
+    rescore_parser.add_argument('--per-day', type=int, default=300, help="noticias del día")
+    rescore_parser.add_argument('--changing', type=float, default=0.1, help="fracción de noticias cuyos votos cambian")
+    rescore_parser.add_argument('--latency', type=float, default=0.005, help="segundos por petición")
+    rescore_parser.add_argument('--seed', type=int, default=1)
+    rescore_parser.set_defaults(func=bench_rescore)
+
+    scoring_parser = subparsers.add_parser('scoring', help="puntuación vectorizada frente a la escalar")
+    scoring_parser.add_argument('--sample-days', type=int, default=50, help="días cuyo orden se compara con el almacén")
+    scoring_parser.add_argument('--seed', type=int, default=1)
+    scoring_parser.set_defaults(func=bench_scoring)
+
+    reader_parser = subparsers.add_parser('reader', help="lectura en streaming del archivo")
+    reader_parser.set_defaults(func=bench_reader)
+
+    digest_parser = subparsers.add_parser('digest', help="resúmenes semanales y mensuales incrementales")
+    digest_parser.add_argument('--top-k', type=int, default=10)
+    digest_parser.add_argument('--seed', type=int, default=1)
+    digest_parser.add_argument('--lowered', type=int, default=20, help="días que se re-puntúan a la baja")
+    digest_parser.set_defaults(func=bench_digest)
+
+    feeds_parser = subparsers.add_parser('feeds', help="feeds e índice estático incrementales")
+    feeds_parser.add_argument('--feed-days', type=int, default=7)
+    feeds_parser.set_defaults(func=bench_feeds)
+
+    args = parser.parse_args()
+    switch_to_parent_if_src()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
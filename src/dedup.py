@@ -0,0 +1,161 @@
+"""Índice de duplicados aproximados para las noticias del mes"""
+
+import difflib
+import functools
+import hashlib
+import random
+import re
+from collections import Counter
+
+# Parámetros del índice MinHash/LSH
+NUM_PERM = 64          # Número de funciones hash de la firma
+BANDS = 32             # Bandas LSH (NUM_PERM / BANDS filas por banda)
+SHINGLE_SIZE = 2       # Tamaño de los n-gramas de caracteres
+SHORT_TITLE_LEN = 12   # Títulos más cortos se comparan siempre (pocos shingles)
+THRESHOLD = 0.9
+
+ENTRY_PATTERN = re.compile(r'^- \[(.*)\]\((.*?)\)\s*$')
+NORMALIZE_PATTERN = re.compile(r'[\W_]+')
+
+_MASK_SEED = 20240508
+
+
+def split_entry(entry):
+    """Devuelve (título, link) de una línea '- [título](link)'; si no encaja, (línea, None)"""
+    match = ENTRY_PATTERN.match(entry)
+    if match:
+        return match.group(1), match.group(2)
+    return entry.strip(), None
+
+
+def normalize_title(title):
+    """Minúsculas y sin espacios ni signos de puntuación"""
+    return NORMALIZE_PATTERN.sub('', title.lower())
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Conjunto de n-gramas de caracteres del texto"""
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def similarity_ratio(entry1, entry2):
+    """Mismo ratio (redondeado) que usa script.is_similar, sin imprimir nada"""
+    return round(difflib.SequenceMatcher(None, entry1, entry2).ratio(), 4)
+
+
+@functools.lru_cache(maxsize=65536)
+def shingle_hash(shingle):
+    """Hash de 64 bits estable entre procesos (hash() de str cambia con PYTHONHASHSEED)"""
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+@functools.lru_cache(maxsize=65536)
+def _char_counts(text):
+    return Counter(text)
+
+
+def could_be_similar(entry1, entry2, threshold=THRESHOLD):
+    """
+    Cotas superiores baratas del ratio de difflib (las de real_quick_ratio y
+    quick_ratio, solo cuentan caracteres): si no superan el umbral, el ratio
+    tampoco y no hace falta construir el SequenceMatcher.
+    """
+    total = len(entry1) + len(entry2)
+    if not total or 2 * min(len(entry1), len(entry2)) / total <= threshold:
+        return False
+    common = sum((_char_counts(entry1) & _char_counts(entry2)).values())
+    return 2 * common / total > threshold
+
+
+def quiet_is_similar(entry1, entry2, threshold=THRESHOLD):
+    return could_be_similar(entry1, entry2, threshold) and similarity_ratio(entry1, entry2) > threshold
+
+
+class DedupIndex:
+    """
+    Índice de duplicados construido una vez por ejecución.
+
+    Los candidatos salen del índice (bandas LSH sobre MinHash de los n-gramas
+    del título normalizado, hash exacto del link y, para títulos muy cortos,
+    la lista de títulos cortos); SequenceMatcher solo se ejecuta sobre ellos.
+    """
+
+    def __init__(self, entries=(), similar=quiet_is_similar,
+                 num_perm=NUM_PERM, bands=BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm debe ser múltiplo de bands")
+        self.similar = similar
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(_MASK_SEED)
+        self._masks = [rng.getrandbits(64) for _ in range(num_perm)]
+        self._buckets = [{} for _ in range(bands)]
+        self._by_link = {}
+        self._short = []
+        self._entries = set()
+        self._last_keys = (None, None)
+        self.queries = 0
+        self.comparisons = 0
+        self.update(entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, entry):
+        return entry in self._entries
+
+    def _signature(self, normalized):
+        hashes = [shingle_hash(s) for s in shingles(normalized)]
+        return [min(h ^ mask for h in hashes) for mask in self._masks]
+
+    def _band_keys(self, normalized):
+        # is_duplicate(entry) suele ir seguido de add(entry): se reutiliza la última firma
+        if self._last_keys[0] == normalized:
+            return self._last_keys[1]
+        signature = self._signature(normalized)
+        rows = self.rows
+        keys = [tuple(signature[b * rows:(b + 1) * rows]) for b in range(self.bands)]
+        self._last_keys = (normalized, keys)
+        return keys
+
+    def add(self, entry):
+        """Añade una línea al índice (se guarda tal cual para comparar igual que antes)"""
+        if entry in self._entries:
+            return
+        self._entries.add(entry)
+        title, link = split_entry(entry.rstrip('\n'))
+        normalized = normalize_title(title)
+        if link:
+            self._by_link.setdefault(link, []).append(entry)
+        if len(normalized) <= SHORT_TITLE_LEN:
+            self._short.append(entry)
+        for bucket, key in zip(self._buckets, self._band_keys(normalized)):
+            bucket.setdefault(key, []).append(entry)
+
+    def update(self, entries):
+        for entry in entries:
+            self.add(entry)
+
+    def candidates(self, entry):
+        """Entradas del índice que pueden ser duplicadas de 'entry', sin repetir y en orden estable"""
+        title, link = split_entry(entry.rstrip('\n'))
+        normalized = normalize_title(title)
+        found = {}
+        if link in self._by_link:
+            found.update(dict.fromkeys(self._by_link[link]))
+        if len(normalized) <= SHORT_TITLE_LEN:
+            found.update(dict.fromkeys(self._short))
+        for bucket, key in zip(self._buckets, self._band_keys(normalized)):
+            found.update(dict.fromkeys(bucket.get(key, ())))
+        return found.keys()
+
+    def is_duplicate(self, entry):
+        """True si alguna entrada del índice supera el umbral de similitud"""
+        self.queries += 1
+        for candidate in self.candidates(entry):
+            self.comparisons += 1
+            if self.similar(entry, candidate):
+                return True
+        return False
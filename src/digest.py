@@ -0,0 +1,231 @@
+"""
+Resúmenes semanales y mensuales con las mejores noticias de IA traducidas.
+
+Para cada periodo (semana ISO y mes) se guarda un montículo de mínimos con
+las top_k noticias de mayor puntuación vistas hasta ahora. Al puntuar y
+traducir un día solo se añaden sus noticias (O(nuevas · log K)) y se
+reescriben los dos resúmenes afectados; nunca se vuelve a leer el resto del
+periodo. Si una noticia ya está en el montículo (p. ej. tras re-puntuar un
+día anterior) se sustituye su entrada; si su puntuación baja (o pasa a -10,
+oculta), otra que ya se descartó podría volver a entrar, así que ese periodo
+se rehace desde el almacén. Las noticias ocultas no entran en los resúmenes.
+
+Cada montículo se guarda en news_archive/digest/<periodo>.json (solo se leen
+los de los periodos que se actualizan) y los resúmenes en
+news_archive/es/digest/<periodo>.md (2025-W43.md, 2025-10.md).
+
+Uso:
+    python src/digest.py [--day 2025-10-26]
+    python src/digest.py --from 2025-10-01 --to 2025-10-31   # reconstruye el rango
+"""
+
+import argparse
+import configparser
+import heapq
+import json
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from archive_writer import ArchiveWriter, atomic_write
+from news_store import ARCHIVE_DIR, NewsStore, html_entry, switch_to_parent_if_src
+from scoring import HIDDEN_SCORE
+
+CONFIG_PATH = 'config.ini'
+STATE_DIR = f"{ARCHIVE_DIR}/digest"
+DIGEST_DIR = f"{ARCHIVE_DIR}/es/digest"
+TOP_K = 10
+FAILED_SUFFIX = "(Traducción fallida)"
+
+
+def week_label(day):
+    """'2025-10-26' -> '2025-W43'"""
+    year, week, _ = date.fromisoformat(day).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def period_labels(day):
+    """Periodos a los que pertenece un día: su semana ISO y su mes"""
+    return [week_label(day), day[:7]]
+
+
+def period_title(label):
+    if '-W' in label:
+        year, week = label.split('-W')
+        monday = date.fromisocalendar(int(year), int(week), 1)
+        return f"Mejores noticias de IA - semana {label} ({monday} a {monday + timedelta(days=6)})"
+    return f"Mejores noticias de IA - {label}"
+
+
+def digest_path(label, digest_dir=DIGEST_DIR):
+    return f"{digest_dir}/{label}.md"
+
+
+class DigestHeaps:
+    """
+    Montículos de mínimos por periodo con las top_k noticias de más
+    puntuación. Cada entrada es [puntuación, día, link, título traducido]:
+    con la misma puntuación sale antes la del día más antiguo.
+    """
+
+    def __init__(self, state_dir=STATE_DIR, top_k=TOP_K):
+        self.state_dir = state_dir
+        self.top_k = top_k
+        self.heaps = {}
+        self.changed = set()
+        self.stale = set()
+        self._links = {}
+
+    def heap(self, label):
+        """Montículo del periodo, leído de su fichero la primera vez"""
+        if label not in self.heaps:
+            try:
+                with open(f"{self.state_dir}/{label}.json", 'r', encoding='utf-8') as f:
+                    self.heaps[label] = json.load(f)
+            except FileNotFoundError:
+                self.heaps[label] = []
+            self._links[label] = {entry[2] for entry in self.heaps[label]}
+        return self.heaps[label]
+
+    def clear(self, label):
+        self.heaps[label] = []
+        self._links[label] = set()
+        self.changed.add(label)
+        self.stale.discard(label)
+
+    def save(self):
+        """Guarda los montículos que cambiaron"""
+        for label in self.changed:
+            atomic_write(f"{self.state_dir}/{label}.json", json.dumps(self.heaps[label], ensure_ascii=False))
+
+    def add(self, label, score, day, link, title):
+        """
+        Añade una noticia al periodo; devuelve True si cambia su top_k. Si
+        una que ya estaba baja de puntuación, el periodo queda en 'stale'.
+        """
+        heap = self.heap(label)
+        links = self._links[label]
+        entry = [score, day, link, title]
+        if link in links:
+            # Re-puntuada: se sustituye su entrada (O(K), solo para las que ya están)
+            if score < next(current[0] for current in heap if current[2] == link):
+                self.stale.add(label)
+            heap[:] = [entry if current[2] == link else current for current in heap]
+            heapq.heapify(heap)
+            return True
+        if score <= HIDDEN_SCORE:
+            return False
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            links.discard(heapq.heapreplace(heap, entry)[2])
+        else:
+            return False
+        links.add(link)
+        return True
+
+    def add_day(self, day, rows, labels=None):
+        """
+        Añade las noticias traducidas de un día a sus periodos (solo a los de
+        'labels', si se indica); devuelve los periodos que cambiaron
+        """
+        day_labels = [label for label in period_labels(day) if labels is None or label in labels]
+        changed = set()
+        for row in rows:
+            title = row['title_es']
+            if not title or title.endswith(FAILED_SUFFIX):
+                continue
+            for label in day_labels:
+                if self.add(label, row['score'] or 0, day, row['link'], title):
+                    changed.add(label)
+        self.changed |= changed
+        return changed
+
+    def top(self, label):
+        """Entradas del periodo de mayor a menor puntuación"""
+        return sorted(self.heap(label), reverse=True)
+
+    def render(self, label):
+        lines = [f"# {period_title(label)}\n\n"]
+        lines += [html_entry(title, link) for _, _, link, title in self.top(label)]
+        return ''.join(lines)
+
+
+def load_top_k(config_path=CONFIG_PATH):
+    config = configparser.ConfigParser()
+    config.read(config_path, encoding='utf-8')
+    return config.getint('Digest', 'top_k', fallback=TOP_K)
+
+
+def translated_rows(store, day):
+    store.ensure_month(day[:7])
+    return store.conn.execute(
+        "SELECT link, title_es, score FROM news WHERE day = ? AND title_es IS NOT NULL", (day,))
+
+
+def update_digests(store, days, state_dir=STATE_DIR, digest_dir=DIGEST_DIR, top_k=None, heaps=None, labels=None):
+    """
+    Añade las noticias traducidas de 'days' a los montículos (de 'labels',
+    si se indica) y reescribe los resúmenes de los periodos que cambiaron.
+    Devuelve sus rutas.
+    """
+    heaps = heaps or DigestHeaps(state_dir, top_k or load_top_k())
+    for day in days:
+        heaps.add_day(day, translated_rows(store, day), labels)
+    for label in sorted(heaps.stale):
+        # Alguna noticia del top_k bajó: las descartadas antes pueden volver a entrar
+        heaps.clear(label)
+        for day in period_days(label):
+            heaps.add_day(day, translated_rows(store, day), {label})
+    with ArchiveWriter() as writer:
+        paths = [writer.stage(digest_path(label, digest_dir), heaps.render(label))
+                 for label in sorted(heaps.changed)]
+    heaps.save()
+    return paths
+
+
+def period_days(label):
+    """Todos los días ('YYYY-MM-DD') de un periodo"""
+    if '-W' in label:
+        year, week = label.split('-W')
+        first = date.fromisocalendar(int(year), int(week), 1)
+        count = 7
+    else:
+        first = date.fromisoformat(f"{label}-01")
+        count = ((first + timedelta(days=32)).replace(day=1) - first).days
+    return [(first + timedelta(days=i)).isoformat() for i in range(count)]
+
+
+def rebuild_digests(store, start, end, state_dir=STATE_DIR, digest_dir=DIGEST_DIR, top_k=None):
+    """
+    Vacía y vuelve a llenar los periodos de los días entre las fechas start y
+    end (p. ej. tras cambiar top_k), siempre completos
+    """
+    labels = {label for i in range((end - start).days + 1)
+              for label in period_labels((start + timedelta(days=i)).isoformat())}
+    heaps = DigestHeaps(state_dir, top_k or load_top_k())
+    for label in labels:
+        heaps.clear(label)
+    days = sorted({day for label in labels for day in period_days(label)})
+    return update_digests(store, days, digest_dir=digest_dir, heaps=heaps, labels=labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resúmenes semanales y mensuales de las mejores noticias de IA")
+    parser.add_argument('--day', help="día que se añade (YYYY-MM-DD); por defecto ayer en hora de China")
+    parser.add_argument('--from', dest='start', help="primer día de un rango que se reconstruye")
+    parser.add_argument('--to', dest='end', help="último día del rango")
+    args = parser.parse_args()
+
+    switch_to_parent_if_src()
+    with NewsStore() as store:
+        if args.start:
+            paths = rebuild_digests(store, date.fromisoformat(args.start), date.fromisoformat(args.end or args.start))
+        else:
+            day = args.day or (datetime.now(ZoneInfo('Asia/Shanghai')) - timedelta(days=1)).strftime('%Y-%m-%d')
+            paths = update_digests(store, [day])
+    for path in paths:
+        print(f"Resumen actualizado: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+"""
+Pool de Chrome (Selenium) compartido por los respaldos que renderizan páginas.
+
+- La ruta de ChromeDriver se resuelve una sola vez por proceso (o se toma de
+  la variable de entorno CHROMEDRIVER_PATH) en lugar de en cada arranque.
+- Los navegadores usan la estrategia de carga 'eager' (driver.get vuelve con
+  el DOM listo, sin esperar a imágenes ni iframes) y no descargan imágenes,
+  vídeo, fuentes ni los hosts de publicidad y analítica de BLOCKED_URLS.
+- DriverPool reparte hasta 'size' navegadores de larga duración entre hilos
+  y cierra cada uno tras 'max_pages' páginas para que no crezca la memoria.
+- Cada driver.get se cronometra; DriverPool.stats() resume los tiempos.
+
+La sección [WebDriver] de config.ini ajusta el tamaño del pool, el reciclado
+y el timeout de carga.
+"""
+
+import configparser
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import chromedriver_autoinstaller
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+from metrics import observe
+
+CONFIG_PATH = 'config.ini'
+POOL_SIZE = 1
+MAX_PAGES = 50
+PAGE_LOAD_TIMEOUT = 20
+
+CHROME_ARGUMENTS = [
+    '--headless',
+    '--disable-gpu',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--blink-settings=imagesEnabled=false',
+    '--autoplay-policy=user-gesture-required',
+    '--mute-audio',
+]
+# 2 = bloquear en la configuración de contenido de Chrome
+CHROME_PREFS = {
+    'profile.managed_default_content_settings.images': 2,
+    'profile.managed_default_content_settings.media_stream': 2,
+    'profile.managed_default_content_settings.notifications': 2,
+}
+# Patrones de Network.setBlockedURLs (CDP): recursos pesados y hosts de terceros
+BLOCKED_URLS = [
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.mp4', '*.webm', '*.m3u8', '*.mp3',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*googletagmanager.com*', '*google-analytics.com*', '*googlesyndication.com*',
+    '*doubleclick.net*', '*hm.baidu.com*', '*cnzz.com*', '*51.la*', '*adservice*',
+]
+
+
+@functools.lru_cache(maxsize=None)
+def chromedriver_path():
+    """
+    Ruta de ChromeDriver, resuelta una vez por proceso. Devuelve None si no
+    se puede resolver (Selenium Manager lo buscará por su cuenta).
+    """
+    path = os.environ.get('CHROMEDRIVER_PATH')
+    if path:
+        return path
+    try:
+        return chromedriver_autoinstaller.install()
+    except Exception as e:
+        print(f"No se pudo instalar ChromeDriver automáticamente: {e}")
+        return None
+
+
+def chrome_options():
+    options = webdriver.ChromeOptions()
+    for argument in CHROME_ARGUMENTS:
+        options.add_argument(argument)
+    options.add_experimental_option('prefs', CHROME_PREFS)
+    options.page_load_strategy = 'eager'
+    return options
+
+
+def new_driver(page_load_timeout=PAGE_LOAD_TIMEOUT, blocked_urls=BLOCKED_URLS):
+    """Chrome headless configurado para leer texto: carga 'eager' y recursos bloqueados"""
+    path = chromedriver_path()
+    service = Service(executable_path=path) if path else Service()
+    driver = webdriver.Chrome(service=service, options=chrome_options())
+    driver.set_page_load_timeout(page_load_timeout)
+    if blocked_urls:
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(blocked_urls)})
+        except Exception as e:
+            print(f"No se pudieron bloquear recursos por CDP: {e}")
+    return driver
+
+
+class PooledDriver:
+    """Envoltorio de un WebDriver que cuenta y cronometra las páginas cargadas"""
+
+    def __init__(self, driver, pool):
+        self._driver = driver
+        self._pool = pool
+        self.pages = 0
+
+    def get(self, url):
+        start = time.perf_counter()
+        try:
+            return self._driver.get(url)
+        finally:
+            self.pages += 1
+            self._pool.record(time.perf_counter() - start)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+
+class DriverPool:
+    """
+    Reparte navegadores entre hilos: 'with pool.driver() as driver' espera a
+    que haya uno libre (o crea uno nuevo si aún no hay 'size'), y al salir lo
+    devuelve al pool o lo cierra si ya cargó 'max_pages' páginas o si el
+    bloque terminó con una excepción.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_pages=MAX_PAGES, factory=new_driver):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.factory = factory
+        self._idle = []
+        self._live = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self.created = 0
+        self.recycled = 0
+        self.load_times = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def record(self, seconds):
+        observe('webdriver.page_load', seconds)
+        with self._condition:
+            self.load_times.append(seconds)
+
+    def _acquire(self):
+        with self._condition:
+            while not self._idle and self._live >= self.size and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                raise RuntimeError("El pool de WebDriver está cerrado")
+            if self._idle:
+                return self._idle.pop()
+            self._live += 1
+        # El navegador se arranca fuera del lock: otros hilos pueden seguir
+        start = time.perf_counter()
+        try:
+            driver = PooledDriver(self.factory(), self)
+        except BaseException:
+            self._release_slot()
+            raise
+        with self._condition:
+            self.created += 1
+        observe('webdriver.startup', time.perf_counter() - start)
+        return driver
+
+    def _release_slot(self):
+        with self._condition:
+            self._live -= 1
+            self._condition.notify()
+
+    def _retire(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error al cerrar WebDriver: {e}")
+        self._release_slot()
+
+    @contextmanager
+    def driver(self):
+        driver = self._acquire()
+        try:
+            yield driver
+        except BaseException:
+            # El navegador puede haber quedado en mal estado
+            self._retire(driver)
+            raise
+        with self._condition:
+            keep = not self._closed and driver.pages < self.max_pages
+            if keep:
+                self._idle.append(driver)
+                self._condition.notify()
+            elif not self._closed:
+                self.recycled += 1
+        if not keep:
+            self._retire(driver)
+
+    def close(self):
+        """Cierra los navegadores libres; los que estén en uso se cierran al devolverse"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for driver in idle:
+            self._retire(driver)
+
+    def stats(self):
+        """Resumen de los tiempos de carga de página (segundos)"""
+        with self._condition:
+            times = sorted(self.load_times)
+            created, recycled = self.created, self.recycled
+        stats = {'pages': len(times), 'drivers': created, 'recycled': recycled}
+        if times:
+            stats.update({
+                'mean': sum(times) / len(times),
+                'p50': times[len(times) // 2],
+                'p95': times[min(len(times) - 1, int(len(times) * 0.95))],
+                'max': times[-1],
+            })
+        return stats
+
+    def summary(self):
+        stats = self.stats()
+        text = (f"WebDriver: {stats['pages']} páginas, {stats['drivers']} navegadores, "
+                f"{stats['recycled']} reciclados")
+        if stats['pages']:
+            text += f"; carga p50 {stats['p50']:.2f} s, p95 {stats['p95']:.2f} s, máx {stats['max']:.2f} s"
+        return text
+
+
+def load_pool(config=None, config_path=CONFIG_PATH, factory=new_driver):
+    """
+    DriverPool con los valores de la sección [WebDriver] de config.ini;
+    'factory' recibe page_load_timeout.
+    """
+    if config is None:
+        config = configparser.ConfigParser()
+        config.read(config_path, encoding='utf-8')
+    page_load_timeout = config.getfloat('WebDriver', 'page_load_timeout', fallback=PAGE_LOAD_TIMEOUT)
+    return DriverPool(size=config.getint('WebDriver', 'pool_size', fallback=POOL_SIZE),
+                      max_pages=config.getint('WebDriver', 'max_pages', fallback=MAX_PAGES),
+                      factory=functools.partial(factory, page_load_timeout=page_load_timeout))
@@ -0,0 +1,358 @@
+"""
+Feeds (RSS 2.0 y JSON Feed) e índice estático paginado de news_archive/es.
+
+Todo se genera en news_archive/feed/:
+
+    rss.xml, feed.json     noticias de los últimos feed_days días
+    index.html, index.json lista de páginas (una por mes, la más reciente primero)
+    pages/YYYY-MM.html     noticias traducidas del mes, por días
+    pages/YYYY-MM.json
+    manifest.json          hash de cada día publicado y ETag de cada fichero
+
+Solo se regenera lo que depende de los días cuyo contenido cambió (según su
+hash en manifest.json): la página de su mes (y las vecinas si aparece un mes
+nuevo), el índice y, si el día está en la ventana, los feeds. Con la lista
+de días cambiados (lo que hace pipeline.py) el coste por ejecución no crece
+con el archivo; sin ella se comprueban todos los ficheros (mtime y tamaño, y
+el hash solo si cambiaron).
+
+Los ficheros no llevan la hora de generación, así que su contenido (y su
+ETag, el hash del contenido) solo cambia cuando cambian las noticias.
+'serve' los sirve en local respondiendo 304 a If-None-Match.
+
+Uso:
+    python src/feeds.py update [--day 2025-10-26] [--rebuild]
+    python src/feeds.py serve [--port 8000]
+"""
+
+import argparse
+import bisect
+import configparser
+import glob
+import hashlib
+import html
+import json
+import os
+from datetime import datetime
+from email.utils import format_datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+from zoneinfo import ZoneInfo
+
+from archive_reader import iter_entries, read_header
+from archive_writer import ArchiveWriter, atomic_write
+from news_store import ARCHIVE_DIR, switch_to_parent_if_src
+
+CONFIG_PATH = 'config.ini'
+ES_DIR = f"{ARCHIVE_DIR}/es"
+FEED_DIR = f"{ARCHIVE_DIR}/feed"
+MANIFEST_FILENAME = "manifest.json"
+FEED_DAYS = 7
+TITLE = "Noticias Diarias de IA"
+DESCRIPTION = "Noticias de IA de IT之家 traducidas al español"
+TZ = ZoneInfo('Asia/Shanghai')
+
+
+def content_hash(content):
+    return hashlib.sha1(content).hexdigest()
+
+
+def etag(content):
+    """ETag fuerte (entre comillas) a partir del contenido"""
+    return f'"{content_hash(content)[:20]}"'
+
+
+def day_filename(day, es_dir=ES_DIR):
+    return f"{es_dir}/{day}.md"
+
+
+def read_day(day, es_dir=ES_DIR):
+    """{'day', 'subject', 'items': [{'title', 'link'}]} de news_archive/es/<día>.md"""
+    filename = day_filename(day, es_dir)
+    return {
+        'day': day,
+        'subject': read_header(filename).lstrip('# ').strip(),
+        'items': [{'title': title, 'link': link} for title, link in iter_entries(filename)],
+    }
+
+
+def day_date(day):
+    return datetime.strptime(day, '%Y-%m-%d').replace(tzinfo=TZ)
+
+
+# --- Renderizado ---
+
+def render_rss(days, base_url):
+    items = []
+    for day in days:
+        pub_date = format_datetime(day_date(day['day']))
+        for item in day['items']:
+            items.append(
+                f"    <item>\n"
+                f"      <title>{escape(item['title'])}</title>\n"
+                f"      <link>{escape(item['link'])}</link>\n"
+                f"      <guid isPermaLink=\"true\">{escape(item['link'])}</guid>\n"
+                f"      <pubDate>{pub_date}</pubDate>\n"
+                f"      <category>{escape(day['subject'])}</category>\n"
+                f"    </item>\n")
+    last_build = format_datetime(day_date(days[0]['day'])) if days else ''
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<rss version="2.0">\n  <channel>\n'
+            f"    <title>{escape(TITLE)}</title>\n"
+            f"    <link>{escape(base_url)}</link>\n"
+            f"    <description>{escape(DESCRIPTION)}</description>\n"
+            "    <language>es</language>\n"
+            f"    <lastBuildDate>{last_build}</lastBuildDate>\n"
+            + ''.join(items) +
+            "  </channel>\n</rss>\n")
+
+
+def render_json_feed(days, base_url):
+    feed = {
+        'version': "https://jsonfeed.org/version/1.1",
+        'title': TITLE,
+        'description': DESCRIPTION,
+        'language': 'es',
+        'items': [{
+            'id': item['link'],
+            'url': item['link'],
+            'title': item['title'],
+            'content_text': item['title'],
+            'date_published': day_date(day['day']).isoformat(),
+            'tags': [day['subject']],
+        } for day in days for item in day['items']],
+    }
+    if base_url:
+        feed['home_page_url'] = base_url
+        feed['feed_url'] = f"{base_url.rstrip('/')}/feed.json"
+    return json.dumps(feed, ensure_ascii=False, indent=1) + '\n'
+
+
+def page_links(month, months):
+    """(anterior, siguiente) de la página del mes entre las publicadas (en orden)"""
+    index = months.index(month)
+    previous = months[index - 1] if index > 0 else None
+    following = months[index + 1] if index + 1 < len(months) else None
+    return previous, following
+
+
+def render_page_html(month, days, months):
+    previous, following = page_links(month, months)
+    nav = ' · '.join(link for link in (
+        f'<a href="{previous}.html">&larr; {previous}</a>' if previous else '',
+        '<a href="../index.html">Índice</a>',
+        f'<a href="{following}.html">{following} &rarr;</a>' if following else '') if link)
+    sections = []
+    for day in days:
+        items = ''.join(f'<li><a href="{html.escape(item["link"])}">{html.escape(item["title"])}</a></li>\n'
+                        for item in day['items'])
+        sections.append(f'<h2 id="{day["day"]}">{html.escape(day["subject"])}</h2>\n<ul>\n{items}</ul>\n')
+    return (f'<!DOCTYPE html>\n<html lang="es">\n<head><meta charset="utf-8"><title>{TITLE} - {month}</title></head>\n'
+            f'<body>\n<h1>{TITLE} - {month}</h1>\n<nav>{nav}</nav>\n' + ''.join(sections) +
+            f'<nav>{nav}</nav>\n</body>\n</html>\n')
+
+
+def render_page_json(month, days, months):
+    previous, following = page_links(month, months)
+    return json.dumps({
+        'month': month,
+        'previous': f"{previous}.json" if previous else None,
+        'next': f"{following}.json" if following else None,
+        'days': days,
+    }, ensure_ascii=False, indent=1) + '\n'
+
+
+def month_summary(manifest):
+    """[(mes, días, noticias)] de las páginas publicadas, del más reciente al más antiguo"""
+    months = {}
+    for day, entry in manifest['days'].items():
+        days, items = months.get(day[:7], (0, 0))
+        months[day[:7]] = (days + 1, items + entry['count'])
+    return [(month, days, items) for month, (days, items) in sorted(months.items(), reverse=True)]
+
+
+def render_index_html(manifest):
+    rows = ''.join(f'<li><a href="pages/{month}.html">{month}</a> — {days} días, {items} noticias</li>\n'
+                   for month, days, items in month_summary(manifest))
+    return (f'<!DOCTYPE html>\n<html lang="es">\n<head><meta charset="utf-8"><title>{TITLE}</title>\n'
+            '<link rel="alternate" type="application/rss+xml" href="rss.xml">\n'
+            '<link rel="alternate" type="application/feed+json" href="feed.json"></head>\n'
+            f'<body>\n<h1>{TITLE}</h1>\n<p><a href="rss.xml">RSS</a> · <a href="feed.json">JSON Feed</a></p>\n'
+            f'<ul>\n{rows}</ul>\n</body>\n</html>\n')
+
+
+def render_index_json(manifest):
+    return json.dumps({
+        'title': TITLE,
+        'feeds': {'rss': "rss.xml", 'json': "feed.json"},
+        'pages': [{'month': month, 'days': days, 'items': items, 'html': f"pages/{month}.html",
+                   'json': f"pages/{month}.json"} for month, days, items in month_summary(manifest)],
+    }, ensure_ascii=False, indent=1) + '\n'
+
+
+# --- Actualización incremental ---
+
+def load_manifest(feed_dir=FEED_DIR):
+    try:
+        with open(f"{feed_dir}/{MANIFEST_FILENAME}", 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'days': {}, 'files': {}}
+
+
+def published_days(es_dir=ES_DIR):
+    return sorted(os.path.basename(path)[:-3] for path in glob.glob(f"{es_dir}/[0-9]*-[0-9]*-[0-9]*.md"))
+
+
+def changed_days(manifest, days, es_dir=ES_DIR):
+    """
+    Días de 'days' cuyo fichero cambió, apareció o desapareció respecto al
+    manifiesto; actualiza sus entradas. Sin cambios de mtime y tamaño no se lee el fichero.
+    """
+    changed = []
+    for day in days:
+        filename = day_filename(day, es_dir)
+        previous = manifest['days'].get(day)
+        if not os.path.exists(filename):
+            if previous is not None:
+                del manifest['days'][day]
+                changed.append(day)
+            continue
+        stat = os.stat(filename)
+        if previous and previous['mtime'] == stat.st_mtime_ns and previous['size'] == stat.st_size:
+            continue
+        with open(filename, 'rb') as f:
+            digest = content_hash(f.read())
+        if previous and previous['hash'] == digest:
+            previous['mtime'] = stat.st_mtime_ns
+            continue
+        manifest['days'][day] = {'hash': digest, 'mtime': stat.st_mtime_ns, 'size': stat.st_size,
+                                 'count': sum(1 for _ in iter_entries(filename))}
+        changed.append(day)
+    return changed
+
+
+def update_feeds(days=None, rebuild=False, es_dir=ES_DIR, feed_dir=FEED_DIR, feed_days=None, base_url=None):
+    """
+    Regenera lo que depende de los días cambiados. 'days': días que pueden
+    haber cambiado (None = comprobar todo news_archive/es). Devuelve los
+    ficheros que se escribieron.
+    """
+    config = configparser.ConfigParser()
+    config.read(CONFIG_PATH, encoding='utf-8')
+    feed_days = feed_days or config.getint('Feed', 'feed_days', fallback=FEED_DAYS)
+    base_url = base_url if base_url is not None else config.get('Feed', 'base_url', fallback='')
+
+    manifest = {'days': {}, 'files': {}} if rebuild else load_manifest(feed_dir)
+    old_months = sorted({day[:7] for day in manifest['days']})
+    old_window = sorted(manifest['days'])[-feed_days:]
+    if days is None or rebuild:
+        days = sorted(set(published_days(es_dir)) | set(manifest['days']))
+    changed = changed_days(manifest, days, es_dir)
+    if not changed and not rebuild:
+        return []
+
+    months = sorted({day[:7] for day in manifest['days']})
+    affected = {day[:7] for day in changed} & set(months)
+    # Un mes nuevo o que desaparece cambia los enlaces de sus vecinos
+    for month in set(months) ^ set(old_months):
+        position = bisect.bisect_left(months, month)
+        affected |= set(months[max(0, position - 1):position + 2])
+    if rebuild:
+        affected = set(months)
+
+    outputs = {}
+    by_month = {}
+    for day in sorted(manifest['days']):
+        by_month.setdefault(day[:7], []).append(day)
+    for month in sorted(affected):
+        month_days = [read_day(day, es_dir) for day in reversed(by_month[month])]
+        outputs[f"pages/{month}.html"] = render_page_html(month, month_days, months)
+        outputs[f"pages/{month}.json"] = render_page_json(month, month_days, months)
+    for month in set(old_months) - set(months):
+        outputs[f"pages/{month}.html"] = outputs[f"pages/{month}.json"] = None
+
+    window = sorted(manifest['days'])[-feed_days:]
+    if rebuild or window != old_window or set(changed) & set(window):
+        window_days = [read_day(day, es_dir) for day in reversed(window)]
+        outputs['rss.xml'] = render_rss(window_days, base_url)
+        outputs['feed.json'] = render_json_feed(window_days, base_url)
+    outputs['index.html'] = render_index_html(manifest)
+    outputs['index.json'] = render_index_json(manifest)
+
+    with ArchiveWriter() as writer:
+        for name, content in outputs.items():
+            path = f"{feed_dir}/{name}"
+            if content is None:
+                if os.path.exists(path):
+                    os.remove(path)
+                manifest['files'].pop(name, None)
+                continue
+            writer.stage(path, content)
+            manifest['files'][name] = etag(content.encode('utf-8'))
+    atomic_write(f"{feed_dir}/{MANIFEST_FILENAME}", json.dumps(manifest, ensure_ascii=False, indent=1, sort_keys=True))
+    return writer.written
+
+
+# --- Servidor local con peticiones condicionales ---
+
+def feed_handler(feed_dir=FEED_DIR):
+    """Handler que sirve feed_dir con el ETag del manifiesto y responde 304 a If-None-Match"""
+
+    class FeedRequestHandler(SimpleHTTPRequestHandler):
+        extensions_map = {**SimpleHTTPRequestHandler.extensions_map,
+                          '.xml': 'application/rss+xml; charset=utf-8',
+                          '.json': 'application/json; charset=utf-8',
+                          '.html': 'text/html; charset=utf-8'}
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=feed_dir, **kwargs)
+
+        def send_head(self):
+            name = self.path.split('?', 1)[0].lstrip('/') or 'index.html'
+            tag = load_manifest(feed_dir)['files'].get(name)
+            if tag and tag in (value.strip() for value in self.headers.get('If-None-Match', '').split(',')):
+                self.send_response(304)
+                self.send_header('ETag', tag)
+                self.end_headers()
+                return None
+            self._etag = tag
+            return super().send_head()
+
+        def end_headers(self):
+            if getattr(self, '_etag', None):
+                self.send_header('ETag', self._etag)
+                self._etag = None
+            super().end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return FeedRequestHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feeds RSS/JSON e índice estático de news_archive/es")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    update_parser = subparsers.add_parser('update', help="regenera lo que cambió")
+    update_parser.add_argument('--day', action='append', help="día que cambió (se puede repetir); "
+                                                              "sin él se comprueba todo news_archive/es")
+    update_parser.add_argument('--rebuild', action='store_true', help="regenera todo desde cero")
+    serve_parser = subparsers.add_parser('serve', help="sirve news_archive/feed con ETag en local")
+    serve_parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    switch_to_parent_if_src()
+    if args.command == 'serve':
+        server = ThreadingHTTPServer(('127.0.0.1', args.port), feed_handler())
+        print(f"Sirviendo {FEED_DIR} en http://127.0.0.1:{args.port}/")
+        server.serve_forever()
+        return
+    written = update_feeds(args.day, rebuild=args.rebuild)
+    print(f"{len(written)} ficheros actualizados en {FEED_DIR}")
+    for path in written:
+        print(f"  {path}")
+
+
+if __name__ == '__main__':
+    main()
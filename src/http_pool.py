@@ -0,0 +1,139 @@
+"""Utilidades para peticiones HTTP concurrentes: límite de ritmo por host y reintentos"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import count, observe, timer
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+
+class TokenBucket:
+    """Cubo de fichas: 'rate' fichas por segundo, hasta 'capacity' acumuladas"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Bloquea hasta obtener una ficha"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            observe('ratelimit.wait', wait)
+            time.sleep(wait)
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+    TokenBucket que se adapta a las respuestas del servidor: divide el ritmo
+    a la mitad ante un 429/5xx y lo recupera poco a poco con cada éxito.
+    """
+
+    def __init__(self, rate, capacity=None, min_rate=0.1, recovery=0.1):
+        super().__init__(rate, capacity)
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.recovery = recovery
+
+    def penalize(self):
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+    def reward(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.recovery)
+
+
+class HostRateLimiter:
+    """Un TokenBucket por host, compartido por todos los hilos"""
+
+    def __init__(self, rate_per_host, burst=None):
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+        bucket.acquire()
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Espera exponencial con jitter completo para el intento 'attempt' (desde 0)"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_seconds(response):
+    """Valor numérico de la cabecera Retry-After, si existe"""
+    try:
+        return float(response.headers.get('Retry-After', ''))
+    except ValueError:
+        return None
+
+
+def make_session(pool_size):
+    """Session de requests con un pool de conexiones del tamaño indicado"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_with_retries(session, url, limiter=None, retries=3, timeout=10, **kwargs):
+    """
+    GET con límite de ritmo y reintentos con backoff exponencial + jitter.
+    Solo se reintentan errores de conexión, timeouts y respuestas 429/5xx;
+    el último error se propaga.
+    """
+    for attempt in range(retries):
+        if limiter:
+            limiter.acquire(url)
+        delay = None
+        try:
+            with timer('http.get'):
+                response = session.get(url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        else:
+            if response.status_code not in RETRY_STATUS:
+                response.raise_for_status()
+                return response
+            error = requests.HTTPError(f"HTTP {response.status_code}", response=response)
+            delay = retry_after_seconds(response)
+        if attempt == retries - 1:
+            raise error
+        delay = delay if delay is not None else backoff_delay(attempt)
+        print(f"  > {url}: {error} (intento {attempt + 1}/{retries}), reintentando en {delay:.1f} s")
+        count('http.retries')
+        observe('http.backoff_sleep', delay)
+        time.sleep(delay)
+
+
+def map_concurrently(func, items, max_workers):
+    """Aplica func a cada elemento con un pool acotado de hilos; conserva el orden"""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, items))
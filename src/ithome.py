@@ -0,0 +1,79 @@
+"""Extractor HTTP (requests + BeautifulSoup) de la página de archivo diario de IT之家"""
+
+from datetime import datetime
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+
+from http_pool import get_with_retries
+
+ARCHIVE_URL = "https://www.ithome.com/list/{date_str}.html"
+REQUEST_TIMEOUT = 15
+HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/124.0 Safari/537.36'),
+    'Accept-Language': 'zh-CN,zh;q=0.9',
+}
+
+
+def archive_url(date_str):
+    return ARCHIVE_URL.format(date_str=date_str)
+
+
+def parse_archive_html(html, base_url="", since=None):
+    """
+    Extrae las noticias de 'ul.datel li' en una sola pasada.
+    Devuelve los mismos dicts que el scraper de Selenium:
+    {'category', 'title', 'link', 'time'}.
+    Con 'since' (datetime) se omiten las noticias anteriores.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    news_data = []
+    for item in soup.select('ul.datel li'):
+        try:
+            category = item.select_one('a.c').get_text(strip=True)
+            title_link = item.select_one('a.t')
+            title = title_link.get_text(strip=True)
+            link = urljoin(base_url, title_link['href'])
+            time_str = item.select_one('i').get_text(strip=True)
+            time_obj = datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S")
+            if since and time_obj < since:
+                continue
+            news_data.append({'category': category, 'title': title, 'link': link, 'time': time_obj})
+        except Exception as e:
+            print(f"Error parseando un artículo: {e}. Saltando.")
+    return news_data
+
+
+def response_text(response):
+    if not response.encoding or response.encoding.lower() == 'iso-8859-1':
+        response.encoding = 'utf-8'  # La página es UTF-8 aunque la cabecera no lo diga
+    return response.text
+
+
+def fetch_archive(date_str, session=None, timeout=REQUEST_TIMEOUT, url_template=ARCHIVE_URL,
+                  limiter=None, retries=1):
+    """
+    Descarga y parsea la página de archivo de un día ('YYYY-MM-DD').
+    'limiter' (http_pool.HostRateLimiter) limita el ritmo entre hilos.
+    """
+    url = url_template.format(date_str=date_str)
+    response = get_with_retries(session or requests, url, limiter, retries=retries, timeout=timeout,
+                                headers=HEADERS)
+    return parse_archive_html(response_text(response), base_url=url)
+
+
+def truncate_before_link(html, link):
+    """
+    Corta la página justo antes del <li> que contiene 'link'. La lista va de
+    la noticia más nueva a la más antigua, así que lo que queda son las
+    noticias posteriores a 'link'. Devuelve (html, True si se cortó).
+    """
+    position = html.find(f'"{link}"')
+    if position < 0:
+        return html, False
+    start = html.rfind('<li', 0, position)
+    if start < 0:
+        return html, False
+    return html[:start], True
@@ -1,24 +1,28 @@
 # Estándar
+import argparse
 import os
-import re
 import sys
-import time
 from datetime import datetime, timedelta
 
 # Localización y zona horaria
 from zoneinfo import ZoneInfo 
 
-# Peticiones y configuración
-import requests
+# Configuración
 import configparser
 
 # Bibliotecas de correo (Comentadas por solicitud)
 # import smtplib
 # from email.mime.text import MIMEText
 
+# Almacén de noticias compartido con el scraper y el ordenador
+from news_store import NewsStore
+from news_filter import FilterStats, keep_ai_news, load_filter_config
+
 # Traducción
 # from googletrans import Translator # Eliminado
 from deep_translator import GoogleTranslator # Añadido
+from translation import TranslationCache, translate_texts
+from metrics import add_profile_argument, profiling, timer, write_run
 
 # --- INICIO DE CAMBIO ---
 # Mantenemos 'translator' como variable global si se usa en múltiples sitios,
@@ -94,7 +98,59 @@ def get_env_variable(name):
 #     except smtplib.SMTPException as e:
 #         print(f"Error al enviar correo a {receiver}: {e}")
 
+def translator_factory():
+    # Cada hilo de traducción crea su propio traductor con los idiomas de
+    # origen y destino (GoogleTranslator no es thread-safe)
+    return GoogleTranslator(source='zh-CN', target='es')
+
+def translate_day(store, day, rows, matcher, translator_factory=translator_factory):
+    """
+    Filtra las noticias de IA de 'rows' (registros con 'link', 'title' y
+    'title_es', p. ej. store.iter_day_news(day)), traduce sus títulos y
+    regenera news_archive/es/YYYY-MM-DD.md. Devuelve la ruta del fichero,
+    o None si no hay noticias de IA.
+    """
+    subject = f"Noticias de Ayer - {day}"
+    filter_stats = FilterStats()
+    rows = list(keep_ai_news(rows, filter_stats, matcher=matcher))
+    matches = [(row['link'], row['title']) for row in rows]
+    print(filter_stats)
+
+    if not matches:
+        print(f"No se encontraron noticias de IA de {day} en el almacén")
+        return None
+
+    # Traducir títulos al español
+    print("Iniciando traducción al español...")
+
+    # Solo se piden al traductor los títulos que no están en la caché,
+    # agrupados en bloques y repartidos entre varios hilos con un límite de
+    # ritmo compartido (sin espera fija por título)
+    with TranslationCache() as cache, timer('translate.texts'):
+        # Las traducciones ya guardadas en el almacén también cuentan como caché
+        for row in rows:
+            if row['title_es'] and not row['title_es'].endswith("(Traducción fallida)"):
+                cache.put(row['title'], 'zh-CN', 'es', row['title_es'])
+        titles_es = translate_texts(translator_factory, [title for link, title in matches], cache,
+                                    source='zh-CN', target='es')
+
+    translated_news = []
+    for (link, title), title_es in zip(matches, titles_es):
+        if title_es is None:
+            print(f"Error traduciendo: {title}")
+            title_es = f"{title} (Traducción fallida)"  # Fallback
+        translated_news.append({'link': link, 'title': title_es})
+        print(f"Traducido: {title} -> {title_es}")
+
+    # Guardar en el almacén y regenerar news_archive/es/YYYY-MM-DD.md
+    store.set_translations(day, {news['link']: news['title'] for news in translated_news})
+    return store.write_translation(day, subject)
+
 def main():
+    parser = argparse.ArgumentParser(description="Filtra y traduce al español las noticias de IA de ayer")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
     config = configparser.ConfigParser()
     config_path = 'config.ini'
 
@@ -124,76 +180,19 @@ def main():
 
     yesterday_folder_path = f"news_archive/{year_month}"
     yesterday_news_filename = f"{yesterday_folder_path}/{yesterday_day}.md"
-    
-    subject = f"Noticias de Ayer - {yesterday.strftime('%Y-%m-%d')}"
+    day = yesterday.strftime('%Y-%m-%d')
 
     if not os.path.exists(yesterday_news_filename):
         print(f"Archivo de noticias no encontrado: {yesterday_news_filename}")
         return
 
-    # Leer noticias de ayer
-    with open(yesterday_news_filename, 'r', encoding='utf-8') as f:
-        yesterday_news = f.read()
-
-    # Extraer títulos y links (Asumiendo formato <p><a href="...">...</a></p>)
-    # Ajusta este patrón si el formato de tu .md es diferente
-    pattern = r'<p><a href=\"(.*?)\">(.*?)</a></p>'
-    matches = re.findall(pattern, yesterday_news)
-    
-    if not matches:
-        # Fallback por si el formato es Markdown simple: [texto](link)
-        pattern_md = r'\[(.*?)\]\((.*?)\)'
-        matches_md = re.findall(pattern_md, yesterday_news)
-        # Reordenar para que coincida con (link, title)
-        matches = [(link, title) for title, link in matches_md]
-
-    if not matches:
-        print("No se encontraron noticias con el patrón esperado. Verifique el formato del archivo .md")
-        return
-
-    # Traducir títulos al español
-    print("Iniciando traducción al español...")
-    
-    # --- INICIO DE CAMBIO ---
-    # Inicializamos el traductor con los idiomas de origen y destino
-    translator = GoogleTranslator(source='zh-CN', target='es')
-    # --- FIN DE CAMBIO ---
-    
-    translated_news = []
-    for link, title in matches:
-        try:
-            # Añadimos un pequeño retraso para no sobrecargar la API de traducción
-            time.sleep(0.5) 
-            # --- INICIO DE CAMBIO ---
-            # La sintaxis de deep-translator es más simple
-            title_es = translator.translate(title)
-            # title_es = translator.translate(title, src='zh-cn', dest='es').text # Eliminado
-            # --- FIN DE CAMBIO ---
-        except Exception as e:
-            print(f"Error traduciendo: {title} -> {e}")
-            title_es = f"{title} (Traducción fallida)"  # Fallback
-        translated_news.append({'link': link, 'title': title_es})
-        print(f"Traducido: {title} -> {title_es}")
-
-    # Generar HTML (o Markdown) con títulos traducidos
-    formatted_news = ''
-    for news in translated_news:
-        # Guardamos en el mismo formato que leímos (HTML <p><a>)
-        formatted_news += f'<p><a href=\"{news["link"]}\">{news["title"]}</a></p>\n'
-        # Si prefieres formato Markdown:
-        # formatted_news += f"- [{news['title']}]({news['link']})\n"
-
-
-    # Guardar en archivo local
-    output_folder = "news_archive/es" # Carpeta para noticias en español
-    os.makedirs(output_folder, exist_ok=True)
-    output_file = f"{output_folder}/{yesterday.strftime('%Y-%m-%d')}.md"
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(f"# {subject}\n\n")
-        f.write(formatted_news)
+    # Leer noticias de ayer desde el almacén (mismo orden que el fichero .md)
+    # y filtrarlas en streaming: solo llegan a la traducción las de IA
+    with profiling(args.profile, 'main'), NewsStore() as store:
+        output_file = translate_day(store, day, store.iter_day_news(day), load_filter_config(config_path))
 
-    print(f"\nNoticias traducidas y guardadas exitosamente en: {output_file}")
+    if output_file:
+        print(f"\nNoticias traducidas y guardadas exitosamente en: {output_file}")
 
     # --- BUCLE DE ENVÍO DE CORREO DESACTIVADO ---
     # print("\nIniciando envío de correos...")
@@ -205,6 +204,7 @@ def main():
     #         print(f"Usuario {user.get('name', 'Desconocido')} no tiene email.")
 
     print("Proceso completado (solo guardado local).")
+    write_run('main', {'day': day})
 
 if __name__ == '__main__':
     main()
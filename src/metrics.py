@@ -0,0 +1,283 @@
+"""
+Métricas ligeras de cada ejecución: contadores, tiempos e histogramas.
+
+Los módulos anotan lo que hacen en el registro global:
+
+    count('sources.not_modified')
+    observe('webdriver.page_load', seconds)
+    with timer('scrape.fetch_all_news'):
+        ...
+
+y el punto de entrada, al terminar, guarda el resumen en
+news_archive/metrics/<ejecución>-<fecha>.json con write_run(). Los tiempos
+se guardan como histogramas (n, total, media, p50, p95, máx). 'compare'
+enfrenta las dos últimas ejecuciones para ver regresiones.
+
+Con --profile los puntos de entrada envuelven la ejecución en cProfile (o
+pyinstrument, si está instalado) y dejan el volcado junto a las métricas.
+
+Uso:
+    python src/metrics.py compare script [--threshold 20]
+    python src/metrics.py show news_archive/metrics/script-20251026-003000.json
+"""
+
+import argparse
+import cProfile
+import functools
+import glob
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from archive_writer import atomic_write
+from news_store import switch_to_parent_if_src
+
+METRICS_DIR = "news_archive/metrics"
+RESERVOIR_SIZE = 10000      # Muestras por histograma para los percentiles
+MIN_REGRESSION = 0.1        # Segundos: diferencias menores no se marcan como regresión
+PROFILERS = ('cprofile', 'pyinstrument')
+
+
+class Histogram:
+    """Resumen de una serie de valores: n, total, mínimo, máximo y una muestra para percentiles"""
+
+    def __init__(self, reservoir_size=RESERVOIR_SIZE):
+        self.reservoir_size = reservoir_size
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.samples = []
+        self._rng = random.Random(0)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self.samples) < self.reservoir_size:
+            self.samples.append(value)
+        else:
+            # Muestreo de reservorio: cada valor tiene la misma probabilidad de quedar
+            slot = self._rng.randrange(self.count)
+            if slot < self.reservoir_size:
+                self.samples[slot] = value
+
+    def summary(self):
+        samples = sorted(self.samples)
+
+        def percentile(p):
+            return samples[min(len(samples) - 1, int(len(samples) * p))] if samples else None
+
+        return {
+            'n': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'p50': percentile(0.5),
+            'p95': percentile(0.95),
+            'max': self.max,
+        }
+
+
+class Metrics:
+    """Registro de métricas compartido por todos los hilos"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counters = {}
+            self.histograms = {}
+            self.started = time.time()
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(value)
+
+    @contextmanager
+    def timer(self, name):
+        """Mide el bloque en segundos y lo añade al histograma 'name'"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': dict(sorted(self.counters.items())),
+                'histograms': {name: histogram.summary()
+                               for name, histogram in sorted(self.histograms.items())},
+            }
+
+
+METRICS = Metrics()
+count = METRICS.count
+observe = METRICS.observe
+timer = METRICS.timer
+
+
+def timed(name):
+    """Decorador: mide cada llamada a la función en el histograma 'name'"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def run_path(run, extension='json', metrics_dir=METRICS_DIR, started=None):
+    stamp = datetime.fromtimestamp(started or METRICS.started).strftime('%Y%m%d-%H%M%S')
+    return f"{metrics_dir}/{run}-{stamp}.{extension}"
+
+
+def write_run(run, extra=None, metrics_dir=METRICS_DIR):
+    """Guarda las métricas de la ejecución 'run' en un JSON; devuelve la ruta"""
+    data = {
+        'run': run,
+        'started': datetime.fromtimestamp(METRICS.started).isoformat(timespec='seconds'),
+        'elapsed': time.time() - METRICS.started,
+        **(extra or {}),
+        **METRICS.snapshot(),
+    }
+    path = run_path(run, metrics_dir=metrics_dir)
+    atomic_write(path, json.dumps(data, ensure_ascii=False, indent=1))
+    print(f"Métricas guardadas en {path}")
+    return path
+
+
+@contextmanager
+def profiling(profiler, run, metrics_dir=METRICS_DIR):
+    """
+    Perfila el bloque con 'cprofile' (.prof, para pstats/snakeviz) o
+    'pyinstrument' (.html); con None no hace nada.
+    """
+    if not profiler:
+        yield
+        return
+    if profiler not in PROFILERS:
+        raise ValueError(f"Perfilador desconocido: {profiler}")
+    os.makedirs(metrics_dir, exist_ok=True)
+    if profiler == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("pyinstrument no está instalado (pip install pyinstrument), se usa cProfile")
+            profiler = 'cprofile'
+    if profiler == 'cprofile':
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            path = run_path(run, 'prof', metrics_dir)
+            profile.dump_stats(path)
+            print(f"Perfil guardado en {path}")
+    else:
+        profile = Profiler()
+        profile.start()
+        try:
+            yield
+        finally:
+            profile.stop()
+            path = run_path(run, 'html', metrics_dir)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(profile.output_html())
+            print(f"Perfil guardado en {path}")
+
+
+def add_profile_argument(parser):
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=PROFILERS,
+                        help="guarda un perfil de la ejecución junto a las métricas")
+
+
+def load_run(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def previous_runs(run, metrics_dir=METRICS_DIR):
+    """Ficheros de métricas de 'run', del más antiguo al más reciente"""
+    return sorted(glob.glob(f"{metrics_dir}/{run}-*.json"))
+
+
+def compare_runs(old, new, threshold=20.0):
+    """
+    Líneas con los cambios entre dos ejecuciones; se marcan las que empeoran
+    más del threshold % (y, en tiempos, más de MIN_REGRESSION segundos)
+    """
+    lines = []
+    for name in sorted(set(old['histograms']) | set(new['histograms'])):
+        before = (old['histograms'].get(name) or {}).get('total')
+        after = (new['histograms'].get(name) or {}).get('total')
+        lines.append(_compare_line(name, before, after, threshold, ' s', MIN_REGRESSION))
+    for name in sorted(set(old['counters']) | set(new['counters'])):
+        lines.append(_compare_line(name, old['counters'].get(name), new['counters'].get(name), threshold, '', 0))
+    return lines
+
+
+def _compare_line(name, before, after, threshold, unit, min_difference):
+    if before is None or after is None:
+        return f"  {name}: {_format(before, unit)} → {_format(after, unit)}"
+    change = (after - before) / before * 100 if before else 0.0
+    flag = " ⚠" if change > threshold and after - before > min_difference else ""
+    return f"  {name}: {_format(before, unit)} → {_format(after, unit)} ({change:+.0f}%){flag}"
+
+
+def _format(value, unit):
+    if value is None:
+        return "—"
+    return f"{value:.3f}{unit}" if isinstance(value, float) else f"{value}{unit}"
+
+
+def show_run(data):
+    print(f"{data['run']} ({data['started']}, {data['elapsed']:.2f} s)")
+    for name, summary in data['histograms'].items():
+        print(f"  {name}: n={summary['n']} total={summary['total']:.3f} s "
+              f"p50={summary['p50']:.4f} s p95={summary['p95']:.4f} s máx={summary['max']:.4f} s")
+    for name, value in data['counters'].items():
+        print(f"  {name}: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Métricas de las ejecuciones")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    compare_parser = subparsers.add_parser('compare', help="compara las dos últimas ejecuciones")
+    compare_parser.add_argument('run', help="nombre de la ejecución (script, news_sorter, main, pipeline)")
+    compare_parser.add_argument('--threshold', type=float, default=20.0, help="% de empeoramiento a marcar")
+    show_parser = subparsers.add_parser('show', help="muestra un fichero de métricas")
+    show_parser.add_argument('path')
+    args = parser.parse_args()
+
+    switch_to_parent_if_src()
+    if args.command == 'show':
+        show_run(load_run(args.path))
+        return
+    runs = previous_runs(args.run)
+    if len(runs) < 2:
+        raise SystemExit(f"Hacen falta dos ejecuciones de '{args.run}' en {METRICS_DIR}")
+    old, new = load_run(runs[-2]), load_run(runs[-1])
+    print(f"{os.path.basename(runs[-2])} → {os.path.basename(runs[-1])}")
+    print('\n'.join(compare_runs(old, new, args.threshold)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+Exportación del archivo a un formato columnar comprimido y lector perezoso.
+
+Cada mes se guarda en news_archive/columnar/YYYY-MM/ con un fichero por
+columna (lista JSON comprimida con gzip) y un manifest.json global con el
+tipo de cada columna y, por mes, el número de filas, el primer y último día
+y el mtime de sus .md y la marca de cambio del almacén con los que se
+exportó. El lector solo descomprime las columnas pedidas y descarta meses
+enteros por fecha usando el manifiesto, sin abrirlos; dentro de un mes lee
+primero la columna 'day' y solo carga las demás si alguna fila pasa el filtro.
+
+Los datos salen del almacén (news_store), que ya reúne 00.md, DD.md y las
+traducciones de news_archive/es.
+
+Uso:
+    python src/news_columnar.py export [--month 2025-10] [--force]
+    python src/news_columnar.py scan --from 2025-10-01 --to 2025-10-31 --columns day,title,score
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import time
+
+from archive_writer import ArchiveWriter, atomic_write
+from news_store import ARCHIVE_DIR, NewsStore, switch_to_parent_if_src
+
+COLUMNAR_DIR = f"{ARCHIVE_DIR}/columnar"
+MANIFEST_FILENAME = "manifest.json"
+FORMAT_VERSION = 1
+
+# Columna -> (columna del almacén, tipo). 'day' puede ser nulo en noticias que
+# solo aparecen en 00.md; en ese caso la fecha efectiva es el mes.
+COLUMNS = {
+    'day': ('day', 'str?'),
+    'title': ('title', 'str'),
+    'link': ('link', 'str'),
+    'category': ('category', 'str?'),
+    'time': ('published', 'str?'),
+    'rank': ('rank', 'int?'),
+    'score': ('score', 'float?'),
+    'title_es': ('title_es', 'str?'),
+}
+
+
+def column_path(year_month, column, columnar_dir=COLUMNAR_DIR):
+    return f"{columnar_dir}/{year_month}/{column}.json.gz"
+
+
+def encode_column(values):
+    # mtime=0 para que el mismo contenido produzca los mismos bytes
+    return gzip.compress(json.dumps(values, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+                         compresslevel=9, mtime=0)
+
+
+def decode_column(data):
+    return json.loads(gzip.decompress(data))
+
+
+def archive_months(archive_dir=ARCHIVE_DIR):
+    return sorted(os.path.basename(path) for path in glob.glob(f"{archive_dir}/[0-9][0-9][0-9][0-9]-[0-9][0-9]"))
+
+
+def source_mtime(year_month, archive_dir=ARCHIVE_DIR):
+    """Última modificación de los .md del mes y de sus traducciones"""
+    paths = glob.glob(f"{archive_dir}/{year_month}/*.md") + glob.glob(f"{archive_dir}/es/{year_month}-*.md")
+    return max((os.path.getmtime(path) for path in paths), default=0)
+
+
+def load_manifest(columnar_dir=COLUMNAR_DIR):
+    try:
+        with open(f"{columnar_dir}/{MANIFEST_FILENAME}", 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = None
+    if not manifest or manifest.get('version') != FORMAT_VERSION:
+        manifest = {'version': FORMAT_VERSION, 'columns': {}, 'months': {}}
+    manifest['columns'] = {column: kind for column, (_, kind) in COLUMNS.items()}
+    return manifest
+
+
+def export_month(store, year_month, writer, columnar_dir=COLUMNAR_DIR):
+    """Programa en 'writer' las columnas de un mes; devuelve su entrada del manifiesto"""
+    rows = store.month_news(year_month)
+    days = [row['day'] for row in rows if row['day']]
+    sizes = {}
+    for column, (source, _) in COLUMNS.items():
+        data = encode_column([row[source] for row in rows])
+        writer.stage(column_path(year_month, column, columnar_dir), data)
+        sizes[column] = len(data)
+    return {
+        'rows': len(rows),
+        'min_day': min(days, default=None),
+        'max_day': max(days, default=None),
+        'bytes': sizes,
+    }
+
+
+def export_archive(months=None, force=False, archive_dir=ARCHIVE_DIR, columnar_dir=COLUMNAR_DIR):
+    """
+    Exporta los meses indicados (todos por defecto) que hayan cambiado desde
+    la última vez: en sus .md o en el almacén (votos, puntuaciones y
+    traducciones que no cambian los .md del mes)
+    """
+    manifest = load_manifest(columnar_dir)
+    exported = []
+    with NewsStore(archive_dir=archive_dir) as store, ArchiveWriter() as writer:
+        for year_month in months or archive_months(archive_dir):
+            mtime = source_mtime(year_month, archive_dir)
+            store_changed = store.month_changed_at(year_month)
+            previous = manifest['months'].get(year_month)
+            if (not force and previous and previous.get('source_mtime') == mtime
+                    and previous.get('store_changed') == store_changed):
+                continue
+            entry = export_month(store, year_month, writer, columnar_dir)
+            entry['source_mtime'] = mtime
+            entry['store_changed'] = store_changed
+            manifest['months'][year_month] = entry
+            exported.append(year_month)
+    # El manifiesto se escribe después de las columnas: nunca apunta a datos a medias
+    manifest['months'] = dict(sorted(manifest['months'].items()))
+    atomic_write(f"{columnar_dir}/{MANIFEST_FILENAME}", json.dumps(manifest, ensure_ascii=False, indent=1))
+    return exported
+
+
+def _row_date(day, year_month):
+    return day or year_month
+
+
+def _month_in_range(year_month, entry, date_from, date_to):
+    # Las fechas del mes van de 'YYYY-MM' (filas sin día) a max_day
+    high = entry.get('max_day') or year_month
+    if date_from and high < date_from:
+        return False
+    if date_to and year_month > f"{date_to}\uffff":
+        return False
+    return True
+
+
+def scan(columns=None, date_from=None, date_to=None, columnar_dir=COLUMNAR_DIR):
+    """
+    Recorre las noticias exportadas como diccionarios con solo las columnas
+    pedidas, mes a mes, sin cargar el archivo entero en memoria. Las fechas
+    admiten prefijos ('2025', '2025-10', '2025-10-26').
+    """
+    manifest = load_manifest(columnar_dir)
+    columns = list(columns or COLUMNS)
+    unknown = set(columns) - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Columnas desconocidas: {', '.join(sorted(unknown))}")
+    upper = f"{date_to}\uffff" if date_to else None
+
+    for year_month, entry in manifest['months'].items():
+        if not entry['rows'] or not _month_in_range(year_month, entry, date_from, date_to):
+            continue
+        selected = None
+        if date_from or date_to:
+            with open(column_path(year_month, 'day', columnar_dir), 'rb') as f:
+                dates = [_row_date(day, year_month) for day in decode_column(f.read())]
+            selected = [i for i, date in enumerate(dates)
+                        if (not date_from or date >= date_from) and (not upper or date <= upper)]
+            if not selected:
+                continue
+        data = {}
+        for column in columns:
+            with open(column_path(year_month, column, columnar_dir), 'rb') as f:
+                data[column] = decode_column(f.read())
+        indexes = selected if selected is not None else range(entry['rows'])
+        for i in indexes:
+            yield {column: data[column][i] for column in columns}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archivo columnar comprimido de news_archive")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export', help="convierte news_archive al formato columnar")
+    export_parser.add_argument('--month', action='append', help="mes a exportar (YYYY-MM), repetible")
+    export_parser.add_argument('--force', action='store_true', help="reexporta aunque no haya cambios")
+    scan_parser = subparsers.add_parser('scan', help="lee noticias del formato columnar")
+    scan_parser.add_argument('--from', dest='date_from')
+    scan_parser.add_argument('--to', dest='date_to')
+    scan_parser.add_argument('--columns', default='day,title,link', help="columnas separadas por comas")
+    scan_parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    switch_to_parent_if_src()
+    start = time.perf_counter()
+    if args.command == 'export':
+        exported = export_archive(args.month, args.force)
+        print(f"Exportados {len(exported)} meses en {time.perf_counter() - start:.2f} s")
+    else:
+        count = 0
+        for row in scan(args.columns.split(','), args.date_from, args.date_to):
+            if count < args.limit:
+                print('  '.join('' if value is None else str(value) for value in row.values()))
+            count += 1
+        print(f"{count} noticias en {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,81 +1,232 @@
 """Módulo de herramientas de filtrado de noticias"""
 
+import configparser
 import re
+from collections import namedtuple
 
-def should_keep_news(title):
+# 1. Palabras clave de spam (a eliminar)
+FILTER_KEYWORDS = ['广告', '推广', '赞助', '合作', '活动', '福利', '优惠']
+
+# 2. Lista ampliada de palabras clave de IA (a conservar)
+# Se comparan con el título en minúsculas para 'AI', 'GPT', etc.
+AI_KEYWORDS = [
+    # --- Términos Fundamentales ---
+    'ai',        # AI
+    'genai',     # GenAI
+    'aipc',      # AI PC
+    'waic',      # WAIC (Conferencia Mundial de IA)
+    'aios',      # AI OS (Flyme AIOS, etc.)
+    '人工智能',  # Inteligencia Artificial
+    'agi',       # AGI (Inteligencia General Artificial)
+    'aigc',      # AIGC (Contenido Generado por IA)
+    
+    # --- Modelos y Arquitecturas ---
+    'gpt',       # GPT
+    'chatgpt',   # ChatGPT
+    'searchgpt', # SearchGPT
+    'llm',       # LLM (Large Language Model)
+    'llms',      # LLMs
+    '大模型',    # Modelo Grande
+    '机器学习',  # Machine Learning
+    '深度学习',  # Deep Learning
+    '神经网络',  # Neural Network
+    'rag',       # RAG (Retrieval-Augmented Generation)
+
+    # --- Empresas Principales ---
+    'openai',    # OpenAI
+    'anthropic', # Anthropic
+    'google',    # Google
+    '谷歌',      # Google
+    'deepmind',  # DeepMind
+    'meta',      # Meta
+    'microsoft', # Microsoft
+    '微软',      # Microsoft
+    'nvidia',    # Nvidia
+    '英伟达',    # Nvidia
+    'baidu',     # Baidu
+    '百度',      # Baidu
+    'alibaba',   # Alibaba
+    '阿里巴巴',  # Alibaba
+    'tencent',   # Tencent
+    '腾讯',      # Tencent
+    'mistral',   # Mistral AI
+    'xai',       # xAI
+    'spacexai',  # SpaceXAI (SpaceX + xAI)
+    
+    # --- Modelos/Productos Populares ---
+    'claude',    # Claude
+    'sora',      # Sora
+    'gemini',    # Gemini
+    'llama',     # Llama
+    'copilot',   # Copilot
+    'stable diffusion', # Stable Diffusion
+    'midjourney',# Midjourney
+    'vision pro', # Vision Pro (relacionado)
+    'ernie',     # ERNIE (Baidu)
+    '文心一言',  # ERNIE (Baidu)
+]
+
+
+# Pesos por palabra clave (por defecto DEFAULT_WEIGHT) y umbral: un título es
+# de IA si la suma de los pesos de las palabras distintas que contiene llega
+# al umbral. Se pueden cambiar en la sección [NewsFilter] de config.ini.
+DEFAULT_WEIGHT = 1.0
+THRESHOLD = 1.0
+KEYWORD_WEIGHTS = {}
+
+CONFIG_PATH = 'config.ini'
+
+
+def _alternation(keywords):
+    return '|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+
+
+def _keyword(match):
+    """Palabra clave de una coincidencia de KeywordMatcher (sin la 's' de plural)"""
+    return match.group(match.lastindex)
+
+
+class KeywordMatcher:
+    """
+    Buscador de palabras clave compilado en una sola expresión.
+
+    Los términos ASCII solo cuentan como palabra completa: no pueden ir
+    pegados a letras o dígitos por delante ni a letras por detrás ('ai' no
+    encaja en 'Xiaomi' ni en 'Email', 'meta' no encaja en 'metal', pero sí
+    en 'AI手机' o 'GPT-4o'), salvo una 's' de plural ('GPTs', 'AIs' cuentan
+    como 'gpt' y 'ai'). Los términos CJK se buscan tal cual.
+    """
+
+    def __init__(self, keywords, weights=None, threshold=THRESHOLD):
+        weights = weights or {}
+        self.weights = {keyword: weights.get(keyword, DEFAULT_WEIGHT) for keyword in keywords}
+        self.threshold = threshold
+        ascii_keywords = [keyword for keyword in keywords if keyword.isascii()]
+        other_keywords = [keyword for keyword in keywords if not keyword.isascii()]
+        parts = []
+        if ascii_keywords:
+            parts.append(f"(?<![a-z0-9])({_alternation(ascii_keywords)})s?(?![a-z])")
+        if other_keywords:
+            parts.append(f"({_alternation(other_keywords)})")
+        self.pattern = re.compile('|'.join(parts))
+        # Si cualquier palabra basta por sí sola, una búsqueda es suficiente
+        self._any_match_is_enough = min(self.weights.values()) >= threshold
+
+    def matches(self, title):
+        """Palabras clave distintas presentes en el título"""
+        return list(dict.fromkeys(_keyword(match) for match in self.pattern.finditer(title.lower())))
+
+    def score(self, title):
+        return sum(self.weights[keyword] for keyword in self.matches(title))
+
+    def is_match(self, title):
+        if self._any_match_is_enough:
+            return self.pattern.search(title.lower()) is not None
+        total = 0
+        seen = set()
+        for match in self.pattern.finditer(title.lower()):
+            keyword = _keyword(match)
+            if keyword not in seen:
+                seen.add(keyword)
+                total += self.weights[keyword]
+                if total >= self.threshold:
+                    return True
+        return False
+
+
+def parse_weights(text):
+    """'google=0.5, meta=0.5' -> {'google': 0.5, 'meta': 0.5}"""
+    weights = {}
+    for item in text.split(','):
+        if '=' in item:
+            keyword, weight = item.split('=', 1)
+            weights[keyword.strip().lower()] = float(weight)
+    return weights
+
+
+def load_filter_config(config_path=CONFIG_PATH):
+    """KeywordMatcher de IA con el umbral y los pesos de [NewsFilter] en config.ini"""
+    config = configparser.ConfigParser()
+    config.read(config_path, encoding='utf-8')
+    threshold = config.getfloat('NewsFilter', 'threshold', fallback=THRESHOLD)
+    weights = dict(KEYWORD_WEIGHTS)
+    weights.update(parse_weights(config.get('NewsFilter', 'weights', fallback='')))
+    return KeywordMatcher(AI_KEYWORDS, weights, threshold)
+
+
+# Compilados una sola vez al importar
+SPAM_PATTERN = re.compile(_alternation(FILTER_KEYWORDS))
+AI_MATCHER = KeywordMatcher(AI_KEYWORDS, KEYWORD_WEIGHTS, THRESHOLD)
+
+KeywordMatch = namedtuple('KeywordMatch', ['spam', 'ai'])
+
+
+def find_keywords(title, matcher=AI_MATCHER):
+    """
+    Devuelve qué palabras clave aparecen en el título (útil para depurar
+    falsos positivos): KeywordMatch(spam=[...], ai=[...]).
+    """
+    spam = list(dict.fromkeys(SPAM_PATTERN.findall(title)))
+    return KeywordMatch(spam, matcher.matches(title))
+
+
+def should_keep_news(title, matcher=AI_MATCHER):
     """
     Determina si una noticia debe conservarse.
     Debe ser sobre IA y no debe ser spam.
 
     Args:
         title (str): Título de la noticia (en chino)
+        matcher (KeywordMatcher): palabras clave de IA, pesos y umbral
 
     Returns:
         bool: True si debe conservarse, False si debe filtrarse
     """
-    
-    # 1. Filtrar spam (palabras clave a eliminar)
-    filter_keywords = ['广告', '推广', '赞助', '合作', '活动', '福利', '优惠']
-    if any(keyword in title for keyword in filter_keywords):
+    if SPAM_PATTERN.search(title):
         return False  # Es spam, no conservar
+    # Es sobre IA y no es spam -> conservar; si no, filtrar
+    return matcher.is_match(title)
+
+
+def filter_titles(titles, matcher=AI_MATCHER):
+    """
+    Versión por lotes de should_keep_news: acepta cualquier iterable y
+    devuelve una lista de bool en el mismo orden.
+    """
+    spam_search = SPAM_PATTERN.search
+    is_ai = matcher.is_match
+    return [not spam_search(title) and is_ai(title) for title in titles]
 
-    # 2. Comprobar si es sobre IA (palabras clave a conservar)
-    # Comprobamos tanto en mayúsculas/minúsculas para 'AI', 'GPT', etc.
-    title_lower = title.lower()
-    
-    # Lista ampliada de palabras clave de IA
-    ai_keywords = [
-        # --- Términos Fundamentales ---
-        'ai',        # AI
-        '人工智能',  # Inteligencia Artificial
-        'agi',       # AGI (Inteligencia General Artificial)
-        'aigc',      # AIGC (Contenido Generado por IA)
-        
-        # --- Modelos y Arquitecturas ---
-        'gpt',       # GPT
-        'llm',       # LLM (Large Language Model)
-        '大模型',    # Modelo Grande
-        '机器学习',  # Machine Learning
-        '深度学习',  # Deep Learning
-        '神经网络',  # Neural Network
-        'rag',       # RAG (Retrieval-Augmented Generation)
-
-        # --- Empresas Principales ---
-        'openai',    # OpenAI
-        'anthropic', # Anthropic
-        'google',    # Google
-        '谷歌',      # Google
-        'deepmind',  # DeepMind
-        'meta',      # Meta
-        'microsoft', # Microsoft
-        '微软',      # Microsoft
-        'nvidia',    # Nvidia
-        '英伟达',    # Nvidia
-        'baidu',     # Baidu
-        '百度',      # Baidu
-        'alibaba',   # Alibaba
-        '阿里巴巴',  # Alibaba
-        'tencent',   # Tencent
-        '腾讯',      # Tencent
-        'mistral',   # Mistral AI
-        'xai',       # xAI
-        
-        # --- Modelos/Productos Populares ---
-        'claude',    # Claude
-        'sora',      # Sora
-        'gemini',    # Gemini
-        'llama',     # Llama
-        'copilot',   # Copilot
-        'stable diffusion', # Stable Diffusion
-        'midjourney',# Midjourney
-        'vision pro', # Vision Pro (relacionado)
-        'ernie',     # ERNIE (Baidu)
-        '文心一言',  # ERNIE (Baidu)
-    ]
-    
-    if any(keyword in title_lower for keyword in ai_keywords):
-        return True  # Es sobre IA y no es spam, conservar
 
-    # 3. Si no es spam pero tampoco es sobre IA, filtrar
-    return False
+class FilterStats:
+    """Contadores del filtro: cuántas noticias se vieron y por qué se descartaron"""
 
+    def __init__(self):
+        self.seen = 0
+        self.kept = 0
+        self.spam = 0
+        self.not_ai = 0
+
+    def __str__(self):
+        dropped = self.spam + self.not_ai
+        return (f"Filtro IA: {self.seen} noticias, {self.kept} conservadas, {dropped} descartadas "
+                f"({self.spam} spam, {self.not_ai} sin relación con IA)")
+
+
+def keep_ai_news(records, stats=None, key=None, matcher=AI_MATCHER):
+    """
+    Etapa de filtrado en streaming: consume 'records' de uno en uno y solo
+    entrega los que should_keep_news conservaría, sin acumular los demás.
+    'key' extrae el título de cada registro (por defecto record['title']).
+    """
+    stats = stats if stats is not None else FilterStats()
+    for record in records:
+        title = key(record) if key else record['title']
+        stats.seen += 1
+        if SPAM_PATTERN.search(title):
+            stats.spam += 1
+        elif not matcher.is_match(title):
+            stats.not_ai += 1
+        else:
+            stats.kept += 1
+            yield record
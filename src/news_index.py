@@ -0,0 +1,309 @@
+"""
+Índice de texto completo sobre news_archive y consultas desde la línea de órdenes.
+
+Los títulos de news_archive/YYYY-MM/DD.md (en chino) y news_archive/es/*.md
+(en español) se tokenizan aquí: el texto CJK en bigramas y el resto por
+palabras en minúsculas. Los tokens van a una tabla FTS5 sin contenido
+(solo el índice invertido, con posiciones para las frases) dentro de
+news_archive/search.db. El último carácter de cada tramo CJK (para poder
+buscar un solo carácter) va a otra columna, sin ocupar posición en las
+frases. Cada fichero se reindexa solo si cambian su mtime y su hash.
+
+Uso:
+    python src/news_index.py update
+    python src/news_index.py query 大模型 --from 2025 --to 2025
+    python src/news_index.py query '"GPT-4o" OR Gemini -Google' --from 2025-05-01 --count
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import re
+import sqlite3
+import time
+
+from archive_reader import iter_text_entries
+from news_store import ARCHIVE_DIR, switch_to_parent_if_src
+
+INDEX_FILENAME = f"{ARCHIVE_DIR}/search.db"
+
+CJK = r'\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+TOKEN_PATTERN = re.compile(rf'[{CJK}]+|[^\W_{CJK}]+')
+CJK_RUN = re.compile(rf'[{CJK}]+')
+# Términos de consulta: "frase", paréntesis o palabra (con '-' delante para excluir)
+QUERY_PATTERN = re.compile(r'-?"[^"]*"|[()]|-?[^\s()"]+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    link TEXT NOT NULL,
+    title TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_file ON docs(file_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(tokens, singles, content='', columnsize=0);
+"""
+# Se sube al cambiar el esquema o la tokenización: el índice se regenera
+INDEX_VERSION = 2
+OPERATORS = ('OR', 'AND', 'NOT')
+
+
+def tokenize(text):
+    """
+    Tokens con posición: 'OpenAI 发布大模型' -> ['openai', '发布', '布大', '大模', '模型'].
+    Un tramo CJK de un solo carácter es su propio token.
+    """
+    tokens = []
+    for run in TOKEN_PATTERN.findall(text.lower()):
+        if CJK_RUN.match(run) and len(run) > 1:
+            tokens += [run[i:i + 2] for i in range(len(run) - 1)]
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def trailing_chars(text):
+    """Último carácter de cada tramo CJK de más de uno: '发布大模型' -> ['型']"""
+    return [run[-1] for run in CJK_RUN.findall(text.lower()) if len(run) > 1]
+
+
+def index_columns(title):
+    """(tokens, singles) de un título para docs_fts"""
+    return ' '.join(tokenize(title)), ' '.join(trailing_chars(title))
+
+
+def _fts_term(text):
+    """Frase FTS5 equivalente a un término; un solo carácter CJK se busca como prefijo"""
+    tokens = tokenize(text)
+    if not tokens:
+        return None
+    if len(tokens) == 1 and CJK_RUN.fullmatch(tokens[0]) and len(tokens[0]) == 1:
+        return f'"{tokens[0]}" *'
+    return '"' + ' '.join(tokens) + '"'
+
+
+def _parse_group(items, pos, nested):
+    """
+    Expresión FTS5 de items[pos:] hasta el ')' que cierra el grupo (o el
+    final); devuelve (expresión o None, posición siguiente). Cada rama de
+    OR es 'positivos AND ... NOT negativos'; se descartan los operadores sin
+    operando y las ramas que solo excluyen (FTS5 no admite un NOT inicial).
+    """
+    branches, positives, negatives = [], [], []
+    negate_next = False
+
+    def close_branch():
+        if positives:
+            expression = ' AND '.join(positives)
+            if negatives:
+                expression = f"({expression})" if len(positives) > 1 else expression
+                expression += ''.join(f" NOT {term}" for term in negatives)
+            branches.append(expression)
+        positives.clear()
+        negatives.clear()
+
+    while pos < len(items):
+        item = items[pos]
+        pos += 1
+        if item == ')':
+            if nested:
+                break
+            continue
+        if item == 'OR':
+            close_branch()
+            negate_next = False
+            continue
+        if item == 'AND':
+            continue
+        if item == 'NOT':
+            negate_next = True
+            continue
+        if item == '(':
+            operand, pos = _parse_group(items, pos, nested=True)
+            operand, negate = (f"({operand})" if operand else None), False
+        else:
+            negate = item.startswith('-')
+            operand = _fts_term(item.lstrip('-').strip('"'))
+        if operand is not None:
+            (negatives if negate or negate_next else positives).append(operand)
+        negate_next = False
+    close_branch()
+    if not branches:
+        return None, pos
+    if len(branches) == 1:
+        return branches[0], pos
+    return ' OR '.join(f"({branch})" if ' ' in branch else branch for branch in branches), pos
+
+
+def to_fts_query(query):
+    """
+    Traduce la sintaxis de consulta a FTS5: palabras separadas por espacios
+    (AND), OR, NOT o '-palabra', "frases" y paréntesis. Las exclusiones se
+    aplican al resto de su rama ('-芯片 英伟达' -> '"英伟"... NOT "芯片"').
+    Devuelve '' si no queda nada que buscar.
+    """
+    expression, _ = _parse_group(QUERY_PATTERN.findall(query), 0, nested=False)
+    return expression or ''
+
+
+def archive_files(archive_dir=ARCHIVE_DIR):
+    """[(ruta, fecha)] de los ficheros diarios y sus traducciones"""
+    files = [(path, f"{path[-13:-6]}-{path[-5:-3]}")
+             for path in glob.glob(f"{archive_dir}/[0-9][0-9][0-9][0-9]-[0-9][0-9]/[0-9][0-9].md")
+             if not path.endswith('/00.md')]
+    files += [(path, os.path.basename(path)[:-3]) for path in glob.glob(f"{archive_dir}/es/*.md")]
+    return sorted(files)
+
+
+def file_hash(content):
+    return hashlib.sha1(content).hexdigest()
+
+
+class NewsIndex:
+    """Índice invertido persistente; usar como context manager"""
+
+    def __init__(self, path=INDEX_FILENAME, archive_dir=ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            # Índice de una versión anterior: se regenera entero
+            self.conn.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS docs; "
+                                    "DROP TABLE IF EXISTS docs_fts;")
+            self.conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def _remove_file(self, file_id):
+        rows = self.conn.execute("SELECT id, title FROM docs WHERE file_id = ?", (file_id,)).fetchall()
+        self.conn.executemany("INSERT INTO docs_fts (docs_fts, rowid, tokens, singles) VALUES ('delete', ?, ?, ?)",
+                              [(doc_id, *index_columns(title)) for doc_id, title in rows])
+        self.conn.execute("DELETE FROM docs WHERE file_id = ?", (file_id,))
+
+    def _add_docs(self, file_id, date, entries):
+        for title, link in entries:
+            cursor = self.conn.execute("INSERT INTO docs (file_id, date, link, title) VALUES (?, ?, ?, ?)",
+                                       (file_id, date, link, title))
+            self.conn.execute("INSERT INTO docs_fts (rowid, tokens, singles) VALUES (?, ?, ?)",
+                              (cursor.lastrowid, *index_columns(title)))
+
+    def update(self):
+        """Reindexa los ficheros nuevos o modificados y olvida los borrados; devuelve cuántos cambiaron"""
+        known = {path: (file_id, mtime, size, digest) for file_id, path, mtime, size, digest
+                 in self.conn.execute("SELECT id, path, mtime, size, hash FROM files")}
+        changed = 0
+        with self.conn:
+            present = set()
+            for path, date in archive_files(self.archive_dir):
+                present.add(path)
+                stat = os.stat(path)
+                previous = known.get(path)
+                if previous and previous[1] == stat.st_mtime and previous[2] == stat.st_size:
+                    continue
+                with open(path, 'rb') as f:
+                    content = f.read()
+                digest = file_hash(content)
+                if previous and previous[3] == digest:
+                    self.conn.execute("UPDATE files SET mtime = ? WHERE id = ?", (stat.st_mtime, previous[0]))
+                    continue
+                if previous:
+                    self._remove_file(previous[0])
+                    self.conn.execute("UPDATE files SET mtime = ?, size = ?, hash = ? WHERE id = ?",
+                                      (stat.st_mtime, stat.st_size, digest, previous[0]))
+                    file_id = previous[0]
+                else:
+                    file_id = self.conn.execute(
+                        "INSERT INTO files (path, mtime, size, hash) VALUES (?, ?, ?, ?)",
+                        (path, stat.st_mtime, stat.st_size, digest)).lastrowid
+                self._add_docs(file_id, date, iter_text_entries(content))
+                changed += 1
+            for path in set(known) - present:
+                self._remove_file(known[path][0])
+                self.conn.execute("DELETE FROM files WHERE id = ?", (known[path][0],))
+                changed += 1
+        return changed
+
+    def search(self, query, date_from=None, date_to=None, limit=None):
+        """
+        [(fecha, link, título)] que cumplen la consulta, de la más reciente a la
+        más antigua. Las fechas admiten prefijos: '2025', '2025-10', '2025-10-26'.
+        """
+        if not to_fts_query(query):
+            return []
+        sql, params = self._search_sql("SELECT docs.date, docs.link, docs.title", query, date_from, date_to)
+        sql += " ORDER BY docs.date DESC, docs.id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    def count(self, query, date_from=None, date_to=None):
+        if not to_fts_query(query):
+            return 0
+        sql, params = self._search_sql("SELECT COUNT(*)", query, date_from, date_to)
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def _search_sql(self, select, query, date_from, date_to):
+        sql = f"{select} FROM docs_fts JOIN docs ON docs.id = docs_fts.rowid WHERE docs_fts MATCH ?"
+        params = [to_fts_query(query)]
+        if date_from:
+            sql += " AND docs.date >= ?"
+            params.append(date_from)
+        if date_to:
+            # '2025' incluye todo 2025: se compara con el prefijo seguido del mayor carácter
+            sql += " AND docs.date <= ?"
+            params.append(f"{date_to}\uffff")
+        return sql, params
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice de búsqueda de news_archive")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('update', help="indexa los ficheros nuevos o modificados")
+    query_parser = subparsers.add_parser('query', help="busca titulares")
+    query_parser.add_argument('query', help='palabras (AND), OR, NOT o -palabra, "frases", paréntesis')
+    query_parser.add_argument('--from', dest='date_from', help="fecha inicial (YYYY, YYYY-MM o YYYY-MM-DD)")
+    query_parser.add_argument('--to', dest='date_to', help="fecha final (YYYY, YYYY-MM o YYYY-MM-DD)")
+    query_parser.add_argument('--limit', type=int, default=50)
+    query_parser.add_argument('--count', action='store_true', help="solo muestra el número de resultados")
+    args = parser.parse_args()
+
+    switch_to_parent_if_src()
+    with NewsIndex() as index:
+        start = time.perf_counter()
+        changed = index.update()
+        if args.command == 'update' or changed:
+            print(f"Índice actualizado: {changed} ficheros en {time.perf_counter() - start:.2f} s")
+        if args.command == 'query':
+            start = time.perf_counter()
+            try:
+                if args.count:
+                    print(index.count(args.query, args.date_from, args.date_to))
+                else:
+                    for date, link, title in index.search(args.query, args.date_from, args.date_to, args.limit):
+                        print(f"{date}  {title}  {link}")
+            except sqlite3.OperationalError as error:
+                raise SystemExit(f"Consulta no válida: {args.query} ({error})")
+            print(f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,223 +1,163 @@
+import argparse
 import os
-import re
 import time
 import ssl
 import urllib.request
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
 from zoneinfo import ZoneInfo
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import chromedriver_autoinstaller  # CORREGIDO: era chromedriver_autautoinstaller
+import configparser
+from driver_pool import PAGE_LOAD_TIMEOUT, load_pool, new_driver
+from metrics import add_profile_argument, count, profiling, timed, write_run
+from news_store import TIME_FORMAT, NewsStore, switch_to_parent_if_src
+from scoring import HIDDEN_SCORE, adjust_value_based_on_time, calculate_score
+from vote_fetcher import build_vote_backends, fetch_votes
 
 # Deshabilitar verificación de certificado SSL
 ssl._create_default_https_context = ssl._create_unverified_context
 
 # Constantes
-MAX_RETRIES = 3
-WAIT_TIME = 3
-TIMEOUT = 10
-
-def setup_driver():
-    """Configura y retorna Selenium WebDriver"""
-    chromedriver_autoinstaller.install()  # Instala automáticamente ChromeDriver compatible
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--disable-gpu')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    return webdriver.Chrome(options=options)
-
-# Función de puntuación
-def calculate_score(valuable, unvaluable):
-    total = valuable + unvaluable
-    if total == 0:
-        return 0
-    elif valuable == 0 and unvaluable != 0:
-        return -10
-    elif unvaluable == 0 and valuable != 0:
-        return 10 + valuable
-    else:
-        return (valuable / total) * 10
-
-def adjust_value_based_on_time(value, news_time_str):
-    """Ajusta el valor según el tiempo de publicación de la noticia"""
-    try:
-        # Asume formato news_time_str como "YYYY-MM-DD HH:MM:SS"
-        news_time = datetime.strptime(news_time_str, "%Y-%m-%d %H:%M:%S")
-        now = datetime.now()
-        hours_diff = (now - news_time).total_seconds() / 3600
-        if hours_diff <= 1:
-            return value * 1.5
-        elif hours_diff <= 3:
-            return value * 1.2
-        elif hours_diff > 24:
-            return value * 0.8
-        return value
-    except ValueError:
-        return value
-
-def fetch_news_values(news_list, driver):
-    """Obtiene las puntuaciones de valor de las noticias"""
-    values_dict = {}
-    for i, news in enumerate(news_list):
-        link = news['link']
-        if "t.me" in link or "mp.weixin.qq.com" in link:
-            values_dict[link] = 0
-            continue
-        
-        print(f"Procesando noticia {i+1}/{len(news_list)}: {news['title'][:60]}...")
-        
-        for attempt in range(MAX_RETRIES):
-            try:
-                driver.get(link)
-                WebDriverWait(driver, TIMEOUT).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-                
-                # Intentar múltiples formas de obtener "vale" y "no vale"
-                valuable = 0
-                unvaluable = 0
-                
-                try:
-                    valuable_element = driver.find_element(By.XPATH, "//*[contains(text(), '值得')]")
-                    valuable_text = valuable_element.text
-                    valuable_match = re.search(r'(\d+)', valuable_text)
-                    if valuable_match:
-                        valuable = int(valuable_match.group(1))
-                except NoSuchElementException:
-                    pass  # No encontrado, no pasa nada
-
-                try:
-                    unvaluable_element = driver.find_element(By.XPATH, "//*[contains(text(), '不值得')]")
-                    unvaluable_text = unvaluable_element.text
-                    unvaluable_match = re.search(r'(\d+)', unvaluable_text)
-                    if unvaluable_match:
-                        unvaluable = int(unvaluable_match.group(1))
-                except NoSuchElementException:
-                    pass  # No encontrado, no pasa nada
-
-                # Intentar plan B
-                if valuable == 0 and unvaluable == 0:
-                    try:
-                        valuable = int(driver.find_element(By.ID, "news_value_up").text)
-                        unvaluable = int(driver.find_element(By.ID, "news_value_down").text)
-                    except (NoSuchElementException, ValueError):
-                        pass
-
-                score = calculate_score(valuable, unvaluable)
-                
-                # Intentar obtener tiempo
-                news_time_str = ""
-                try:
-                    # Intentar múltiples formas de obtener tiempo
-                    time_element = driver.find_element(By.CSS_SELECTOR, "time.ago")
-                    news_time_str = time_element.get_attribute('datetime')  # Asume formato "YYYY-MM-DD HH:MM:SS"
-                except NoSuchElementException:
-                    try:
-                        time_element = driver.find_element(By.CSS_SELECTOR, ".meta-date")
-                        news_time_str = time_element.text
-                        # Asume formato "YYYY年MM月DD日 HH:MM" -> "YYYY-MM-DD HH:MM:SS"
-                        if '年' in news_time_str:
-                             news_time_obj = datetime.strptime(news_time_str, "%Y年%m月%d日 %H:%M")
-                             news_time_str = news_time_obj.strftime("%Y-%m-%d %H:%M:%S")
-                    except NoSuchElementException:
-                        news_time_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # Fallback
-
-                adjusted_score = adjust_value_based_on_time(score, news_time_str)
-                values_dict[link] = adjusted_score
-                
-                print(f"  > Puntuación: {score:.2f}, ajustada: {adjusted_score:.2f} (vale: {valuable}, no vale: {unvaluable})")
-                
-                time.sleep(WAIT_TIME)
-                break  # Éxito, salir del bucle de reintentos
-
-            except TimeoutException:
-                print(f"  > Enlace timeout: {link} (intento {attempt + 1}/{MAX_RETRIES})")
-                if attempt == MAX_RETRIES - 1:
-                    values_dict[link] = 0
-            except Exception as e:
-                print(f"  > Error al procesar: {link} (intento {attempt + 1}/{MAX_RETRIES}) - {e}")
-                if attempt == MAX_RETRIES - 1:
-                    values_dict[link] = 0
-                    
-    return values_dict
-
-def parse_news(news_md):
-    """
-    Parsea lista de noticias en Markdown
-    Soporta formatos:
-    - HTML: <p><a href="LINK">TITLE</a></p>
-    - Markdown: [TITLE](LINK)
-    """
-    news_list = []
-    
-    # Intentar formato HTML primero
-    pattern_html = re.compile(r'<p><a href="(.*?)">(.*?)</a></p>')
-    matches = pattern_html.findall(news_md)
-    
-    if matches:
-        for link, title in matches:
-            news_list.append({'link': link, 'title': title})
-        return news_list
-    
-    # Fallback: intentar formato Markdown
-    pattern_md = re.compile(r'\[(.*?)\]\((.*?)\)')
-    matches_md = pattern_md.findall(news_md)
-    
-    if matches_md:
-        for title, link in matches_md:
-            news_list.append({'link': link, 'title': title})
-    
-    return news_list
+CONFIG_PATH = 'config.ini'
+RESCORE_RECENT_HOURS = 48   # Noticias más recientes: siempre se vuelven a pedir sus votos
+RESCORE_MIN_CHANGE = 1      # Votos de diferencia entre las dos últimas lecturas para seguir pidiéndolos
+RESCORE_DAYS = 3            # Días anteriores a ayer que se vuelven a puntuar
+
+def setup_driver(page_load_timeout=PAGE_LOAD_TIMEOUT):
+    """Configura y retorna Selenium WebDriver (ver driver_pool)"""
+    return new_driver(page_load_timeout)
+
+def load_sorter_config(config_path=CONFIG_PATH):
+    """Lee config.ini (secciones [NewsSorter], [VoteAPI] y [WebDriver])"""
+    config = configparser.ConfigParser()
+    config.read(config_path, encoding='utf-8')
+    return config
+
+def has_votes(link):
+    # Solo los artículos de IT之家 tienen votos (t.me, mp.weixin.qq.com y
+    # las demás fuentes de config.ini puntúan 0)
+    return urlsplit(link).netloc.endswith('ithome.com')
 
 def sort_news_by_value(news_list, values_dict):
     """Ordena noticias por puntuación de valor"""
     # Filtrar noticias con puntuación -10 ("no vale la pena")
-    filtered_list = [news for news in news_list if values_dict.get(news['link'], 0) > -10]
+    filtered_list = [news for news in news_list if values_dict.get(news['link'], 0) > HIDDEN_SCORE]
     
     # Ordenar por puntuación descendente
     sorted_list = sorted(filtered_list, key=lambda x: values_dict.get(x['link'], 0), reverse=True)
     return sorted_list
 
-def format_news_to_md(sorted_news):
-    """Formatea noticias ordenadas de vuelta a Markdown"""
-    md_content = ""
-    for news in sorted_news:
-        md_content += f"<p><a href=\"{news['link']}\">{news['title']}</a></p>\n"
-    return md_content
-
-def switch_to_parent_if_src():
-    """Verifica si el directorio actual termina en 'src', si es así cambia al directorio padre"""
-    current_dir = os.getcwd()
-    base_name = os.path.basename(current_dir)
-
-    if base_name == 'src':
-        parent_dir = os.path.dirname(current_dir)
-        os.chdir(parent_dir)
-        print(f'Cambiado al directorio padre: {parent_dir}')
+def needs_refresh(snapshots, published, now, recent_hours=RESCORE_RECENT_HOURS, min_change=RESCORE_MIN_CHANGE):
+    """
+    Si hay que volver a pedir los votos de una noticia ('snapshots': sus
+    lecturas [(fetched_at, vale, no vale)], de la más antigua a la última).
+    Se piden los de las noticias sin lecturas, las publicadas hace menos de
+    recent_hours y aquellas cuyos contadores aún cambian: al menos min_change
+    votos entre las dos últimas lecturas o, con una sola, si se hizo cuando
+    la noticia era reciente.
+    """
+    if not snapshots:
+        return True
+    try:
+        published_time = datetime.strptime(published, TIME_FORMAT)
+    except (TypeError, ValueError):
+        published_time = None
+    if published_time and (now - published_time).total_seconds() / 3600 <= recent_hours:
+        return True
+    if len(snapshots) == 1:
+        fetched_at = datetime.strptime(snapshots[0][0], TIME_FORMAT)
+        return published_time is not None and (fetched_at - published_time).total_seconds() / 3600 <= recent_hours
+    (_, valuable, unvaluable), (_, last_valuable, last_unvaluable) = snapshots[-2:]
+    return abs(last_valuable - valuable) + abs(last_unvaluable - unvaluable) >= min_change
+
+@timed('sort.sort_day')
+def sort_day(store, day, records, config=None, now=None):
+    """
+    Puntúa y ordena las noticias de un día ('records': dicts o filas con
+    'link', 'title' y 'published'), guarda el orden en el almacén y regenera
+    DD.md. Devuelve los registros ordenados (sin los de -10) con su 'score'.
+
+    Cada lectura de votos queda en el historial del almacén. Si el día ya
+    estaba ordenado solo se vuelven a pedir los votos de las noticias que
+    aún cambian (needs_refresh); las demás conservan su última lectura. Se
+    guarda la puntuación base: el ajuste por antigüedad se aplica al leer.
+    """
+    config = config or load_sorter_config()
+    now = now or datetime.now()
+    records = [dict(record) for record in records]
+    history = store.vote_history(day)
+    if store.is_sorted(day):
+        recent_hours = config.getfloat('NewsSorter', 'rescore_recent_hours', fallback=RESCORE_RECENT_HOURS)
+        min_change = config.getint('NewsSorter', 'rescore_min_change', fallback=RESCORE_MIN_CHANGE)
+        refresh = [record for record in records if has_votes(record['link'])
+                   and needs_refresh(history.get(record['link']), record['published'], now, recent_hours, min_change)]
+    else:
+        refresh = [record for record in records if has_votes(record['link'])]
+    count('sort.votes_refreshed', len(refresh))
+    count('sort.votes_kept', sum(has_votes(record['link']) for record in records) - len(refresh))
+
+    votes = {}
+    if refresh:
+        # Los navegadores solo se arrancan si la cadena llega al respaldo de Selenium
+        with load_pool(config, factory=setup_driver) as pool:
+            backends = build_vote_backends(config, driver_factory=pool.driver, driver_concurrency=pool.size)
+            votes = fetch_votes(refresh, backends)
+        if pool.created:
+            print(pool.summary())
+        store.add_votes(now, votes)
+    print(f"{day}: votos pedidos de {len(refresh)} noticias, {len(votes)} resueltas")
+
+    scores, news_list = {}, []
+    for record in records:
+        link = record['link']
+        if link in votes:
+            valuable, unvaluable, published = votes[link]
+            record['published'] = record['published'] or published
+        elif history.get(link):
+            _, valuable, unvaluable = history[link][-1]
+        else:
+            valuable = unvaluable = 0
+        scores[link] = calculate_score(valuable, unvaluable)
+        news_list.append({'link': link, 'title': record['title'], 'time': record['published'] or ''})
+    # El orden guardado (rank) es el de ahora; al leer se vuelve a ajustar por antigüedad
+    values_dict = {news['link']: adjust_value_based_on_time(scores[news['link']], news['time'], now)
+                   for news in news_list}
+    sorted_news = [news for news in sort_news_by_value(news_list, values_dict)
+                   if scores[news['link']] > HIDDEN_SCORE]
+    store.set_scores(day, [news['link'] for news in sorted_news], scores)
+    store.write_day(day)
+    by_link = {record['link']: record for record in records}
+    return [dict(by_link[news['link']], score=scores[news['link']], rank=rank)
+            for rank, news in enumerate(sorted_news)]
+
+def rescore_days(store, days, config=None, now=None):
+    """Vuelve a puntuar los días ya ordenados de 'days' pidiendo solo los votos que cambian"""
+    for day in days:
+        if store.is_sorted(day):
+            sort_day(store, day, store.day_news(day, hidden=True), config, now)
+
+def rescore_previous_days(store, date_obj, config, days=None):
+    """Re-puntúa los 'days' días anteriores a date_obj (por defecto [NewsSorter] rescore_days)"""
+    if days is None:
+        days = config.getint('NewsSorter', 'rescore_days', fallback=RESCORE_DAYS)
+    previous_days = [(date_obj - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(1, days + 1)]
+    rescore_days(store, previous_days, config)
 
 def process_yesterday_news(yesterday, yesterday_news_filename):
     """Procesa las noticias de ayer"""
-    with open(yesterday_news_filename, 'r', encoding='utf-8') as f:
-        yesterday_news = f.read()
-    if "(sorted)" in yesterday_news:
-        print(f"{yesterday_news_filename} ya está ordenado, saltando procesamiento")
-        return
-    news_list = parse_news(yesterday_news)
-    with setup_driver() as driver:
-        values_dict = fetch_news_values(news_list, driver)
-    sorted_news = sort_news_by_value(news_list, values_dict)
-    formatted_md = format_news_to_md(sorted_news)
-    with open(yesterday_news_filename, 'w', encoding='utf-8') as f:
-        f.write(f"# 今日新闻 - {yesterday.strftime('%Y年%m月%d日')}(sorted)\n")
-        f.write(formatted_md)
+    day = yesterday.strftime('%Y-%m-%d')
+    with NewsStore() as store:
+        if store.is_sorted(day):
+            print(f"{yesterday_news_filename} ya está ordenado, se actualizan los votos que cambian")
+        sort_day(store, day, store.day_news(day, hidden=True))
     print(f"Noticias ordenadas exitosamente y guardadas en {yesterday_news_filename}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Ordena por votos las noticias de ayer")
+    parser.add_argument('--rescore-days', type=int,
+                        help="días anteriores a ayer que se vuelven a puntuar (por defecto [NewsSorter] rescore_days)")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
     start_time = time.time()
     switch_to_parent_if_src()
     tz = ZoneInfo('Asia/Shanghai')
@@ -231,14 +171,25 @@ def main():
     if os.path.exists(yesterday_news_filename):
         print(f"Comenzando a procesar {yesterday_news_filename}...")
         try:
-            process_yesterday_news(yesterday, yesterday_news_filename)
+            with profiling(args.profile, 'news_sorter'):
+                process_yesterday_news(yesterday, yesterday_news_filename)
         except Exception as e:
             print(f"Error al procesar {yesterday_news_filename}: {e}")
+            count('errors')
     else:
         print(f"Archivo {yesterday_news_filename} no existe, saltando procesamiento")
 
+    # Los votos de los días anteriores aún cambian: solo se piden los de esas noticias
+    try:
+        with NewsStore() as store:
+            rescore_previous_days(store, yesterday, load_sorter_config(), args.rescore_days)
+    except Exception as e:
+        print(f"Error al volver a puntuar los días anteriores: {e}")
+        count('errors')
+
     end_time = time.time()
     print(f"Script completado, tiempo total: {end_time - start_time:.2f} segundos")
+    write_run('news_sorter', {'day': yesterday.strftime('%Y-%m-%d')})
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
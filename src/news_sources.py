@@ -0,0 +1,274 @@
+"""
+Motor de fuentes de noticias configurable desde config.ini.
+
+Cada sección [NewsSource_<Nombre>] declara una fuente: 'type' elige el
+plugin de SOURCE_TYPES (por defecto 'html') y el resto de claves son sus
+parámetros. Todas las fuentes se descargan a la vez con una Session
+compartida (pool de conexiones) y cada una tiene su propio timeout: una
+fuente lenta o rota se descarta sin retrasar a las demás. Todas devuelven
+los mismos dicts que el scraper de IT之家: {'category', 'title', 'link', 'time'}.
+
+Modo incremental: cada fuente guarda en news_archive/scrape_state.json la
+URL descargada, su ETag/Last-Modified y lo último que vio. La siguiente
+descarga de la misma URL envía If-None-Match/If-Modified-Since (un 304 no
+devuelve noticias) y solo entrega las noticias nuevas, de modo que a la
+deduplicación y la escritura llega únicamente lo que ha cambiado.
+"""
+
+import configparser
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from urllib.parse import urljoin, urlsplit
+
+from bs4 import BeautifulSoup
+
+from archive_writer import atomic_write
+from http_pool import get_with_retries, make_session
+from metrics import count, timer
+from ithome import ARCHIVE_URL, HEADERS, parse_archive_html, response_text, truncate_before_link
+
+CONFIG_PATH = 'config.ini'
+STATE_FILENAME = 'news_archive/scrape_state.json'
+SECTION_PREFIX = 'NewsSource_'
+SOURCE_TIMEOUT = 15
+SOURCE_RETRIES = 1
+MIN_TITLE_LENGTH = 4
+# Margen sobre el timeout de una fuente antes de darla por perdida
+DEADLINE_GRACE = 1.0
+
+
+class NewsSource:
+    """Fuente de noticias; las subclases implementan fetch(session, date_str)"""
+
+    def __init__(self, name, url=None, timeout=SOURCE_TIMEOUT, retries=SOURCE_RETRIES, enabled=True):
+        self.name = name
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.enabled = enabled
+
+    @property
+    def deadline(self):
+        """Tiempo máximo que el motor espera a esta fuente"""
+        return self.timeout * self.retries + DEADLINE_GRACE
+
+    def fetch(self, session, date_str, state=None):
+        """
+        Noticias de la fuente. Con 'state' (dict de esta fuente, se actualiza
+        en el sitio) la descarga es condicional y solo se devuelven noticias
+        nuevas respecto a la ejecución anterior.
+        """
+        raise NotImplementedError
+
+    def get(self, session, url, state=None):
+        """GET condicional: devuelve la respuesta, o None si no cambió (304)"""
+        headers = dict(HEADERS)
+        if state is not None:
+            if state.get('url') != url:
+                state.clear()
+                state['url'] = url
+            if state.get('etag'):
+                headers['If-None-Match'] = state['etag']
+            if state.get('last_modified'):
+                headers['If-Modified-Since'] = state['last_modified']
+        response = get_with_retries(session, url, retries=self.retries, timeout=self.timeout,
+                                    headers=headers)
+        if response.status_code == 304:
+            count('sources.not_modified')
+            return None
+        if state is not None:
+            state['etag'] = response.headers.get('ETag')
+            state['last_modified'] = response.headers.get('Last-Modified')
+        return response
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r}, {self.url!r})"
+
+
+class HtmlListSource(NewsSource):
+    """
+    Página estática con una lista de noticias: 'selector' delimita los
+    bloques de la lista y 'link_selector' los enlaces de cada noticia dentro
+    de ellos. No hay hora de publicación, así que 'time' queda a None: se
+    descarga la portada actual sea cual sea date_str, y script.py no guarda
+    estas noticias en el archivo diario hasta que la fuente tenga fechas.
+    """
+
+    def __init__(self, name, url, selector, link_selector='a[href]', category=None,
+                 min_title_length=MIN_TITLE_LENGTH, **kwargs):
+        super().__init__(name, url, **kwargs)
+        self.selector = selector
+        self.link_selector = link_selector
+        self.category = category or name
+        self.min_title_length = min_title_length
+
+    def parse(self, html):
+        soup = BeautifulSoup(html, 'html.parser')
+        news_data = []
+        seen = set()
+        for block in soup.select(self.selector):
+            for anchor in block.select(self.link_selector):
+                title = anchor.get_text(' ', strip=True)
+                href = anchor.get('href')
+                if not href or len(title) < self.min_title_length:
+                    continue
+                link = urljoin(self.url, href)
+                if urlsplit(link).scheme not in ('http', 'https') or link in seen:
+                    continue
+                seen.add(link)
+                news_data.append({'category': self.category, 'title': title, 'link': link, 'time': None})
+        return news_data
+
+    def fetch(self, session, date_str, state=None):
+        response = self.get(session, self.url, state)
+        if response is None:
+            return []
+        if not response.encoding or response.encoding.lower() == 'iso-8859-1':
+            response.encoding = response.apparent_encoding or 'utf-8'
+        news_data = self.parse(response.text)
+        if state is None:
+            return news_data
+        # Sin fechas en la lista: lo nuevo es lo que no estaba en la descarga anterior
+        seen = set(state.get('links', []))
+        state['links'] = [news['link'] for news in news_data]
+        return [news for news in news_data if news['link'] not in seen]
+
+
+class ItHomeSource(NewsSource):
+    """
+    Página de archivo diario de IT之家; 'url' es una plantilla con {date_str}.
+    La lista va de la noticia más nueva a la más antigua: en modo incremental
+    el HTML se corta antes de la última noticia vista y solo se parsea lo
+    que queda por encima.
+    """
+
+    def __init__(self, name, url=ARCHIVE_URL, **kwargs):
+        super().__init__(name, url, **kwargs)
+
+    def fetch(self, session, date_str, state=None):
+        url = self.url.format(date_str=date_str)
+        response = self.get(session, url, state)
+        if response is None:
+            return []
+        html = response_text(response)
+        since, truncated = None, False
+        if state is not None and state.get('last_link'):
+            html, truncated = truncate_before_link(html, state['last_link'])
+            since = datetime.fromisoformat(state['last_time'])
+        news_data = parse_archive_html(html, base_url=url, since=since)
+        if not news_data and since is None:
+            # Sin lista renderizada: error para que se use el respaldo
+            raise ValueError("página sin noticias")
+        if state is not None and news_data:
+            newest = max(news_data, key=lambda news: news['time'])
+            state['last_link'] = newest['link']
+            state['last_time'] = newest['time'].isoformat()
+        return news_data
+
+
+# Plugins disponibles para la clave 'type' de cada sección
+SOURCE_TYPES = {
+    'html': HtmlListSource,
+    'ithome': ItHomeSource,
+}
+
+# Claves de config.ini que no son cadenas
+INT_OPTIONS = {'retries', 'min_title_length'}
+FLOAT_OPTIONS = {'timeout'}
+BOOL_OPTIONS = {'enabled'}
+
+
+def source_from_section(name, section):
+    """Crea la fuente de una sección de config.ini"""
+    options = {}
+    for key in section:
+        if key == 'type':
+            continue
+        if key in INT_OPTIONS:
+            options[key] = section.getint(key)
+        elif key in FLOAT_OPTIONS:
+            options[key] = section.getfloat(key)
+        elif key in BOOL_OPTIONS:
+            options[key] = section.getboolean(key)
+        else:
+            options[key] = section.get(key)
+    source_type = section.get('type', 'html')
+    if source_type not in SOURCE_TYPES:
+        raise ValueError(f"Fuente {name}: tipo desconocido '{source_type}'")
+    return SOURCE_TYPES[source_type](name, **options)
+
+
+def load_sources(config=None, config_path=CONFIG_PATH):
+    """Fuentes activas de las secciones [NewsSource_*], en el orden del fichero"""
+    if config is None:
+        config = configparser.ConfigParser()
+        config.read(config_path, encoding='utf-8')
+    sources = []
+    for section_name in config.sections():
+        if section_name.startswith(SECTION_PREFIX):
+            source = source_from_section(section_name[len(SECTION_PREFIX):], config[section_name])
+            if source.enabled:
+                sources.append(source)
+    return sources
+
+
+def _timed_fetch(source, session, date_str, state):
+    with timer(f"sources.{source.name}"):
+        return source.fetch(session, date_str, state)
+
+
+def load_state(path=STATE_FILENAME):
+    """Estado incremental de las fuentes: {nombre: {...}}"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_state(state, path=STATE_FILENAME):
+    atomic_write(path, json.dumps(state, ensure_ascii=False, indent=1, sort_keys=True))
+
+
+def fetch_sources(sources, date_str, session=None, max_workers=None, state=None):
+    """
+    Descarga todas las fuentes a la vez. Devuelve {nombre: [noticias]} en el
+    orden de 'sources'; las fuentes que fallan o superan su plazo dan None.
+    Con 'state' (ver load_state) las descargas son incrementales.
+    """
+    if not sources:
+        return {}
+    session = session or make_session(pool_size=len(sources))
+    executor = ThreadPoolExecutor(max_workers=max_workers or len(sources))
+    start = time.monotonic()
+    # Cada fuente trabaja sobre una copia: una fuente descartada no deja su estado a medias
+    source_states = {source.name: dict(state.get(source.name, {})) if state is not None else None
+                     for source in sources}
+    futures = {source.name: executor.submit(_timed_fetch, source, session, date_str, source_states[source.name])
+               for source in sources}
+    results = {}
+    try:
+        for source in sources:
+            future = futures[source.name]
+            remaining = source.deadline - (time.monotonic() - start)
+            wait([future], timeout=max(0, remaining))
+            elapsed = time.monotonic() - start
+            if not future.done():
+                print(f"Fuente {source.name}: sin respuesta tras {elapsed:.1f} s, se descarta")
+                count('sources.timeouts')
+                results[source.name] = None
+            elif future.exception() is not None:
+                print(f"Fuente {source.name}: error {future.exception()}")
+                count('sources.errors')
+                results[source.name] = None
+            else:
+                results[source.name] = future.result()
+                if state is not None:
+                    state[source.name] = source_states[source.name]
+                print(f"Fuente {source.name}: {len(results[source.name])} noticias")
+    finally:
+        # No se espera a las fuentes colgadas: terminarán con su propio timeout
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
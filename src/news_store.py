@@ -0,0 +1,555 @@
+"""
+Almacén persistente de noticias (SQLite en modo WAL) indexado por link.
+
+Lo comparten el scraper (script.py), el ordenador (news_sorter.py) y el
+traductor (main.py). news.db no se sube al repositorio (en GitHub Actions se
+conserva en la caché) y los ficheros .md de news_archive siguen mandando:
+
+- La tabla files apunta de cada 00.md, DD.md y traducción el tamaño, el
+  mtime y el sha1 que tenían al importarlos o escribirlos. Antes de leer un
+  mes se comparan con los de disco; si alguno cambió (otra ejecución, una
+  caché de news.db antigua) o el almacén tiene cambios que no llegaron a
+  escribirse, el mes se vuelve a importar y se descartan las noticias que no
+  están en sus ficheros.
+- La tabla entries guarda cada línea de 00.md y DD.md tal cual (cabecera,
+  formato markdown o HTML, títulos revisados con el mismo link), así que las
+  vistas se regeneran byte a byte. Una noticia nueva solo añade su línea al
+  final de 00.md y DD.md; ordenar un día reescribe su DD.md.
+
+month_changes apunta cuándo cambió por última vez lo que el almacén sabe de
+cada mes, incluidas puntuaciones y traducciones que no están en 00.md.
+
+La tabla votes guarda cada lectura de los contadores de votos de un artículo
+(instantáneas con su hora). news.score es la puntuación base de la última
+lectura; el ajuste por antigüedad se calcula al leer (scoring.decayed_score).
+"""
+
+import glob
+import hashlib
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+from archive_reader import iter_text_entries
+from archive_writer import atomic_write, recover_all
+from scoring import HIDDEN_SCORE, TIME_FORMAT, decayed_score
+
+ARCHIVE_DIR = "news_archive"
+STORE_FILENAME = f"{ARCHIVE_DIR}/news.db"
+MONTH_HEADER = "# 本月新闻\n"
+# Directorios del archivo en los que ya se completaron los commits interrumpidos
+_recovered_dirs = set()
+
+MARKDOWN_LINE = re.compile(r'- \[(.*)\]\((.*?)\)\n')
+HTML_LINE = re.compile(r'<p><a href="(.*?)">(.*)</a></p>\n')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    link TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    category TEXT,
+    published TEXT,
+    month TEXT NOT NULL,
+    day TEXT,
+    rank INTEGER,
+    score REAL,
+    title_es TEXT
+);
+CREATE INDEX IF NOT EXISTS news_month ON news(month);
+CREATE INDEX IF NOT EXISTS news_day ON news(day);
+CREATE TABLE IF NOT EXISTS days (
+    day TEXT PRIMARY KEY,
+    sorted INTEGER NOT NULL DEFAULT 0,
+    translated INTEGER NOT NULL DEFAULT 0
+);
+-- Ficheros de news_archive (ruta relativa) tal como se importaron o escribieron;
+-- dirty = 1 si el almacén tiene cambios de la vista que aún no están en disco
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    month TEXT NOT NULL,
+    header TEXT NOT NULL,
+    size INTEGER,
+    mtime_ns INTEGER,
+    sha1 TEXT,
+    dirty INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS files_month ON files(month);
+-- Líneas de 00.md y DD.md tras la cabecera: kind es 'md', 'html' o 'raw'
+-- (cualquier otra línea, guardada entera en title)
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    link TEXT,
+    PRIMARY KEY (path, position)
+);
+CREATE TABLE IF NOT EXISTS votes (
+    link TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    valuable INTEGER NOT NULL,
+    unvaluable INTEGER NOT NULL,
+    PRIMARY KEY (link, fetched_at)
+);
+-- Último cambio de las noticias de cada mes (importación, alta, votos,
+-- puntuación o traducción); la exportación columnar lo compara
+CREATE TABLE IF NOT EXISTS month_changes (
+    month TEXT PRIMARY KEY,
+    changed_at TEXT NOT NULL
+);
+-- Marca de los almacenes anteriores (un mes se importaba una sola vez)
+DROP TABLE IF EXISTS months;
+"""
+
+
+def markdown_entry(title, link):
+    return f"- [{title}]({link})\n"
+
+
+def html_entry(title, link):
+    return f"<p><a href=\"{link}\">{title}</a></p>\n"
+
+
+def month_path(year_month, archive_dir=ARCHIVE_DIR):
+    return f"{archive_dir}/{year_month}/00.md"
+
+
+def day_path(day, archive_dir=ARCHIVE_DIR):
+    """'2025-10-26' -> 'news_archive/2025-10/26.md'"""
+    return f"{archive_dir}/{day[:7]}/{day[8:]}.md"
+
+
+def translation_path(day, archive_dir=ARCHIVE_DIR):
+    return f"{archive_dir}/es/{day}.md"
+
+
+def day_title(day):
+    """'2025-10-26' -> '2025年10月26日'"""
+    year, month, day_of_month = day.split('-')
+    return f"{year}年{month}月{day_of_month}日"
+
+
+def day_header(day, is_sorted=False):
+    return f"# 今日新闻 - {day_title(day)}{'(sorted)' if is_sorted else ''}\n"
+
+
+def parse_line(line):
+    """(kind, título, link) de una línea de 00.md o DD.md; las que no son entradas, ('raw', línea, None)"""
+    match = MARKDOWN_LINE.fullmatch(line)
+    if match:
+        return 'md', match.group(1), match.group(2)
+    match = HTML_LINE.fullmatch(line)
+    if match:
+        return 'html', match.group(2), match.group(1)
+    return 'raw', line, None
+
+
+def render_line(kind, title, link):
+    if kind == 'md':
+        return markdown_entry(title, link)
+    if kind == 'html':
+        return html_entry(title, link)
+    return title
+
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def switch_to_parent_if_src():
+    """Verifica si el directorio actual termina en 'src', si es así cambia al directorio padre.
+
+    Las rutas del archivo (ARCHIVE_DIR, config.ini) son relativas a la raíz del
+    repositorio; todos los scripts la llaman al arrancar.
+    """
+    current_dir = os.getcwd()
+    if os.path.basename(current_dir) == 'src':
+        parent_dir = os.path.dirname(current_dir)
+        os.chdir(parent_dir)
+        print(f'Cambiado al directorio padre: {parent_dir}')
+
+
+class NewsStore:
+    """Acceso al almacén; usar como context manager para confirmar y cerrar la conexión"""
+
+    def __init__(self, path=STORE_FILENAME, archive_dir=ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        if os.path.abspath(archive_dir) not in _recovered_dirs:
+            # Un commit de ArchiveWriter interrumpido (00.md y DD.md a medias) se completa antes de leer
+            recover_all(archive_dir)
+            _recovered_dirs.add(os.path.abspath(archive_dir))
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.create_function('decayed_score', 3, decayed_score, deterministic=True)
+        # Meses ya comparados con sus ficheros en esta conexión
+        self._checked_months = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def _key(self, path):
+        """Ruta relativa a archive_dir con la que se guarda un fichero en files y entries"""
+        return os.path.relpath(path, self.archive_dir).replace(os.sep, '/')
+
+    # --- Importación desde los ficheros .md ---
+
+    def ensure_month(self, year_month):
+        """
+        Importa news_archive/YYYY-MM/*.md (y sus traducciones) si el mes no
+        está en el almacén o sus ficheros no coinciden con lo importado o
+        escrito. Se comprueba una vez por conexión.
+        """
+        if year_month in self._checked_months:
+            return
+        self._checked_months.add(year_month)
+        with self.conn:
+            changed = self._month_changed(year_month)
+        if changed:
+            self._import_month(year_month)
+
+    def _month_files(self, year_month):
+        """{clave: ruta} de 00.md, los DD.md y las traducciones del mes que hay en disco"""
+        paths = glob.glob(f"{self.archive_dir}/{year_month}/[0-9][0-9].md")
+        paths += glob.glob(f"{self.archive_dir}/es/{year_month}-[0-9][0-9].md")
+        return {self._key(path): path for path in paths}
+
+    def _month_changed(self, year_month):
+        known = {row['path']: row for row in self.conn.execute(
+            "SELECT path, size, mtime_ns, sha1, dirty FROM files WHERE month = ?", (year_month,))}
+        files = self._month_files(year_month)
+        if set(known) != set(files):
+            return True
+        for key, path in files.items():
+            row = known[key]
+            if row['dirty']:
+                return True
+            stat = os.stat(path)
+            if (stat.st_size, stat.st_mtime_ns) == (row['size'], row['mtime_ns']):
+                continue
+            # Otro mtime (un checkout, una escritura propia) con el mismo contenido no cuenta
+            if stat.st_size != row['size'] or file_sha1(path) != row['sha1']:
+                return True
+            self.conn.execute("UPDATE files SET mtime_ns = ? WHERE path = ?", (stat.st_mtime_ns, key))
+        return False
+
+    def _import_month(self, year_month):
+        files = self._month_files(year_month)
+        month_key = self._key(month_path(year_month, self.archive_dir))
+        with self.conn:
+            self.conn.execute("DELETE FROM entries WHERE path IN (SELECT path FROM files WHERE month = ?)",
+                              (year_month,))
+            self.conn.execute("DELETE FROM files WHERE month = ?", (year_month,))
+            # Día, orden y marcas de los días salen de los DD.md: un día sin fichero no conserva los suyos
+            self.conn.execute("DELETE FROM days WHERE substr(day, 1, 7) = ?", (year_month,))
+            self.conn.execute("UPDATE news SET day = NULL, rank = NULL WHERE month = ?", (year_month,))
+            if month_key in files:
+                _, entries = self._import_view(year_month, month_key, files[month_key])
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO news (link, title, month) VALUES (?, ?, ?)",
+                    ((link, title, year_month) for title, link in entries))
+            for key in sorted(files):
+                if key != month_key and not key.startswith('es/'):
+                    day = f"{year_month}-{key[-5:-3]}"
+                    translated = self._key(translation_path(day, self.archive_dir)) in files
+                    self._import_day(day, key, files[key], translated)
+            for key in sorted(files):
+                if key.startswith('es/'):
+                    self._import_translation(year_month, key, files[key])
+            # Lo que el almacén tenía del mes y no llegó a sus ficheros se descarta
+            self.conn.execute(
+                "DELETE FROM news WHERE month = ? AND link NOT IN "
+                "(SELECT link FROM entries JOIN files USING (path) WHERE files.month = ? AND link IS NOT NULL)",
+                (year_month, year_month))
+            self._touch_month(year_month)
+
+    def _import_view(self, year_month, key, path):
+        """Guarda la cabecera y las líneas de un 00.md o DD.md; devuelve (cabecera, [(título, link)])"""
+        digest = hashlib.sha1()
+        header = None
+        lines = []
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            for raw in f:
+                digest.update(raw)
+                line = raw.decode('utf-8')
+                if header is None:
+                    header = line
+                else:
+                    lines.append(parse_line(line))
+        header = header or ''
+        self.conn.execute(
+            "INSERT INTO files (path, month, header, size, mtime_ns, sha1) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, year_month, header, stat.st_size, stat.st_mtime_ns, digest.hexdigest()))
+        self.conn.executemany(
+            "INSERT INTO entries (path, position, kind, title, link) VALUES (?, ?, ?, ?, ?)",
+            ((key, position, kind, title, link) for position, (kind, title, link) in enumerate(lines)))
+        return header, [(title, link) for _, title, link in lines if link is not None]
+
+    def _import_day(self, day, key, path, translated):
+        header, entries = self._import_view(day[:7], key, path)
+        is_sorted = "(sorted)" in header
+        self.conn.executemany("INSERT OR IGNORE INTO news (link, title, month) VALUES (?, ?, ?)",
+                              ((link, title, day[:7]) for title, link in entries))
+        self.conn.executemany("UPDATE news SET day = ?, rank = ? WHERE link = ?",
+                              ((day, rank if is_sorted else None, link) for rank, (_, link) in enumerate(entries)))
+        self.conn.execute("INSERT OR REPLACE INTO days (day, sorted, translated) VALUES (?, ?, ?)",
+                          (day, int(is_sorted), int(translated)))
+
+    def _import_translation(self, year_month, key, path):
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            content = f.read()
+        header = content.decode('utf-8').splitlines(keepends=True)[:1]
+        self.conn.execute(
+            "INSERT INTO files (path, month, header, size, mtime_ns, sha1) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, year_month, ''.join(header), stat.st_size, stat.st_mtime_ns, hashlib.sha1(content).hexdigest()))
+        self.conn.executemany("UPDATE news SET title_es = ? WHERE link = ?",
+                              ((title, link) for title, link in iter_text_entries(content)))
+
+    # --- Consultas ---
+
+    def has_link(self, link):
+        return self.conn.execute("SELECT 1 FROM news WHERE link = ?", (link,)).fetchone() is not None
+
+    def month_news(self, year_month):
+        """Noticias del mes en el orden de 00.md (las que aún no están en él, al final)"""
+        self.ensure_month(year_month)
+        return self.conn.execute(
+            "SELECT news.* FROM news LEFT JOIN (SELECT link, MIN(position) AS position FROM entries "
+            "WHERE path = ? GROUP BY link) AS view USING (link) WHERE news.month = ? "
+            "ORDER BY view.position IS NULL, view.position, news.rowid",
+            (self._key(month_path(year_month, self.archive_dir)), year_month)).fetchall()
+
+    def month_entries(self, year_month):
+        """[(título, link)] de las líneas de 00.md, incluidas las de títulos revisados"""
+        self.ensure_month(year_month)
+        return [(row['title'], row['link']) for row in self.conn.execute(
+            "SELECT title, link FROM entries WHERE path = ? AND link IS NOT NULL ORDER BY position",
+            (self._key(month_path(year_month, self.archive_dir)),))]
+
+    def day_news(self, day, hidden=False, now=None):
+        """Noticias de un día en el orden de su fichero DD.md"""
+        return self.iter_day_news(day, hidden, now).fetchall()
+
+    def iter_day_news(self, day, hidden=False, now=None):
+        """
+        Como day_news, pero devuelve el cursor para recorrerlo fila a fila.
+        Los días ordenados se ordenan por la puntuación ajustada a 'now' (por
+        defecto, ahora); con hidden=True se incluyen las noticias de -10.
+        """
+        self.ensure_month(day[:7])
+        if not self.is_sorted(day):
+            return self.conn.execute(
+                "SELECT news.* FROM news LEFT JOIN (SELECT link, MIN(position) AS position FROM entries "
+                "WHERE path = ? GROUP BY link) AS view USING (link) WHERE news.day = ? "
+                "ORDER BY view.position IS NULL, view.position, news.rowid",
+                (self._key(day_path(day, self.archive_dir)), day))
+        # Los días importados de un .md ya ordenado no tienen puntuación: se usa su rank
+        query = ("SELECT * FROM news WHERE day = ?"
+                 + ("" if hidden else f" AND (score IS NULL OR score > {HIDDEN_SCORE})")
+                 + " ORDER BY decayed_score(score, published, ?) DESC NULLS LAST, rank NULLS LAST, rowid")
+        now = (now or datetime.now()).strftime(TIME_FORMAT)
+        return self.conn.execute(query, (day, now))
+
+    def vote_history(self, day):
+        """{link: [(fetched_at, vale, no vale)]} de las noticias del día, de la más antigua a la última"""
+        history = {}
+        rows = self.conn.execute(
+            "SELECT votes.* FROM votes JOIN news ON news.link = votes.link WHERE news.day = ? "
+            "ORDER BY votes.link, votes.fetched_at", (day,))
+        for row in rows:
+            history.setdefault(row['link'], []).append((row['fetched_at'], row['valuable'], row['unvaluable']))
+        return history
+
+    def _day_flag(self, day, column):
+        self.ensure_month(day[:7])
+        row = self.conn.execute(f"SELECT {column} FROM days WHERE day = ?", (day,)).fetchone()
+        return bool(row and row[0])
+
+    def is_sorted(self, day):
+        return self._day_flag(day, 'sorted')
+
+    def is_translated(self, day):
+        return self._day_flag(day, 'translated')
+
+    # --- Escritura ---
+
+    def add_news(self, day, news):
+        """
+        Guarda una noticia del scraper ({'category','title','link','time'}) en
+        el día indicado; si es nueva, su línea se añade al final de 00.md y DD.md
+        """
+        year_month = day[:7]
+        self.ensure_month(year_month)
+        published = news['time'].strftime(TIME_FORMAT) if news.get('time') else None
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO news (link, title, category, published, month, day) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (news['link'], news['title'], news.get('category'), published, year_month, day))
+        self.conn.execute("INSERT OR IGNORE INTO days (day) VALUES (?)", (day,))
+        if cursor.rowcount:
+            for path, header in ((month_path(year_month, self.archive_dir), MONTH_HEADER),
+                                 (day_path(day, self.archive_dir), day_header(day))):
+                self._append_entry(self._key(path), year_month, header, news['title'], news['link'])
+            self._touch_month(year_month)
+
+    def _touch_month(self, year_month):
+        self.conn.execute("INSERT OR REPLACE INTO month_changes (month, changed_at) VALUES (?, ?)",
+                          (year_month, datetime.now().isoformat()))
+
+    def month_changed_at(self, year_month):
+        """Hora (ISO) del último cambio del mes en el almacén, o None si no hay ninguno"""
+        self.ensure_month(year_month)
+        row = self.conn.execute("SELECT changed_at FROM month_changes WHERE month = ?", (year_month,)).fetchone()
+        return row and row[0]
+
+    def _mark_dirty(self, key, year_month, header):
+        self.conn.execute("INSERT INTO files (path, month, header, dirty) VALUES (?, ?, ?, 1) "
+                          "ON CONFLICT(path) DO UPDATE SET dirty = 1", (key, year_month, header))
+
+    def _append_entry(self, key, year_month, header, title, link):
+        self._mark_dirty(key, year_month, header)
+        self.conn.execute(
+            "INSERT INTO entries (path, position, kind, title, link) "
+            "SELECT ?, COALESCE(MAX(position) + 1, 0), 'md', ?, ? FROM entries WHERE path = ?",
+            (key, title, link, key))
+
+    def add_votes(self, fetched_at, votes):
+        """
+        Guarda una instantánea {link: (vale, no vale, hora de publicación)}
+        leída a la hora 'fetched_at' (datetime). La hora de publicación solo
+        se usa si la noticia no la tenía.
+        """
+        fetched_at = fetched_at.strftime(TIME_FORMAT)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO votes (link, fetched_at, valuable, unvaluable) VALUES (?, ?, ?, ?)",
+                [(link, fetched_at, valuable, unvaluable) for link, (valuable, unvaluable, _) in votes.items()])
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO month_changes (month, changed_at) "
+                "SELECT month, ? FROM news WHERE link = ? AND published IS NULL",
+                [(datetime.now().isoformat(), link) for link, (_, _, published) in votes.items() if published])
+            self.conn.executemany(
+                "UPDATE news SET published = ? WHERE link = ? AND published IS NULL",
+                [(published, link) for link, (_, _, published) in votes.items() if published])
+
+    def set_scores(self, day, sorted_links, values_dict):
+        """
+        Guarda puntuaciones base y orden de un día y lo marca como ordenado.
+        Su DD.md pasa a HTML con cabecera '(sorted)' y solo las entradas de
+        sorted_links, en ese orden (las líneas de un mismo link, juntas).
+        """
+        self.ensure_month(day[:7])
+        with self.conn:
+            self.conn.executemany("UPDATE news SET score = ? WHERE link = ?",
+                                  [(score, link) for link, score in values_dict.items()])
+            self.conn.executemany("UPDATE news SET rank = ? WHERE link = ?",
+                                  [(rank, link) for rank, link in enumerate(sorted_links)])
+            self.conn.execute("INSERT INTO days (day, sorted) VALUES (?, 1) "
+                              "ON CONFLICT(day) DO UPDATE SET sorted = 1", (day,))
+            self._sort_view(day, sorted_links)
+            self._touch_month(day[:7])
+
+    def _sort_view(self, day, sorted_links):
+        key = self._key(day_path(day, self.archive_dir))
+        titles = {}
+        for row in self.conn.execute("SELECT title, link FROM entries WHERE path = ? AND link IS NOT NULL "
+                                     "ORDER BY position", (key,)):
+            titles.setdefault(row['link'], []).append(row['title'])
+        lines = []
+        for link in sorted_links:
+            if link not in titles:
+                row = self.conn.execute("SELECT title FROM news WHERE link = ?", (link,)).fetchone()
+                titles[link] = [row['title']] if row else []
+            lines += [(title, link) for title in titles[link]]
+        header = day_header(day, is_sorted=True)
+        self._mark_dirty(key, day[:7], header)
+        self.conn.execute("UPDATE files SET header = ? WHERE path = ?", (header, key))
+        self.conn.execute("DELETE FROM entries WHERE path = ?", (key,))
+        self.conn.executemany("INSERT INTO entries (path, position, kind, title, link) VALUES (?, ?, 'html', ?, ?)",
+                              ((key, position, title, link) for position, (title, link) in enumerate(lines)))
+
+    def set_translations(self, day, translations):
+        """
+        Guarda {link: título traducido} y marca el día como traducido.
+        Las demás noticias del día quedan sin traducción (no salen en la vista).
+        """
+        self.ensure_month(day[:7])
+        with self.conn:
+            self.conn.execute("UPDATE news SET title_es = NULL WHERE day = ?", (day,))
+            self.conn.executemany("UPDATE news SET title_es = ? WHERE link = ?",
+                                  [(title_es, link) for link, title_es in translations.items()])
+            self.conn.execute("INSERT INTO days (day, translated) VALUES (?, 1) "
+                              "ON CONFLICT(day) DO UPDATE SET translated = 1", (day,))
+            self._mark_dirty(self._key(translation_path(day, self.archive_dir)), day[:7], '')
+            self._touch_month(day[:7])
+
+    def commit(self):
+        self.conn.commit()
+
+    # --- Vistas .md ---
+
+    def _render_view(self, path, default_header):
+        key = self._key(path)
+        row = self.conn.execute("SELECT header FROM files WHERE path = ?", (key,)).fetchone()
+        lines = [row['header'] if row else default_header]
+        lines += [render_line(entry['kind'], entry['title'], entry['link']) for entry in self.conn.execute(
+            "SELECT kind, title, link FROM entries WHERE path = ? ORDER BY position", (key,))]
+        return ''.join(lines)
+
+    def render_month(self, year_month):
+        self.ensure_month(year_month)
+        return self._render_view(month_path(year_month, self.archive_dir), MONTH_HEADER)
+
+    def render_day(self, day):
+        return self._render_view(day_path(day, self.archive_dir), day_header(day, self.is_sorted(day)))
+
+    def render_translation(self, day, subject):
+        lines = [f"# {subject}\n\n"]
+        lines += [html_entry(row['title_es'], row['link'])
+                  for row in self.day_news(day) if row['title_es'] is not None]
+        return ''.join(lines)
+
+    # Las vistas se escriben de forma atómica; con un ArchiveWriter se
+    # acumulan y se confirman todas juntas en writer.commit()
+
+    def write_month(self, year_month, writer=None):
+        return self._write_view(writer, month_path(year_month, self.archive_dir), year_month,
+                                self.render_month(year_month))
+
+    def write_day(self, day, writer=None):
+        return self._write_view(writer, day_path(day, self.archive_dir), day[:7], self.render_day(day))
+
+    def write_translation(self, day, subject, writer=None):
+        return self._write_view(writer, translation_path(day, self.archive_dir), day[:7],
+                                self.render_translation(day, subject))
+
+    def _write_view(self, writer, filename, year_month, content):
+        # Se apunta lo escrito: sin mtime, la próxima comprobación compara el sha1
+        data = content.encode('utf-8')
+        self.conn.execute(
+            "INSERT INTO files (path, month, header, size, sha1) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET size = excluded.size, mtime_ns = NULL, "
+            "sha1 = excluded.sha1, dirty = 0",
+            (self._key(filename), year_month, ''.join(content.splitlines(keepends=True)[:1]),
+             len(data), hashlib.sha1(data).hexdigest()))
+        if writer is not None:
+            return writer.stage(filename, content)
+        atomic_write(filename, content)
+        return filename
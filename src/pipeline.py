@@ -0,0 +1,215 @@
+"""
+Proceso diario completo en un solo proceso: scraping → ordenación → traducción
+→ resúmenes semanal y mensual y feeds (RSS / JSON Feed e índice estático).
+
+Las etapas forman un DAG (STAGES: nombre -> dependencias) y se ejecutan en
+orden topológico; cada una recibe en memoria los registros que devuelven sus
+dependencias, sin volver a leer los .md de la anterior. Al terminar una
+etapa su salida se guarda en news_archive/pipeline/<etapa>.json: si la
+ejecución falla, la siguiente (aunque sea la programada del día siguiente)
+termina primero ese día desde la primera etapa sin punto de control y
+después procesa el suyo. Cuando todas terminan, se borran los puntos de
+control de ese día.
+
+Las etapas que no se piden con --stages toman su salida del punto de
+control o, si no hay, del almacén (news_store).
+
+Uso:
+    python src/pipeline.py [--day 2025-10-26] [--stages sort,translate] [--restart] [--full] [--profile]
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from graphlib import TopologicalSorter
+from zoneinfo import ZoneInfo
+
+from archive_writer import atomic_write
+from digest import update_digests
+from feeds import update_feeds
+from main import translate_day
+from metrics import add_profile_argument, observe, profiling, write_run
+from news_filter import load_filter_config
+from news_sorter import RESCORE_DAYS, load_sorter_config, rescore_previous_days, sort_day
+from news_store import ARCHIVE_DIR, NewsStore, switch_to_parent_if_src
+from script import scrape_day
+
+CONFIG_PATH = 'config.ini'
+CHECKPOINT_DIR = f"{ARCHIVE_DIR}/pipeline"
+
+
+def run_scrape(context):
+    scrape_day(context['date'], incremental=context['incremental'])
+    return day_records(context['day'])
+
+
+def run_sort(context, records):
+    with NewsStore() as store:
+        if store.is_sorted(context['day']):
+            # Ya ordenado: solo se vuelven a pedir los votos que cambian (también los de -10)
+            print(f"{context['day']} ya está ordenado, se actualizan los votos que cambian")
+            records = store.day_news(context['day'], hidden=True)
+        config = load_sorter_config(CONFIG_PATH)
+        sorted_records = sort_day(store, context['day'], records, config)
+        # Los votos de los días anteriores aún cambian: solo se piden los de esas noticias
+        rescore_previous_days(store, context['date'], config)
+        return sorted_records
+
+
+def run_translate(context, records):
+    with NewsStore() as store:
+        output_file = translate_day(store, context['day'], records, load_filter_config(CONFIG_PATH))
+    return {'output_file': output_file}
+
+
+def run_digest(context, translated):
+    # También los días anteriores: al re-puntuarlos pueden haber cambiado sus puntuaciones
+    config = load_sorter_config(CONFIG_PATH)
+    rescore_days = config.getint('NewsSorter', 'rescore_days', fallback=RESCORE_DAYS)
+    days = [(context['date'] - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(rescore_days, -1, -1)]
+    with NewsStore() as store:
+        return {'digests': update_digests(store, days)}
+
+
+def run_feeds(context, translated):
+    # Solo cambia el fichero traducido del día: se rehace su página y, si toca, los feeds
+    return {'feeds': update_feeds([context['day']])}
+
+
+# Etapa -> (función, dependencias); cada función recibe el contexto y la
+# salida de sus dependencias en el orden indicado
+STAGES = {
+    'scrape': (run_scrape, []),
+    'sort': (run_sort, ['scrape']),
+    'translate': (run_translate, ['sort']),
+    'digest': (run_digest, ['translate']),
+    'feeds': (run_feeds, ['translate']),
+}
+
+
+def day_records(day):
+    """Noticias del día en el almacén, en el orden de DD.md, como dicts serializables"""
+    with NewsStore() as store:
+        return [dict(row) for row in store.day_news(day)]
+
+
+def checkpoint_path(stage, checkpoint_dir=CHECKPOINT_DIR):
+    return f"{checkpoint_dir}/{stage}.json"
+
+
+def load_checkpoint(stage, day, checkpoint_dir=CHECKPOINT_DIR):
+    """Salida guardada de una etapa para ese día, o None"""
+    try:
+        with open(checkpoint_path(stage, checkpoint_dir), 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return None
+    if checkpoint.get('day') != day:
+        return None
+    return checkpoint
+
+
+def save_checkpoint(stage, day, output, elapsed, checkpoint_dir=CHECKPOINT_DIR):
+    checkpoint = {'stage': stage, 'day': day, 'elapsed': round(elapsed, 3), 'output': output}
+    atomic_write(checkpoint_path(stage, checkpoint_dir), json.dumps(checkpoint, ensure_ascii=False, indent=1))
+
+
+def read_checkpoints(checkpoint_dir=CHECKPOINT_DIR):
+    """[(ruta, punto de control)] de todos los guardados"""
+    checkpoints = []
+    for path in sorted(glob.glob(f"{checkpoint_dir}/*.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            checkpoints.append((path, json.load(f)))
+    return checkpoints
+
+
+def pending_day(checkpoint_dir=CHECKPOINT_DIR):
+    """Día de una ejecución que quedó a medias (con puntos de control), o None"""
+    days = sorted({checkpoint.get('day') for _, checkpoint in read_checkpoints(checkpoint_dir)} - {None})
+    return days[0] if days else None
+
+
+def clear_checkpoints(day, checkpoint_dir=CHECKPOINT_DIR):
+    """Borra los puntos de control de ese día"""
+    for path, checkpoint in read_checkpoints(checkpoint_dir):
+        if checkpoint.get('day') == day:
+            os.remove(path)
+
+
+def run_pipeline(date_obj, stages=None, resume=True, incremental=True, checkpoint_dir=CHECKPOINT_DIR,
+                 stage_table=STAGES):
+    """
+    Ejecuta las etapas pedidas (todas por defecto) para el día de date_obj.
+    Devuelve {etapa: segundos} de las que se ejecutaron.
+    """
+    day = date_obj.strftime('%Y-%m-%d')
+    selected = set(stages or stage_table)
+    unknown = selected - set(stage_table)
+    if unknown:
+        raise ValueError(f"Etapas desconocidas: {', '.join(sorted(unknown))}")
+    context = {'date': date_obj, 'day': day, 'incremental': incremental}
+    order = TopologicalSorter({name: deps for name, (_, deps) in stage_table.items()}).static_order()
+
+    outputs, timings = {}, {}
+    for name in order:
+        func, deps = stage_table[name]
+        checkpoint = load_checkpoint(name, day, checkpoint_dir) if resume or name not in selected else None
+        if checkpoint is not None:
+            print(f"[{name}] retomada desde el punto de control ({checkpoint['elapsed']:.2f} s en su día)")
+            outputs[name] = checkpoint['output']
+            continue
+        if name not in selected:
+            outputs[name] = day_records(day)
+            continue
+        print(f"[{name}] empezando")
+        start = time.perf_counter()
+        outputs[name] = func(context, *(outputs[dep] for dep in deps))
+        timings[name] = time.perf_counter() - start
+        observe(f"pipeline.{name}", timings[name])
+        save_checkpoint(name, day, outputs[name], timings[name], checkpoint_dir)
+        print(f"[{name}] terminada en {timings[name]:.2f} s")
+
+    clear_checkpoints(day, checkpoint_dir)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraping, ordenación y traducción de un día en un solo proceso")
+    parser.add_argument('--day', help="día a procesar (YYYY-MM-DD); por defecto ayer en hora de China")
+    parser.add_argument('--stages', help=f"etapas separadas por comas ({','.join(STAGES)})")
+    parser.add_argument('--restart', action='store_true', help="ignora los puntos de control")
+    parser.add_argument('--full', action='store_true', help="scraping completo, sin el estado incremental")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    switch_to_parent_if_src()
+    tz = ZoneInfo('Asia/Shanghai')
+    if args.day:
+        date_obj = datetime.strptime(args.day, '%Y-%m-%d').replace(tzinfo=tz)
+    else:
+        date_obj = datetime.now(tz) - timedelta(days=1)
+
+    start = time.perf_counter()
+    day = date_obj.strftime('%Y-%m-%d')
+    pending = None if args.restart else pending_day()
+    try:
+        with profiling(args.profile, 'pipeline'):
+            if pending is not None and pending != day:
+                # La ejecución anterior falló: se termina su día antes de empezar este
+                print(f"{pending} quedó a medias: se retoma antes de procesar {day}")
+                run_pipeline(datetime.strptime(pending, '%Y-%m-%d').replace(tzinfo=tz),
+                             incremental=not args.full)
+            timings = run_pipeline(date_obj, args.stages.split(',') if args.stages else None,
+                                   resume=not args.restart, incremental=not args.full)
+    finally:
+        # También se guardan las métricas de una ejecución fallida
+        write_run('pipeline', {'day': day})
+    print(f"Proceso completado en {time.perf_counter() - start:.2f} s "
+          f"({', '.join(f'{name} {seconds:.2f} s' for name, seconds in timings.items()) or 'sin etapas'})")
+
+
+if __name__ == '__main__':
+    main()
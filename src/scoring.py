@@ -0,0 +1,50 @@
+"""
+Reglas de puntuación de las noticias según sus votos (vale / no vale).
+
+La puntuación base solo depende de los votos y es la que se guarda en el
+almacén. El ajuste por antigüedad se aplica al leer, respecto al momento de
+la lectura: NewsStore registra decayed_score como función SQL y ordena con
+ella los días ya puntuados.
+"""
+
+from datetime import datetime
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+HIDDEN_SCORE = -10      # Solo votos "no vale": la noticia no se muestra
+
+
+def calculate_score(valuable, unvaluable):
+    total = valuable + unvaluable
+    if total == 0:
+        return 0
+    elif valuable == 0 and unvaluable != 0:
+        return HIDDEN_SCORE
+    elif unvaluable == 0 and valuable != 0:
+        return 10 + valuable
+    else:
+        return (valuable / total) * 10
+
+
+def adjust_value_based_on_time(value, news_time_str, now=None):
+    """Ajusta el valor según el tiempo de publicación de la noticia (respecto a 'now')"""
+    try:
+        # Asume formato news_time_str como "YYYY-MM-DD HH:MM:SS"
+        news_time = datetime.strptime(news_time_str, TIME_FORMAT)
+        now = now or datetime.now()
+        hours_diff = (now - news_time).total_seconds() / 3600
+        if hours_diff <= 1:
+            return value * 1.5
+        elif hours_diff <= 3:
+            return value * 1.2
+        elif hours_diff > 24:
+            return value * 0.8
+        return value
+    except (TypeError, ValueError):
+        return value
+
+
+def decayed_score(score, news_time_str, now_str):
+    """Función SQL: puntuación ajustada a la hora 'now_str'; None si la noticia no está puntuada"""
+    if score is None:
+        return None
+    return adjust_value_based_on_time(score, news_time_str, datetime.strptime(now_str, TIME_FORMAT))
@@ -1,42 +1,74 @@
+import argparse
 import os
 import time
 import difflib
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+from dedup import DedupIndex, could_be_similar
+from driver_pool import PAGE_LOAD_TIMEOUT, load_pool, new_driver
+from metrics import add_profile_argument, count, profiling, timed, timer, write_run
+from ithome import archive_url
+from archive_writer import ArchiveWriter
+from news_sources import ItHomeSource, fetch_sources, load_sources, load_state, save_state
+from news_store import NewsStore, day_path, markdown_entry, switch_to_parent_if_src
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-import chromedriver_autoinstaller  # 确保导入 chromedriver_autoinstaller
-
-def setup_driver():
-    """设置并返回Selenium WebDriver"""
-    chromedriver_autoinstaller.install()  # 自动安装匹配的 ChromeDriver
-    options = Options()
-    options.add_argument('--headless')
-    options.add_argument('--disable-gpu')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    
+
+def setup_driver(page_load_timeout=PAGE_LOAD_TIMEOUT):
+    """设置并返回Selenium WebDriver (ChromeDriver 缓存、eager 加载、屏蔽图片等资源)"""
     try:
-        driver = webdriver.Chrome(options=options)
-        return driver
+        return new_driver(page_load_timeout)
     except Exception as e:
         print(f"Error setting up driver: {e}")
         raise
 
-def fetch_all_news(date_str):
+@timed('scrape.fetch_all_news')
+def fetch_all_news(date_str, incremental=True):
+    """
+    Descarga a la vez todas las fuentes de config.ini ([NewsSource_*]).
+    Recibe la fecha en formato 'YYYY-MM-DD'.
+    Las páginas son estáticas: se descargan con requests y se parsean con
+    BeautifulSoup; Selenium solo se usa para IT之家 si así no se obtiene nada.
+    En modo incremental solo se devuelven las noticias nuevas desde la
+    ejecución anterior. Devuelve (noticias, estado); el estado se guarda con
+    save_state una vez guardadas las noticias.
+    Las noticias sin hora de publicación (fuentes 'html', que leen la
+    portada de hoy y no la del día pedido) no se devuelven: no se sabe a qué
+    día del archivo pertenecen.
+    """
+    # Sin secciones en config.ini se mantiene la fuente de siempre
+    sources = load_sources() or [ItHomeSource('ITHome')]
+    state = load_state() if incremental else {}
+    results = fetch_sources(sources, date_str, state=state)
+    for source in sources:
+        if isinstance(source, ItHomeSource) and results[source.name] is None:
+            print("Usando Selenium como respaldo...")
+            count('scrape.selenium_fallback')
+            results[source.name] = fetch_all_news_selenium(date_str)
+    news_data = []
+    for source_news in results.values():
+        for news in source_news or []:
+            if news['time'] is None:
+                count('scrape.undated_skipped')
+                continue
+            news_data.append(news)
+    return news_data, state
+
+def fetch_all_news_selenium(date_str):
     """
-    Scrapea la página de archivo de un día específico (método mucho más rápido).
+    Scrapea la página de archivo con Selenium (solo como respaldo).
     Recibe la fecha en formato 'YYYY-MM-DD'.
     """
-    driver = setup_driver()
-    url = f"https://www.ithome.com/list/{date_str}.html"
+    with load_pool(factory=setup_driver) as pool:
+        with pool.driver() as driver:
+            news_data = scrape_archive_page(driver, archive_url(date_str))
+        print(pool.summary())
+    print("WebDriver cerrado.")
+    return news_data
+
+def scrape_archive_page(driver, url):
     print(f"Abriendo URL de archivo (método superior): {url}")
-    
     driver.get(url)
 
     try:
@@ -46,7 +78,6 @@ def fetch_all_news(date_str):
         print("Página de archivo cargada.")
     except Exception as e:
         print(f"No se pudo cargar la lista del archivo: {e}")
-        driver.quit()
         return []
 
     news_items = driver.find_elements(By.CSS_SELECTOR, 'ul.datel li')
@@ -64,100 +95,102 @@ def fetch_all_news(date_str):
         
         except Exception as e:
             print(f"Error parseando un artículo: {e}. Saltando.") 
-            
-    driver.quit()
-    print("WebDriver cerrado.")
     return news_data
 
-def ensure_dir_exists(path):
-    if not os.path.exists(path):
-        os.makedirs(path)
-
-def write_news_file(filename, date_str):
-    if not os.path.exists(filename):
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"# 今日新闻 - {date_str}\n")
-            
 def is_similar(entry1, entry2, threshold=0.9):
-    ratio = difflib.SequenceMatcher(None, entry1, entry2).ratio()
+    count('dedup.is_similar')
+    if not could_be_similar(entry1, entry2, threshold):
+        count('dedup.is_similar.prefiltered')
+        return False
+    with timer('dedup.sequence_matcher'):
+        ratio = difflib.SequenceMatcher(None, entry1, entry2).ratio()
     ratio_rounded = round(ratio, 4)  # 保留两位小数
     if 0.99 > ratio_rounded >= threshold:
         print(f"Detectando similitud (puede ser duplicado): {entry1[:50]}...")
         print(f"Similaridad: {ratio_rounded}")
     return ratio_rounded > threshold
 
+def month_dedup_index(store, year_month):
+    """Índice de duplicados con las noticias del mes ya guardadas"""
+    existing_month_news = [markdown_entry(title, link).rstrip('\n')
+                           for title, link in store.month_entries(year_month)]
+    return DedupIndex(existing_month_news, similar=is_similar)
+
+
+def store_day_news(store, dedup_index, day, new_news):
+    """Guarda en el almacén las noticias de un día que no estén repetidas; devuelve cuántas"""
+    news_written_count = 0
+    for news in new_news:
+        # Ahora confiamos en que la página que scrapeamos (26.html)
+        # contiene las noticias que queremos guardar en 26.md.
+        # Solo filtramos por duplicados: primero el link (consulta O(1)
+        # al almacén) y después títulos casi iguales.
+        if store.has_link(news['link']):
+            continue
+
+        entry = markdown_entry(news['title'], news['link'])
+        if not dedup_index.is_duplicate(entry):
+            dedup_index.add(entry)
+            store.add_news(day, news)
+            news_written_count += 1
+    return news_written_count
+
+
 def save_news_to_markdown(date_obj, new_news):
     """ 
     Modificado para recibir un objeto 'date' (el de ayer)
     y guardar TODO lo de la página, sin filtrar por fecha.
+    Las noticias se guardan en el almacén (news_store) y 00.md / DD.md
+    se regeneran a partir de él.
     """
     year_month = date_obj.strftime("%Y-%m")
-    folder_path = f"news_archive/{year_month}"
-    ensure_dir_exists(folder_path)
-    
-    month_news_filename = f"{folder_path}/00.md"
-    
-    # El archivo de destino es el de AYER (ej. 26.md)
-    day_filename = f"{folder_path}/{date_obj.strftime('%d')}.md"
-    write_news_file(day_filename, date_obj.strftime('%Y年%m月%d日'))
-    
-    # Cargar las noticias que ya existen para evitar duplicados
-    if os.path.exists(month_news_filename):
-        with open(month_news_filename, 'r', encoding='utf-8') as f:
-            existing_month_news = f.read()
-    else:
-        existing_month_news = "# 本月新闻\n"
-        with open(month_news_filename, 'w', encoding='utf-8') as f:
-            f.write(existing_month_news)
-    
-    news_set = set(existing_month_news.splitlines())
-    news_written_count = 0
-    
-    for news in new_news:
-        markdown_entry = f"- [{news['title']}]({news['link']})\n"
-        
-        # --- ¡CAMBIO IMPORTANTE! ---
-        # Hemos eliminado el filtro de fecha:
-        # if news_time.date() == date_obj.date():
-        #
-        # Ahora confiamos en que la página que scrapeamos (26.html)
-        # contiene las noticias que queremos guardar en 26.md.
-        #
-        # Solo filtramos por duplicados:
-        
-        is_new_entry = all(not is_similar(markdown_entry, existing_entry) for existing_entry in news_set)
-        
-        if is_new_entry:
-            news_set.add(markdown_entry)
-            news_written_count += 1
-            
-            # Escribimos en el archivo mensual
-            with open(month_news_filename, 'a', encoding='utf-8') as month_file:
-                month_file.write(markdown_entry)
-            
-            # Escribimos en el archivo de AYER (ej. 26.md)
-            with open(day_filename, 'a', encoding='utf-8') as day_file:
-                day_file.write(markdown_entry)
-        # else:
-            # Opcional: imprimir si se salta por duplicado
-            # print(f"Noticia saltada (duplicada): {news['title']}")
+    day = date_obj.strftime("%Y-%m-%d")
+    if not new_news and os.path.exists(day_path(day)):
+        print("没有新的新闻需要更新。")
+        return
+
+    with NewsStore() as store, ArchiveWriter() as writer:
+        # Índice de duplicados construido una sola vez por ejecución
+        dedup_index = month_dedup_index(store, year_month)
+        news_written_count = store_day_news(store, dedup_index, day, new_news)
+
+        print(f"Deduplicación: {dedup_index.queries} consultas, {dedup_index.comparisons} comparaciones")
+        count('dedup.queries', dedup_index.queries)
+        count('dedup.comparisons', dedup_index.comparisons)
+        count('store.news_written', news_written_count)
+        store.commit()
+        # Las vistas .md solo se regeneran si hay cambios; 00.md y DD.md se
+        # escriben juntas al salir del bloque (temporal + fsync + rename)
+        if news_written_count > 0:
+            store.write_month(year_month, writer)
+        if news_written_count > 0 or not os.path.exists(day_path(day)):
+            store.write_day(day, writer)
 
     if news_written_count > 0:
         print(f"新闻保存成功，本次更新了 {news_written_count} 条新闻。")
     else:
         print("没有新的新闻需要更新。")
 
-def switch_to_parent_if_src():
-    """检查当前目录的最后一级是否是src，如果是，则切换到上一级目录"""
-    current_dir = os.getcwd()
-    base_name = os.path.basename(current_dir)
-
-    if base_name == 'src':
-        parent_dir = os.path.dirname(current_dir)
-        os.chdir(parent_dir)
-        print(f'切换到上一级目录: {parent_dir}')
+def scrape_day(date_obj, incremental=True):
+    """
+    Descarga las noticias de un día y las guarda; el estado incremental solo
+    avanza si quedaron guardadas. Devuelve las noticias descargadas.
+    """
+    new_news, state = fetch_all_news(date_obj.strftime('%Y-%m-%d'), incremental=incremental)
+    print(f"新闻爬取完成，共爬取到 {len(new_news)} 条新闻。")
+    count('scrape.news', len(new_news))
+    with timer('scrape.save'):
+        save_news_to_markdown(date_obj, new_news)
+    save_state(state)
+    return new_news
 
 def main():
+    parser = argparse.ArgumentParser(description="Descarga las noticias de ayer y las guarda en news_archive")
+    parser.add_argument('--full', action='store_true',
+                        help="descarga la lista completa sin usar el estado incremental")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
     start_time = time.time()
     switch_to_parent_if_src()
     tz = ZoneInfo('Asia/Shanghai') # Hora de China
@@ -173,20 +206,18 @@ def main():
     
     print(f"开始爬取 {date_str_for_url} 的所有新闻...")
     try:
-        # 3. Pasamos esa fecha a la función de scrapeo
-        new_news = fetch_all_news(date_str_for_url)
-        
-        print(f"新闻爬取完成，共爬取到 {len(new_news)} 条新闻。")
-        
-        # 4. Guardamos usando el objeto 'yesterday'
-        save_news_to_markdown(yesterday, new_news)
+        # 3. Scrapeamos y guardamos usando el objeto 'yesterday'
+        with profiling(args.profile, 'script'):
+            scrape_day(yesterday, incremental=not args.full)
         
     except Exception as e:
         print(f"An error occurred: {e}")
+        count('errors')
         
     end_time = time.time()
     elapsed_time = end_time - start_time
     print(f"写入新闻完成，总耗时: {elapsed_time:.2f} 秒")
+    write_run('script', {'day': date_str_for_url})
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
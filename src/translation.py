@@ -0,0 +1,235 @@
+"""
+Caché persistente de traducciones y traducción por lotes.
+
+La caché vive en el almacén (news_archive/news.db), indexada por
+(hash del texto, idioma origen, idioma destino), con un tamaño máximo y
+desalojo de las entradas usadas hace más tiempo. Los textos que no están en
+caché se envían en bloques de hasta MAX_CHUNK_CHARS caracteres, repartidos
+entre WORKERS hilos detrás de un limitador de ritmo compartido.
+"""
+
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+
+from deep_translator.exceptions import RequestError, TooManyRequests
+from requests import RequestException
+
+from http_pool import AdaptiveTokenBucket, backoff_delay, map_concurrently
+from metrics import count, observe, timer
+from news_store import STORE_FILENAME
+
+MAX_CHUNK_CHARS = 4500      # GoogleTranslator admite hasta 5000 caracteres por petición
+MAX_CACHE_ENTRIES = 50000
+WORKERS = 4
+RATE = 2.0                  # Peticiones por segundo entre todos los hilos
+MAX_RETRIES = 3
+SEPARATOR = "\n"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    text_hash TEXT NOT NULL,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    translated TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (text_hash, source, target)
+);
+CREATE INDEX IF NOT EXISTS translations_last_used ON translations(last_used);
+"""
+
+
+def text_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class TranslationCache:
+    """Caché de traducciones acotada; usar como context manager"""
+
+    def __init__(self, path=STORE_FILENAME, max_entries=MAX_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def get(self, text, source, target):
+        key = (text_hash(text), source, target)
+        row = self.conn.execute(
+            "SELECT translated FROM translations WHERE text_hash = ? AND source = ? AND target = ?",
+            key).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute(
+            "UPDATE translations SET last_used = ? WHERE text_hash = ? AND source = ? AND target = ?",
+            (time.time(), *key))
+        return row[0]
+
+    def put(self, text, source, target, translated):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO translations (text_hash, source, target, translated, last_used) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (text_hash(text), source, target, translated, time.time()))
+
+    def evict(self):
+        """Borra las entradas menos usadas por encima de max_entries"""
+        (rows,) = self.conn.execute("SELECT COUNT(*) FROM translations").fetchone()
+        excess = rows - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM translations WHERE rowid IN "
+                "(SELECT rowid FROM translations ORDER BY last_used LIMIT ?)", (excess,))
+        return max(excess, 0)
+
+    def stats(self):
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0
+        return f"caché de traducciones: {self.hits} aciertos, {self.misses} fallos ({hit_rate:.0f}% aciertos)"
+
+    def close(self):
+        self.evict()
+        self.conn.commit()
+        self.conn.close()
+
+
+def chunk_by_chars(texts, max_chars=MAX_CHUNK_CHARS):
+    """Agrupa textos en bloques cuyo tamaño unido (con separadores) no supera max_chars"""
+    chunk = []
+    size = 0
+    for text in texts:
+        extra = len(text) + (len(SEPARATOR) if chunk else 0)
+        if chunk and size + extra > max_chars:
+            yield chunk
+            chunk = []
+            extra = len(text)
+            size = 0
+        chunk.append(text)
+        size += extra
+    if chunk:
+        yield chunk
+
+
+def translate_chunk(translator, chunk):
+    """
+    Traduce un bloque con una sola petición (textos unidos por saltos de
+    línea). Si el proveedor no conserva las líneas, recurre a translate_batch.
+    """
+    if len(chunk) > 1:
+        with timer('translation.translate'):
+            translated = translator.translate(SEPARATOR.join(chunk))
+        lines = translated.split(SEPARATOR) if translated else []
+        if len(lines) == len(chunk):
+            return [line.strip() for line in lines]
+        print(f"El bloque de {len(chunk)} textos no conservó las líneas, traduciendo uno a uno")
+        count('translation.split_fallbacks')
+    with timer('translation.translate_batch'):
+        return translator.translate_batch(chunk)
+
+
+def translate_chunks(translator_factory, chunks, workers=WORKERS, rate=RATE):
+    """
+    Traduce los bloques con 'workers' hilos (un traductor por hilo, no son
+    thread-safe) detrás de un limitador compartido. Un 429/5xx reduce el
+    ritmo y se reintenta con backoff. Si un bloque agota los reintentos se
+    parte en mitades (un intento cada una, también detrás del limitador)
+    hasta aislar los textos que fallan: solo esos quedan a None y el resto
+    del bloque se traduce. Conserva el orden.
+    """
+    limiter = AdaptiveTokenBucket(rate)
+    local = threading.local()
+
+    def attempt(chunk, retries):
+        """Lista de traducciones del bloque, o None si falla 'retries' veces"""
+        for attempt in range(retries):
+            limiter.acquire()
+            try:
+                result = translate_chunk(local.translator, chunk)
+                limiter.reward()
+                return result
+            except (TooManyRequests, RequestError, RequestException) as e:
+                limiter.penalize()
+                error = e
+            except Exception as e:
+                error = e
+            if attempt < retries - 1:
+                delay = backoff_delay(attempt)
+                print(f"Error traduciendo un bloque de {len(chunk)} textos ({error}), "
+                      f"reintentando en {delay:.1f} s (ritmo {limiter.rate:.2f}/s)")
+                count('translation.retries')
+                observe('translation.backoff_sleep', delay)
+                time.sleep(delay)
+        if retries > 1:
+            print(f"Bloque de {len(chunk)} textos sin traducir tras {retries} intentos: {error}")
+            count('translation.failed_chunks')
+        return None
+
+    def split(chunk):
+        """Traduce por mitades un bloque que falló; None solo para los textos que fallan solos"""
+        if len(chunk) == 1:
+            print(f"Texto sin traducir: {chunk[0][:50]}")
+            count('translation.failed_texts')
+            return [None]
+        middle = len(chunk) // 2
+        results = []
+        for half in (chunk[:middle], chunk[middle:]):
+            translated = attempt(half, 1)
+            results += translated if translated is not None else split(half)
+        return results
+
+    def worker(chunk):
+        if not hasattr(local, 'translator'):
+            local.translator = translator_factory()
+        result = attempt(chunk, MAX_RETRIES)
+        if result is None:
+            count('translation.split_chunks')
+            result = split(chunk)
+        return result
+
+    return map_concurrently(worker, chunks, max(1, min(workers, len(chunks))))
+
+
+def translate_texts(translator_factory, texts, cache, source, target, workers=WORKERS, rate=RATE):
+    """
+    Devuelve la traducción de cada texto en el mismo orden (None si falla),
+    consultando antes la caché. Solo los textos no cacheados llegan al
+    traductor; 'translator_factory' crea un traductor para cada hilo.
+    """
+    translations = {}
+    missing = []
+    for text in dict.fromkeys(texts):
+        cached = cache.get(text, source, target)
+        if cached is not None:
+            translations[text] = cached
+        else:
+            missing.append(text)
+
+    # Bloques equilibrados para que todos los hilos tengan trabajo
+    total_chars = sum(len(text) + len(SEPARATOR) for text in missing)
+    max_chars = min(MAX_CHUNK_CHARS, max(1, math.ceil(total_chars / workers)))
+    chunks = list(chunk_by_chars(missing, max_chars))
+    count('translation.cache_hits', len(translations))
+    count('translation.cache_misses', len(missing))
+    count('translation.chunks', len(chunks))
+    start = time.perf_counter()
+    results = translate_chunks(translator_factory, chunks, workers, rate) if chunks else []
+
+    for chunk, chunk_results in zip(chunks, results):
+        for text, translated in zip(chunk, chunk_results):
+            if translated:
+                translations[text] = translated
+                cache.put(text, source, target, translated)
+
+    print(f"Traducción: {len(missing)} textos nuevos en {len(chunks)} bloques "
+          f"({time.perf_counter() - start:.2f} s); {cache.stats()}")
+    return [translations.get(text) for text in texts]
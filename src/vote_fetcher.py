@@ -0,0 +1,296 @@
+"""
+Backends para obtener los votos (值得 / 不值得) de los artículos.
+
+Cada backend recibe las noticias que aún no tienen votos y devuelve
+{link: (vale, no vale, hora)} de las que ha podido resolver; las demás pasan
+al siguiente backend de la cadena:
+
+1. ApiVoteBackend: pide solo los contadores a un endpoint JSON, con muchos
+   IDs por petición (se activa con la sección [VoteAPI] de config.ini).
+2. PageVoteBackend: descarga el HTML del artículo por HTTP en paralelo.
+3. SeleniumVoteBackend: renderiza el artículo con Chrome (respaldo final),
+   con los navegadores de un driver_pool.DriverPool.
+"""
+
+import re
+import time
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from http_pool import HostRateLimiter, backoff_delay, get_with_retries, make_session, map_concurrently
+from ithome import HEADERS
+from metrics import count, timer
+
+MAX_RETRIES = 3
+TIMEOUT = 10
+CONCURRENCY = 8
+RATE_PER_HOST = 4
+API_BATCH_SIZE = 50
+
+ARTICLE_ID_PATTERN = re.compile(r'ithome\.com/0/(\d+)/(\d+)\.htm')
+# Contadores del widget de votos (值得 / 不值得) de los artículos de IT之家
+VOTE_UP_ID = 'news_value_up'
+VOTE_DOWN_ID = 'news_value_down'
+
+
+def parse_article_id(link):
+    """'https://www.ithome.com/0/887/030.htm' -> 887030 (None si no es un artículo de IT之家)"""
+    match = ARTICLE_ID_PATTERN.search(link)
+    if not match:
+        return None
+    return int(match.group(1) + match.group(2))
+
+
+def parse_vote_count(text):
+    """Primer número del texto de un contador ('12', '值得 12'); 0 si no hay"""
+    match = re.search(r'(\d+)', text or '')
+    return int(match.group(1)) if match else 0
+
+
+def parse_news_page(html):
+    """
+    Extrae (vale, no vale, hora) del HTML de un artículo. Los contadores se
+    leen solo de los elementos del widget de votos (VOTE_UP_ID y
+    VOTE_DOWN_ID), nunca de un '值得' del texto del artículo. Devuelve None
+    si la página no trae el widget (p. ej. porque se rellena con JavaScript).
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    up_element = soup.find(id=VOTE_UP_ID)
+    down_element = soup.find(id=VOTE_DOWN_ID)
+    if up_element is None or down_element is None:
+        return None
+    valuable = parse_vote_count(up_element.get_text(' ', strip=True))
+    unvaluable = parse_vote_count(down_element.get_text(' ', strip=True))
+
+    # Intentar obtener tiempo
+    time_element = soup.select_one('time.ago')
+    if time_element is not None:
+        news_time_str = time_element.get('datetime', '')  # Asume formato "YYYY-MM-DD HH:MM:SS"
+    else:
+        time_element = soup.select_one('.meta-date')
+        if time_element is not None:
+            news_time_str = time_element.get_text(strip=True)
+            # Asume formato "YYYY年MM月DD日 HH:MM" -> "YYYY-MM-DD HH:MM:SS"
+            if '年' in news_time_str:
+                news_time_obj = datetime.strptime(news_time_str, "%Y年%m月%d日 %H:%M")
+                news_time_str = news_time_obj.strftime("%Y-%m-%d %H:%M:%S")
+        else:
+            news_time_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # Fallback
+
+    return valuable, unvaluable, news_time_str
+
+
+def fetch_news_value_selenium(driver, link):
+    """Obtiene (vale, no vale, hora) renderizando el artículo con Selenium; None si no hay widget de votos"""
+    driver.get(link)
+    WebDriverWait(driver, TIMEOUT).until(
+        EC.presence_of_element_located((By.TAG_NAME, "body"))
+    )
+
+    # Solo el widget de votos: un '值得' en el texto del artículo no es un contador
+    try:
+        valuable = parse_vote_count(driver.find_element(By.ID, VOTE_UP_ID).text)
+        unvaluable = parse_vote_count(driver.find_element(By.ID, VOTE_DOWN_ID).text)
+    except NoSuchElementException:
+        return None
+
+    # Intentar obtener tiempo
+    try:
+        time_element = driver.find_element(By.CSS_SELECTOR, "time.ago")
+        news_time_str = time_element.get_attribute('datetime')  # Asume formato "YYYY-MM-DD HH:MM:SS"
+    except NoSuchElementException:
+        try:
+            time_element = driver.find_element(By.CSS_SELECTOR, ".meta-date")
+            news_time_str = time_element.text
+            # Asume formato "YYYY年MM月DD日 HH:MM" -> "YYYY-MM-DD HH:MM:SS"
+            if '年' in news_time_str:
+                news_time_obj = datetime.strptime(news_time_str, "%Y年%m月%d日 %H:%M")
+                news_time_str = news_time_obj.strftime("%Y-%m-%d %H:%M:%S")
+        except NoSuchElementException:
+            news_time_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # Fallback
+
+    return valuable, unvaluable, news_time_str
+
+
+class VoteBackend:
+    """Interfaz común: fetch(news_list) -> {link: (vale, no vale, hora)}"""
+
+    name = "base"
+
+    def fetch(self, news_list):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ApiVoteBackend(VoteBackend):
+    """
+    Pide solo los contadores a un endpoint JSON, agrupando muchos IDs por
+    petición. 'url' es una plantilla con {ids} (IDs separados por comas);
+    la respuesta puede ser una lista de objetos o un objeto indexado por ID.
+    """
+
+    name = "api"
+
+    def __init__(self, url, batch_size=API_BATCH_SIZE, id_field='id', up_field='up',
+                 down_field='down', time_field='time', rate_per_host=RATE_PER_HOST):
+        self.url = url
+        self.batch_size = batch_size
+        self.id_field = id_field
+        self.up_field = up_field
+        self.down_field = down_field
+        self.time_field = time_field
+        self.session = make_session(1)
+        self.limiter = HostRateLimiter(rate_per_host)
+
+    def _records(self, payload):
+        if isinstance(payload, dict):
+            payload = payload.get('data', payload)
+        if isinstance(payload, dict):
+            return {str(key): value for key, value in payload.items() if isinstance(value, dict)}
+        return {str(record.get(self.id_field)): record for record in payload if isinstance(record, dict)}
+
+    def fetch(self, news_list):
+        by_id = {}
+        for news in news_list:
+            article_id = parse_article_id(news['link'])
+            if article_id is not None:
+                by_id[str(article_id)] = news['link']
+        ids = list(by_id)
+        results = {}
+        for start in range(0, len(ids), self.batch_size):
+            batch = ids[start:start + self.batch_size]
+            url = self.url.format(ids=','.join(batch))
+            try:
+                response = get_with_retries(self.session, url, self.limiter, MAX_RETRIES, TIMEOUT, headers=HEADERS)
+                records = self._records(response.json())
+            except Exception as e:
+                print(f"  > Error en el endpoint de votos ({len(batch)} IDs): {e}")
+                continue
+            for article_id in batch:
+                record = records.get(article_id)
+                if record is None:
+                    continue
+                try:
+                    valuable = int(record[self.up_field])
+                    unvaluable = int(record[self.down_field])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                results[by_id[article_id]] = (valuable, unvaluable, record.get(self.time_field) or "")
+        return results
+
+    def close(self):
+        self.session.close()
+
+
+class PageVoteBackend(VoteBackend):
+    """Descarga el HTML de cada artículo en paralelo y lee los contadores sin renderizar"""
+
+    name = "page"
+
+    def __init__(self, concurrency=CONCURRENCY, rate_per_host=RATE_PER_HOST):
+        self.concurrency = concurrency
+        self.session = make_session(concurrency)
+        self.limiter = HostRateLimiter(rate_per_host)
+
+    def _fetch_one(self, news):
+        try:
+            response = get_with_retries(self.session, news['link'], self.limiter,
+                                        MAX_RETRIES, TIMEOUT, headers=HEADERS)
+            return parse_news_page(response.text)
+        except Exception as e:
+            print(f"  > Error al procesar: {news['link']} - {e}")
+            return None
+
+    def fetch(self, news_list):
+        print(f"Descargando {len(news_list)} noticias con {self.concurrency} hilos...")
+        results = map_concurrently(self._fetch_one, news_list, self.concurrency)
+        return {news['link']: result for news, result in zip(news_list, results) if result is not None}
+
+    def close(self):
+        self.session.close()
+
+
+class SeleniumVoteBackend(VoteBackend):
+    """
+    Renderiza cada artículo con Chrome; el navegador solo se abre si hace
+    falta. 'driver_factory' es un context manager que presta un navegador
+    (DriverPool.driver); con 'concurrency' > 1 se renderizan varios a la vez.
+    """
+
+    name = "selenium"
+
+    def __init__(self, driver_factory, concurrency=1):
+        self.driver_factory = driver_factory
+        self.concurrency = concurrency
+
+    def _fetch_one(self, news):
+        link = news['link']
+        for attempt in range(MAX_RETRIES):
+            try:
+                with self.driver_factory() as driver:
+                    try:
+                        return fetch_news_value_selenium(driver, link)
+                    except TimeoutException:
+                        # La página tardó, pero el navegador sigue sirviendo
+                        print(f"  > Enlace timeout: {link} (intento {attempt + 1}/{MAX_RETRIES})")
+            except Exception as e:
+                # Cualquier otro error descarta el navegador prestado
+                print(f"  > Error al procesar: {link} (intento {attempt + 1}/{MAX_RETRIES}) - {e}")
+            if attempt < MAX_RETRIES - 1:
+                count('votes.selenium.retries')
+                time.sleep(backoff_delay(attempt))
+        return None
+
+    def fetch(self, news_list):
+        if not news_list:
+            return {}
+        results = map_concurrently(self._fetch_one, news_list, self.concurrency)
+        return {news['link']: result for news, result in zip(news_list, results) if result is not None}
+
+
+def build_vote_backends(config, driver_factory=None, driver_concurrency=1):
+    """Cadena de backends según config.ini ([VoteAPI] y [NewsSorter])"""
+    backends = []
+    api_url = config.get('VoteAPI', 'url', fallback='').strip()
+    if api_url:
+        backends.append(ApiVoteBackend(
+            api_url,
+            batch_size=config.getint('VoteAPI', 'batch_size', fallback=API_BATCH_SIZE),
+            id_field=config.get('VoteAPI', 'id_field', fallback='id'),
+            up_field=config.get('VoteAPI', 'up_field', fallback='up'),
+            down_field=config.get('VoteAPI', 'down_field', fallback='down'),
+            time_field=config.get('VoteAPI', 'time_field', fallback='time'),
+        ))
+    backends.append(PageVoteBackend(
+        concurrency=config.getint('NewsSorter', 'concurrency', fallback=CONCURRENCY),
+        rate_per_host=config.getfloat('NewsSorter', 'rate_per_host', fallback=RATE_PER_HOST),
+    ))
+    if driver_factory is not None:
+        backends.append(SeleniumVoteBackend(driver_factory, driver_concurrency))
+    return backends
+
+
+def fetch_votes(news_list, backends):
+    """Recorre la cadena de backends; devuelve {link: (vale, no vale, hora)} de lo resuelto"""
+    votes = {}
+    pending = list(news_list)
+    for backend in backends:
+        if not pending:
+            break
+        try:
+            with timer(f"votes.{backend.name}"):
+                resolved = backend.fetch(pending)
+        finally:
+            backend.close()
+        count(f"votes.{backend.name}.resolved", len(resolved))
+        votes.update(resolved)
+        pending = [news for news in pending if news['link'] not in votes]
+        print(f"Backend de votos '{backend.name}': {len(resolved)} resueltas, {len(pending)} pendientes")
+    return votes
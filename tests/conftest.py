@@ -0,0 +1,9 @@
+"""Los módulos viven en src/ como scripts sueltos: se añade al path para importarlos"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(ROOT_DIR, 'src', 'fixtures')
+
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
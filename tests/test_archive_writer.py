@@ -0,0 +1,146 @@
+"""Escritura atómica: permisos, fallos antes de renombrar y commits interrumpidos"""
+
+import os
+import stat
+
+import pytest
+
+import archive_writer
+from archive_writer import JOURNAL_FILENAME, ArchiveWriter, atomic_write, recover
+
+
+def read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def write(path, content):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def leftovers(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith('.'))
+
+
+def test_atomic_write_replaces_content(tmp_path):
+    path = tmp_path / "26.md"
+    atomic_write(str(path), "uno")
+    atomic_write(str(path), "dos")
+    assert read(path) == "dos"
+    assert leftovers(tmp_path) == []
+
+
+def test_atomic_write_keeps_mode_of_replaced_file(tmp_path):
+    path = tmp_path / "26.md"
+    write(path, "antes")
+    os.chmod(path, 0o644)
+    atomic_write(str(path), "después")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+
+
+def test_atomic_write_new_file_uses_umask(tmp_path):
+    old_umask = os.umask(0o022)
+    os.umask(old_umask)
+    path = tmp_path / "nuevo.md"
+    atomic_write(str(path), "contenido")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~old_umask
+
+
+def test_writer_skips_unchanged_files(tmp_path):
+    month, day = str(tmp_path / "00.md"), str(tmp_path / "26.md")
+    write(month, "mes")
+    with ArchiveWriter() as writer:
+        writer.stage(month, "mes")
+        writer.stage(day, "día")
+    assert writer.written == [day]
+
+
+def test_exception_inside_writer_touches_nothing(tmp_path):
+    month = tmp_path / "00.md"
+    write(month, "mes viejo")
+    with pytest.raises(RuntimeError):
+        with ArchiveWriter() as writer:
+            writer.stage(str(month), "mes nuevo")
+            raise RuntimeError("fallo")
+    assert read(month) == "mes viejo"
+    assert leftovers(tmp_path) == []
+
+
+def test_failure_while_staging_keeps_both_files_old(tmp_path, monkeypatch):
+    month, day = tmp_path / "00.md", tmp_path / "26.md"
+    write(month, "mes viejo")
+    write(day, "día viejo")
+    real_write_temp = archive_writer._write_temp
+
+    def failing_write_temp(filename, content):
+        if filename.endswith("26.md"):
+            raise OSError("disco lleno")
+        return real_write_temp(filename, content)
+
+    monkeypatch.setattr(archive_writer, '_write_temp', failing_write_temp)
+    writer = ArchiveWriter()
+    writer.stage(str(month), "mes nuevo")
+    writer.stage(str(day), "día nuevo")
+    with pytest.raises(OSError):
+        writer.commit()
+    assert (read(month), read(day)) == ("mes viejo", "día viejo")
+    assert leftovers(tmp_path) == []
+
+
+def test_crash_between_renames_is_completed_by_recover(tmp_path, monkeypatch):
+    month, day = tmp_path / "00.md", tmp_path / "26.md"
+    write(month, "mes viejo")
+    write(day, "día viejo")
+    real_replace = os.replace
+    renamed = []
+
+    def crashing_replace(src, dst):
+        # El diario y el primer fichero se renombran; el proceso "muere" antes del segundo
+        if not dst.endswith(JOURNAL_FILENAME) and renamed:
+            raise KeyboardInterrupt
+        if not dst.endswith(JOURNAL_FILENAME):
+            renamed.append(dst)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(archive_writer.os, 'replace', crashing_replace)
+    writer = ArchiveWriter()
+    writer.stage(str(month), "mes nuevo")
+    writer.stage(str(day), "día nuevo")
+    with pytest.raises(KeyboardInterrupt):
+        writer.commit()
+    monkeypatch.setattr(archive_writer.os, 'replace', real_replace)
+
+    # A medias: un fichero nuevo y otro viejo, con el diario pendiente
+    assert sorted([read(month), read(day)]) != ["día nuevo", "mes nuevo"]
+    assert JOURNAL_FILENAME in os.listdir(tmp_path)
+
+    recover(str(tmp_path))
+    assert (read(month), read(day)) == ("mes nuevo", "día nuevo")
+    assert leftovers(tmp_path) == []
+
+
+def test_next_commit_recovers_interrupted_one(tmp_path, monkeypatch):
+    month, day = tmp_path / "00.md", tmp_path / "26.md"
+    write(month, "mes viejo")
+    write(day, "día viejo")
+    real_replace = os.replace
+
+    def crashing_replace(src, dst):
+        if not dst.endswith(JOURNAL_FILENAME):
+            raise KeyboardInterrupt
+        real_replace(src, dst)
+
+    monkeypatch.setattr(archive_writer.os, 'replace', crashing_replace)
+    writer = ArchiveWriter()
+    writer.stage(str(month), "mes nuevo")
+    writer.stage(str(day), "día nuevo")
+    with pytest.raises(KeyboardInterrupt):
+        writer.commit()
+    monkeypatch.setattr(archive_writer.os, 'replace', real_replace)
+
+    with ArchiveWriter() as writer:
+        writer.stage(str(month), "mes nuevo")
+        writer.stage(str(tmp_path / "27.md"), "otro día")
+    assert (read(month), read(day)) == ("mes nuevo", "día nuevo")
+    assert leftovers(tmp_path) == []
@@ -0,0 +1,56 @@
+"""Montículos de los resúmenes: re-puntuaciones a la baja y noticias ocultas"""
+
+import pytest
+
+from digest import DigestHeaps, update_digests
+from news_store import NewsStore
+from scoring import HIDDEN_SCORE
+
+DAY = "2025-10-27"
+WEEK = "2025-W44"
+
+
+@pytest.fixture
+def store(tmp_path):
+    with NewsStore(str(tmp_path / "news.db"), str(tmp_path / "news_archive")) as news_store:
+        yield news_store
+
+
+def save_day(store, scores):
+    """Guarda y traduce las noticias {nombre: puntuación} de DAY"""
+    for name in scores:
+        store.add_news(DAY, {'title': name, 'link': f"https://example.test/{name}"})
+    store.set_scores(DAY, list(scores), {f"https://example.test/{name}": score for name, score in scores.items()})
+    store.set_translations(DAY, {f"https://example.test/{name}": name for name in scores})
+
+
+def run_digest(store, tmp_path, top_k=2):
+    heaps = DigestHeaps(str(tmp_path / "state"), top_k)
+    update_digests(store, [DAY], digest_dir=str(tmp_path / "digest"), heaps=heaps)
+    return [entry[3] for entry in DigestHeaps(str(tmp_path / "state"), top_k).top(WEEK)]
+
+
+def test_top_k_keeps_the_best_scores(store, tmp_path):
+    save_day(store, {'a': 5, 'b': 4, 'c': 3})
+    assert run_digest(store, tmp_path) == ['a', 'b']
+
+
+@pytest.mark.parametrize('new_score', [HIDDEN_SCORE, 1])
+def test_lowered_score_lets_dropped_news_back_in(store, tmp_path, new_score):
+    save_day(store, {'a': 5, 'b': 4, 'c': 3})
+    assert run_digest(store, tmp_path) == ['a', 'b']
+    store.set_scores(DAY, ['b', 'c', 'a'], {"https://example.test/a": new_score})
+    assert run_digest(store, tmp_path) == ['b', 'c']
+
+
+def test_hidden_news_never_enter_a_digest(store, tmp_path):
+    save_day(store, {'a': 5, 'b': HIDDEN_SCORE})
+    assert run_digest(store, tmp_path) == ['a']
+
+
+def test_rendered_digest_matches_the_heap(store, tmp_path):
+    save_day(store, {'a': 5, 'b': 4, 'c': 3})
+    run_digest(store, tmp_path)
+    content = (tmp_path / "digest" / f"{WEEK}.md").read_text(encoding='utf-8')
+    assert content.index("example.test/a") < content.index("example.test/b")
+    assert "example.test/c" not in content
@@ -0,0 +1,151 @@
+"""Límite de ritmo, backoff y reintentos de http_pool con un reloj falso"""
+
+import random
+
+import pytest
+import requests
+
+import http_pool
+from http_pool import AdaptiveTokenBucket, TokenBucket, backoff_delay, get_with_retries
+
+
+class FakeClock:
+    """Sustituye al módulo time de http_pool: sleep avanza el reloj sin esperar"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(http_pool, 'time', fake)
+    return fake
+
+
+def response(status, headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers or {})
+    resp.url = "http://example.test/list/2025-10-26.html"
+    return resp
+
+
+class FakeSession:
+    """Devuelve (o lanza) los resultados indicados, uno por llamada a get"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = 0
+
+    def get(self, url, timeout=None, **kwargs):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_token_bucket_allows_burst_then_waits(clock):
+    bucket = TokenBucket(rate=2, capacity=2)
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.sleeps == []
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_token_bucket_refills_with_time(clock):
+    bucket = TokenBucket(rate=1)
+    bucket.acquire()
+    clock.now += 1.0
+    bucket.acquire()
+    assert clock.sleeps == []
+
+
+def test_adaptive_bucket_halves_rate_down_to_minimum(clock):
+    bucket = AdaptiveTokenBucket(rate=4, min_rate=1)
+    bucket.penalize()
+    assert bucket.rate == 2
+    assert bucket.tokens <= 0
+    bucket.penalize()
+    bucket.penalize()
+    assert bucket.rate == 1
+
+
+def test_adaptive_bucket_recovers_up_to_initial_rate(clock):
+    bucket = AdaptiveTokenBucket(rate=1, recovery=0.25)
+    bucket.penalize()
+    bucket.reward()
+    assert bucket.rate == pytest.approx(0.75)
+    for _ in range(10):
+        bucket.reward()
+    assert bucket.rate == 1
+
+
+def test_adaptive_bucket_waits_after_penalty(clock):
+    bucket = AdaptiveTokenBucket(rate=2, capacity=2)
+    bucket.penalize()
+    bucket.acquire()
+    # Sin fichas y con la mitad de ritmo: una ficha tarda 1 s
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_backoff_delay_stays_within_exponential_cap():
+    random.seed(0)
+    for attempt in range(8):
+        for _ in range(50):
+            assert 0 <= backoff_delay(attempt, base=1.0, cap=30.0) <= min(30.0, 2 ** attempt)
+
+
+def test_get_with_retries_honours_retry_after(clock):
+    session = FakeSession([response(503, {'Retry-After': '2'}), response(200)])
+    assert get_with_retries(session, "http://example.test/a").status_code == 200
+    assert session.calls == 2
+    assert clock.sleeps == [2.0]
+
+
+def test_get_with_retries_raises_last_connection_error(clock):
+    session = FakeSession([requests.ConnectionError("caída")] * 3)
+    with pytest.raises(requests.ConnectionError):
+        get_with_retries(session, "http://example.test/a", retries=3)
+    assert session.calls == 3
+    assert len(clock.sleeps) == 2
+
+
+def test_get_with_retries_gives_up_on_persistent_429(clock):
+    session = FakeSession([response(429)] * 2)
+    with pytest.raises(requests.HTTPError) as excinfo:
+        get_with_retries(session, "http://example.test/a", retries=2)
+    assert excinfo.value.response.status_code == 429
+    assert session.calls == 2
+
+
+def test_get_with_retries_does_not_retry_client_errors(clock):
+    session = FakeSession([response(404)])
+    with pytest.raises(requests.HTTPError):
+        get_with_retries(session, "http://example.test/a")
+    assert session.calls == 1
+    assert clock.sleeps == []
+
+
+def test_get_with_retries_uses_the_limiter(clock):
+    class Limiter:
+        def __init__(self):
+            self.urls = []
+
+        def acquire(self, url):
+            self.urls.append(url)
+
+    limiter = Limiter()
+    session = FakeSession([response(500), response(200)])
+    get_with_retries(session, "http://example.test/a", limiter=limiter)
+    assert limiter.urls == ["http://example.test/a"] * 2
@@ -0,0 +1,79 @@
+"""Parseo de la página de archivo de IT之家 y respaldo de Selenium con una página vacía"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import script
+from conftest import FIXTURES_DIR
+from ithome import parse_archive_html
+from news_sources import ItHomeSource
+
+LIST_FIXTURE = os.path.join(FIXTURES_DIR, 'ithome_list_2025-10-26.html')
+EXPECTED_FIXTURE = os.path.join(FIXTURES_DIR, 'ithome_list_2025-10-26.json')
+EMPTY_FIXTURE = os.path.join(FIXTURES_DIR, 'ithome_list_empty.html')
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def read_fixture(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_parse_archive_html_matches_expected_output():
+    news_data = parse_archive_html(read_fixture(LIST_FIXTURE), base_url="https://www.ithome.com/list/")
+    with open(EXPECTED_FIXTURE, 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    assert [dict(news, time=news['time'].strftime(TIME_FORMAT)) for news in news_data] == expected
+
+
+def test_parse_archive_html_since_skips_older_news():
+    since = datetime(2025, 10, 26, 20, 0)
+    news_data = parse_archive_html(read_fixture(LIST_FIXTURE), since=since)
+    assert [news['time'] for news in news_data] == sorted((news['time'] for news in news_data), reverse=True)
+    assert len(news_data) == 9
+    assert all(news['time'] >= since for news in news_data)
+
+
+def test_parse_archive_html_empty_page():
+    assert parse_archive_html(read_fixture(EMPTY_FIXTURE)) == []
+
+
+@pytest.fixture
+def empty_list_server():
+    body = read_fixture(EMPTY_FIXTURE).encode('utf-8')
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_empty_page_falls_back_to_selenium(empty_list_server, monkeypatch):
+    source = ItHomeSource('ITHome', url=f"{empty_list_server}/list/{{date_str}}.html", timeout=5)
+    fallback_news = [{'category': '[AI]', 'title': "respaldo", 'link': "https://www.ithome.com/0/1/1.htm",
+                      'time': datetime(2025, 10, 26, 12, 0)}]
+    calls = []
+    monkeypatch.setattr(script, 'load_sources', lambda: [source])
+    monkeypatch.setattr(script, 'fetch_all_news_selenium', lambda date_str: calls.append(date_str) or fallback_news)
+
+    news_data, _ = script.fetch_all_news('2025-10-26', incremental=False)
+
+    assert calls == ['2025-10-26']
+    assert news_data == fallback_news
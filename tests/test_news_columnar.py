@@ -0,0 +1,38 @@
+"""Exportación columnar incremental: qué meses se vuelven a exportar"""
+
+import pytest
+
+from archive_writer import ArchiveWriter
+from news_columnar import export_archive, scan
+from news_store import NewsStore
+
+DAY = "2025-10-26"
+LINKS = ["https://example.test/a", "https://example.test/b"]
+
+
+def save_scores(scores):
+    # Como el scraper: ArchiveWriter no reescribe los ficheros que no cambian
+    with NewsStore() as store, ArchiveWriter() as writer:
+        for link in LINKS:
+            store.add_news(DAY, {'title': link[-1], 'link': link})
+        store.set_scores(DAY, LINKS, dict(zip(LINKS, scores)))
+        store.write_month(DAY[:7], writer)
+        store.write_day(DAY, writer)
+
+
+@pytest.fixture(autouse=True)
+def archive(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    save_scores([5, 3])
+    assert export_archive() == ["2025-10"]
+
+
+def test_unchanged_month_is_skipped():
+    assert export_archive() == []
+
+
+def test_store_only_change_is_exported():
+    # Nuevas puntuaciones con el mismo orden: DD.md no cambia, el almacén sí
+    save_scores([4, 2])
+    assert export_archive() == ["2025-10"]
+    assert [row['score'] for row in scan(['score'])] == [4, 2]
@@ -0,0 +1,67 @@
+"""Límites de palabra de KeywordMatcher, pesos y patrón de spam"""
+
+import pytest
+
+from news_filter import KeywordMatcher, filter_titles, find_keywords, parse_weights, should_keep_news
+
+
+@pytest.fixture
+def matcher():
+    return KeywordMatcher(['ai', 'meta', 'gpt', '大模型'])
+
+
+@pytest.mark.parametrize('title', ['Xiaomi 新品发布', 'Email 服务升级', 'metal 外壳', 'Gmail 新功能'])
+def test_ascii_keywords_do_not_match_inside_words(matcher, title):
+    assert matcher.matches(title) == []
+    assert not matcher.is_match(title)
+
+
+@pytest.mark.parametrize('title, expected', [
+    ('AI手机来了', ['ai']),
+    ('小米AI助手', ['ai']),
+    ('GPT-4o 发布', ['gpt']),
+    ('Meta 发布新模型', ['meta']),
+    ('国产大模型上新', ['大模型']),
+])
+def test_keywords_match_next_to_cjk_digits_and_punctuation(matcher, title, expected):
+    assert matcher.matches(title) == expected
+    assert matcher.is_match(title)
+
+
+@pytest.mark.parametrize('title, expected', [
+    ('OpenAI 开放 GPTs 商店', ['gpt']),
+    ('微调 LLMs 作为奖励模型', ['llm']),
+    ('多家公司的 AIs 竞赛', ['ai']),
+])
+def test_plural_keywords_still_match(title, expected):
+    assert KeywordMatcher(['ai', 'gpt', 'llm']).matches(title) == expected
+    assert should_keep_news(title)
+
+
+def test_plural_s_does_not_open_other_suffixes(matcher):
+    assert matcher.matches('Metastasis 研究') == []
+    assert matcher.matches('Aisle 通道') == []
+
+
+def test_matches_are_case_insensitive_and_distinct(matcher):
+    assert matcher.matches('AI 与 ai：Meta 的 AI 计划') == ['ai', 'meta']
+
+
+def test_weighted_keywords_need_the_threshold():
+    weighted = KeywordMatcher(['google', 'meta', 'ai'], parse_weights('google=0.5, meta=0.5'))
+    assert weighted.score('Google 发布新手机') == 0.5
+    assert not weighted.is_match('Google 发布新手机')
+    assert weighted.is_match('Google 和 Meta 联手')
+    assert weighted.is_match('Google AI')
+
+
+def test_spam_keywords_are_reported_and_filtered():
+    assert find_keywords('AI 手机限时优惠活动').spam == ['优惠', '活动']
+    assert not should_keep_news('AI 手机限时优惠')
+    assert should_keep_news('OpenAI 发布 GPT-5')
+
+
+def test_filter_titles_matches_should_keep_news():
+    titles = ['AI 手机限时优惠', 'OpenAI 发布 GPT-5', 'Xiaomi 手机', '国产大模型赞助赛事', '人工智能大会']
+    assert filter_titles(titles) == [should_keep_news(title) for title in titles]
+    assert filter_titles(titles) == [False, True, False, False, True]
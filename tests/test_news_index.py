@@ -0,0 +1,55 @@
+"""Traducción de consultas a FTS5 y búsqueda sobre un índice temporal"""
+
+import pytest
+
+from news_index import NewsIndex, to_fts_query
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('OpenAI 发布', '"openai" AND "发布"'),
+    ('苹果 OR 华为', '"苹果" OR "华为"'),
+    ('-芯片 英伟达', '"英伟 伟达" NOT "芯片"'),
+    ('"苹果 iPhone"', '"苹果 iphone"'),
+    ('(苹果 OR 华为) NOT 手机', '("苹果" OR "华为") NOT "手机"'),
+    ('芯', '"芯" *'),
+])
+def test_to_fts_query(query, expected):
+    assert to_fts_query(query) == expected
+
+
+@pytest.mark.parametrize('query', ['', 'NOT', 'OR AND', '-芯片', '"', '()', '!!!'])
+def test_queries_without_positive_terms_are_empty(query):
+    assert to_fts_query(query) == ''
+
+
+def write_day(path, entries):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = ["# 今日新闻 - 2025年10月26日\n"]
+    lines += [f"- [{title}]({link})\n" for title, link in entries]
+    path.write_text(''.join(lines), encoding='utf-8')
+
+
+@pytest.fixture
+def index(tmp_path):
+    archive_dir = tmp_path / "news_archive"
+    write_day(archive_dir / "2025-10" / "26.md", [
+        ("苹果发布 iPhone 17", "https://www.ithome.com/0/001.htm"),
+        ("华为发布新款手机", "https://www.ithome.com/0/002.htm"),
+        ("英伟达芯片出货", "https://www.ithome.com/0/003.htm"),
+        ("英伟达发布大模型", "https://www.ithome.com/0/004.htm"),
+    ])
+    with NewsIndex(str(tmp_path / "search.db"), str(archive_dir)) as news_index:
+        news_index.update()
+        yield news_index
+
+
+def test_search_applies_and_or_not(index):
+    assert index.count('发布') == 3
+    assert index.count('苹果 OR 华为') == 2
+    assert index.count('英伟达 -芯片') == 1
+    assert index.count('"苹果发布 iPhone"') == 1
+
+
+def test_search_ignores_queries_without_terms(index):
+    assert index.search('NOT') == []
+    assert index.count('-发布') == 0
@@ -0,0 +1,113 @@
+"""Vistas .md del almacén: ida y vuelta byte a byte, añadidos y meses cambiados en disco"""
+
+import glob
+import os
+import shutil
+
+import pytest
+
+from conftest import ROOT_DIR
+from news_store import NewsStore
+
+MONTHS = ['2025-10', '2024-05']
+
+
+def read(path):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def write(path, content):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+
+
+@pytest.fixture
+def archive_dir(tmp_path):
+    archive_dir = tmp_path / "news_archive"
+    (archive_dir / "es").mkdir(parents=True)
+    for year_month in MONTHS:
+        shutil.copytree(os.path.join(ROOT_DIR, "news_archive", year_month), archive_dir / year_month)
+        for path in glob.glob(os.path.join(ROOT_DIR, "news_archive", "es", f"{year_month}-*.md")):
+            shutil.copy(path, archive_dir / "es")
+    return str(archive_dir)
+
+
+def open_store(archive_dir):
+    return NewsStore(os.path.join(archive_dir, "news.db"), archive_dir)
+
+
+def month_links(store, year_month):
+    return {row['link'] for row in store.month_news(year_month)}
+
+
+@pytest.mark.parametrize('year_month', MONTHS)
+def test_real_month_round_trips_byte_for_byte(archive_dir, year_month):
+    with open_store(archive_dir) as store:
+        assert store.render_month(year_month) == read(f"{archive_dir}/{year_month}/00.md")
+        for path in glob.glob(f"{archive_dir}/{year_month}/[0-9][0-9].md"):
+            if not path.endswith("00.md"):
+                assert store.render_day(f"{year_month}-{os.path.basename(path)[:2]}") == read(path), path
+
+
+def test_new_news_are_appended_to_the_existing_views(archive_dir):
+    month_before = read(f"{archive_dir}/2025-10/00.md")
+    day_before = read(f"{archive_dir}/2025-10/31.md")
+    with open_store(archive_dir) as store:
+        store.add_news("2025-10-31", {'title': "新闻", 'link': "https://example.test/1"})
+        store.add_news("2025-10-31", {'title': "重复", 'link': "https://example.test/1"})
+        store.write_month("2025-10")
+        store.write_day("2025-10-31")
+    line = "- [新闻](https://example.test/1)\n"
+    assert read(f"{archive_dir}/2025-10/00.md") == month_before + line
+    assert read(f"{archive_dir}/2025-10/31.md") == day_before + line
+
+
+def test_month_changed_on_disk_is_imported_again(archive_dir):
+    with open_store(archive_dir) as store:
+        store.ensure_month("2025-10")
+    # Otra ejecución añadió una noticia que la copia de news.db no conoce
+    line = "- [另一次运行](https://example.test/2)\n"
+    write(f"{archive_dir}/2025-10/00.md", read(f"{archive_dir}/2025-10/00.md") + line)
+    write(f"{archive_dir}/2025-10/31.md", read(f"{archive_dir}/2025-10/31.md") + line)
+    with open_store(archive_dir) as store:
+        assert "https://example.test/2" in month_links(store, "2025-10")
+        store.add_news("2025-10-31", {'title': "新闻", 'link': "https://example.test/1"})
+        store.write_month("2025-10")
+    assert read(f"{archive_dir}/2025-10/00.md").endswith(line + "- [新闻](https://example.test/1)\n")
+
+
+def test_changes_never_written_are_dropped(archive_dir):
+    month_before = read(f"{archive_dir}/2025-10/00.md")
+    with open_store(archive_dir) as store:
+        store.add_news("2025-10-31", {'title': "新闻", 'link': "https://example.test/1"})
+    with open_store(archive_dir) as store:
+        assert "https://example.test/1" not in month_links(store, "2025-10")
+        assert store.render_month("2025-10") == month_before
+
+
+def test_sorting_keeps_revised_titles_together(archive_dir):
+    with open_store(archive_dir) as store:
+        store.add_news("2025-11-01", {'title': "第一版", 'link': "https://example.test/a"})
+        store.add_news("2025-11-01", {'title': "其他", 'link': "https://example.test/b"})
+        store.write_day("2025-11-01")
+    path = f"{archive_dir}/2025-11/01.md"
+    # Revisión del título a mano: mismo link, otra línea
+    write(path, read(path) + "- [第二版](https://example.test/a)\n")
+    with open_store(archive_dir) as store:
+        store.set_scores("2025-11-01", ["https://example.test/b", "https://example.test/a"], {})
+        store.write_day("2025-11-01")
+    assert read(path) == (
+        "# 今日新闻 - 2025年11月01日(sorted)\n"
+        '<p><a href="https://example.test/b">其他</a></p>\n'
+        '<p><a href="https://example.test/a">第一版</a></p>\n'
+        '<p><a href="https://example.test/a">第二版</a></p>\n')
+
+
+def test_removed_day_file_drops_its_flags(archive_dir):
+    with open_store(archive_dir) as store:
+        assert store.is_sorted("2025-10-26")
+    os.remove(f"{archive_dir}/2025-10/26.md")
+    with open_store(archive_dir) as store:
+        assert not store.is_sorted("2025-10-26")
+        assert store.day_news("2025-10-26") == []
@@ -0,0 +1,125 @@
+"""Contadores del widget de votos y cadena de backends API → página → Selenium"""
+
+import contextlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from vote_fetcher import (ApiVoteBackend, PageVoteBackend, SeleniumVoteBackend, fetch_votes,
+                          parse_news_page)
+
+WIDGET_PAGE = ('<html><body><p>这款手机值得买的 3 个理由，不值得的 2 点</p>'
+               '<time class="ago" datetime="2025-10-26 12:00:00"></time>'
+               '<div class="vote"><span id="news_value_up">12</span>'
+               '<span id="news_value_down">值得 4</span></div></body></html>')
+BODY_ONLY_PAGE = '<html><body><p>这款手机值得买的 3 个理由</p></body></html>'
+
+
+def test_parse_news_page_reads_only_the_widget():
+    assert parse_news_page(WIDGET_PAGE) == (12, 4, "2025-10-26 12:00:00")
+
+
+def test_parse_news_page_ignores_article_text_without_widget():
+    assert parse_news_page(BODY_ONLY_PAGE) is None
+
+
+class FakeElement:
+    def __init__(self, text='', attributes=None):
+        self.text = text
+        self.attributes = attributes or {}
+
+    def get_attribute(self, name):
+        return self.attributes.get(name)
+
+
+class FakeDriver:
+    """Navegador con páginas ya 'renderizadas': {link: {(by, valor): FakeElement}}"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.current = None
+
+    def get(self, link):
+        self.current = self.pages[link]
+
+    def find_element(self, by, value):
+        if (by, value) == (By.TAG_NAME, 'body'):
+            return FakeElement()
+        try:
+            return self.current[(by, value)]
+        except KeyError:
+            raise NoSuchElementException(value)
+
+
+@pytest.fixture
+def article_server():
+    """Sirve un endpoint de votos (solo conoce el artículo 1) y páginas (solo la 2 tiene widget)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = urlsplit(self.path).path
+            if path == '/api':
+                body = json.dumps([{'id': 1, 'up': 7, 'down': 1, 'time': "2025-10-26 08:00:00"}])
+            elif path.endswith('/0/000/002.htm'):
+                body = WIDGET_PAGE
+            else:
+                body = BODY_ONLY_PAGE
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_votes_falls_back_through_the_chain(article_server):
+    # Los enlaces imitan los de IT之家 (ithome.com/0/XXX/YYY.htm) para que la API saque su ID
+    links = [f"{article_server}/ithome.com/0/000/00{i}.htm" for i in (1, 2, 3)]
+    news_list = [{'link': link} for link in links]
+    rendered = {links[2]: {(By.ID, 'news_value_up'): FakeElement("5"), (By.ID, 'news_value_down'): FakeElement("0"),
+                           (By.CSS_SELECTOR, 'time.ago'): FakeElement(attributes={'datetime': "2025-10-26 09:00:00"})}}
+    asked = []
+
+    @contextlib.contextmanager
+    def driver_factory():
+        driver = FakeDriver(rendered)
+        original_get = driver.get
+        driver.get = lambda link: asked.append(link) or original_get(link)
+        yield driver
+
+    backends = [ApiVoteBackend(f"{article_server}/api?ids={{ids}}", rate_per_host=1000),
+                PageVoteBackend(concurrency=2, rate_per_host=1000),
+                SeleniumVoteBackend(driver_factory)]
+    votes = fetch_votes(news_list, backends)
+
+    assert votes == {
+        links[0]: (7, 1, "2025-10-26 08:00:00"),
+        links[1]: (12, 4, "2025-10-26 12:00:00"),
+        links[2]: (5, 0, "2025-10-26 09:00:00"),
+    }
+    # Selenium solo recibe lo que no resolvieron ni la API ni la página
+    assert asked == [links[2]]
+
+
+def test_selenium_without_widget_leaves_news_unresolved():
+    link = "https://www.ithome.com/0/000/009.htm"
+
+    @contextlib.contextmanager
+    def driver_factory():
+        yield FakeDriver({link: {}})
+
+    assert SeleniumVoteBackend(driver_factory).fetch([{'link': link}]) == {}